@@ -0,0 +1,250 @@
+"""Постійний процес-помічник AutoHotkey для fallback-дій.
+
+Замість запуску ``AutoHotkey.exe`` на кожен fallback сервіс один раз стартує
+``gui_fallback/ahk_worker.ahk`` і надсилає йому іменовані команди через
+stdin, а відповіді читає зі stdout. Протокол рядковий, з табуляціями, щоб
+його легко було розбирати в AHK:
+
+    запит:     <id>\\t<команда>\\t<аргумент>...
+    відповідь: <id>\\tok\\t<результат>  або  <id>\\terror\\t<повідомлення>
+
+Після старту помічник надсилає ``0\\tready\\t<pid>``. Кожна команда має власний
+ліміт часу; завислий помічник (наприклад, модальне вікно) вбивається, а
+помічник, що завершився, перезапускається перед наступною командою.
+
+Якщо запустити цей файл напряму (``python ahk_worker.py``), він працює як
+замінник помічника на Python з тим самим протоколом — для тестів на Linux.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+LOGGER = logging.getLogger("ebpro.ahk_worker")
+
+READY = "ready"
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+class AhkWorkerError(RuntimeError):
+    """Помічник не запустився, завершився під час команди або повернув помилку."""
+
+
+class AhkTimeoutError(AhkWorkerError):
+    """Команда не завершилась за відведений час; помічник зупинено."""
+
+
+def _field(value: Any) -> str:
+    """Аргумент протоколу: табуляції й переведення рядка розділяють поля."""
+
+    return " ".join(str(value).split("\t")).replace("\r", " ").replace("\n", " ")
+
+
+def stand_in_command() -> List[str]:
+    """Команда запуску замінника помічника на Python."""
+
+    return [sys.executable, "-u", str(Path(__file__).resolve())]
+
+
+class AhkWorker:
+    """Довгоживучий процес помічника з командами за назвою.
+
+    Команди виконуються по одній (AHK однопотоковий). ``call`` запускає
+    помічника, якщо він ще не працює або завершився, і чекає на відповідь
+    не довше ``timeout`` секунд.
+    """
+
+    def __init__(self, command: Sequence[str], start_timeout: float = 10.0, command_timeout: float = 15.0):
+        self.command = [str(part) for part in command]
+        self.start_timeout = start_timeout
+        self.command_timeout = command_timeout
+        self.calls = 0
+        self.restarts = 0
+        self.timeouts = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._replies: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._next_id = 0
+        self._started_once = False
+        self._lock = threading.Lock()
+
+    @property
+    def pid(self) -> Optional[int]:
+        process = self._process
+        return process.pid if process is not None and process.poll() is None else None
+
+    def start(self) -> int:
+        """Запускає помічника заздалегідь (прогрів); повертає його pid."""
+
+        with self._lock:
+            return self._ensure_running().pid
+
+    def _ensure_running(self) -> subprocess.Popen:
+        process = self._process
+        if process is not None and process.poll() is None:
+            return process
+        if self._started_once:
+            self.restarts += 1
+            LOGGER.warning(
+                "Помічник AHK завершився (код %s), перезапускаємо.", process.returncode if process else None
+            )
+        return self._spawn()
+
+    def _spawn(self) -> subprocess.Popen:
+        started = time.perf_counter()
+        try:
+            process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1,
+            )
+        except OSError as exc:
+            raise AhkWorkerError(f"Не вдалося запустити помічник AHK {self.command[0]}: {exc}") from exc
+        replies: "queue.Queue[Optional[str]]" = queue.Queue()
+        threading.Thread(target=self._read_replies, args=(process, replies), daemon=True, name="ahk-stdout").start()
+        threading.Thread(target=self._read_errors, args=(process,), daemon=True, name="ahk-stderr").start()
+        self._process, self._replies, self._started_once = process, replies, True
+        reply = self._wait_reply(self.start_timeout, "0", "старт помічника")
+        LOGGER.info(
+            "Помічник AHK запущено (pid %s) за %.0f мс.", reply or process.pid, (time.perf_counter() - started) * 1000
+        )
+        return process
+
+    @staticmethod
+    def _read_replies(process: subprocess.Popen, replies: "queue.Queue[Optional[str]]") -> None:
+        for line in process.stdout:
+            replies.put(line.rstrip("\r\n"))
+        replies.put(None)
+
+    @staticmethod
+    def _read_errors(process: subprocess.Popen) -> None:
+        for line in process.stderr:
+            if line.strip():
+                LOGGER.warning("Помічник AHK: %s", line.rstrip())
+
+    def _wait_reply(self, timeout: float, request_id: str, description: str) -> str:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = self._replies.get(timeout=max(remaining, 0.0)) if remaining > 0 else self._replies.get_nowait()
+            except queue.Empty:
+                self.timeouts += 1
+                self._kill()
+                raise AhkTimeoutError(f"Помічник AHK не відповів за {timeout:.1f} с ({description}); його зупинено.")
+            if line is None:
+                code = self._process.wait() if self._process is not None else None
+                raise AhkWorkerError(f"Помічник AHK завершився (код {code}) під час: {description}.")
+            reply_id, _, rest = line.partition("\t")
+            if reply_id != request_id:
+                LOGGER.debug("Пропускаємо сторонній рядок помічника AHK: %s", line)
+                continue
+            status, _, text = rest.partition("\t")
+            if status == STATUS_ERROR:
+                raise AhkWorkerError(text or f"Помічник AHK повернув помилку ({description}).")
+            return text
+
+    def call(self, name: str, *args: Any, timeout: Optional[float] = None) -> str:
+        """Виконує команду ``name`` з аргументами та повертає текст відповіді."""
+
+        limit = self.command_timeout if timeout is None else timeout
+        with self._lock:
+            self._next_id += 1
+            request_id = str(self._next_id)
+            line = "\t".join([request_id, _field(name), *(_field(arg) for arg in args)]) + "\n"
+            for attempt in (1, 2):
+                process = self._ensure_running()
+                try:
+                    process.stdin.write(line)
+                    process.stdin.flush()
+                    break
+                except OSError:
+                    # Помічник завершився до того, як отримав команду, — її безпечно надіслати новому.
+                    if attempt == 2:
+                        raise AhkWorkerError(f"Не вдалося передати команду {name} помічнику AHK.")
+                    process.wait()
+            self.calls += 1
+            started = time.perf_counter()
+            reply = self._wait_reply(limit, request_id, f"команда {name}")
+            LOGGER.debug("Команда AHK %s виконана за %.0f мс.", name, (time.perf_counter() - started) * 1000)
+            return reply
+
+    def _kill(self) -> None:
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Просить помічника завершитись (``quit``), а за потреби зупиняє примусово."""
+
+        with self._lock:
+            process = self._process
+            if process is None or process.poll() is not None:
+                return
+            try:
+                process.stdin.write("0\tquit\n")
+                process.stdin.close()
+                process.wait(timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                self._kill()
+            self._started_once = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pid": self.pid, "calls": self.calls, "restarts": self.restarts, "timeouts": self.timeouts}
+
+
+def _stand_in() -> int:
+    """Замінник ``ahk_worker.ahk``: ті самі команди без GUI, плюс ``sleep`` і ``exit`` для тестів."""
+
+    def reply(request_id: str, status: str, text: Any) -> None:
+        sys.stdout.write(f"{request_id}\t{status}\t{_field(text)}\n")
+        sys.stdout.flush()
+
+    reply("0", READY, os.getpid())
+    for line in sys.stdin:
+        parts = line.rstrip("\r\n").split("\t")
+        request_id, name, args = parts[0], parts[1] if len(parts) > 1 else "", parts[2:]
+        if name == "quit":
+            reply(request_id, STATUS_OK, "bye")
+            return 0
+        if name == "ping":
+            reply(request_id, STATUS_OK, "pong")
+        elif name == "simulate_offline":
+            reply(request_id, STATUS_OK, f"sent to {args[0] if args else 'EasyBuilder Pro'}")
+        elif name == "sleep":
+            # Імітація завислої команди; без числа — довше за будь-який розумний ліміт.
+            try:
+                seconds = float(args[0])
+            except (IndexError, ValueError):
+                seconds = 60.0
+            time.sleep(seconds)
+            reply(request_id, STATUS_OK, "slept")
+        elif name == "exit":
+            return int(args[0]) if args else 1
+        else:
+            reply(request_id, STATUS_ERROR, f"Невідома команда {name}")
+    return 0
+
+
+__all__ = [
+    "AhkTimeoutError",
+    "AhkWorker",
+    "AhkWorkerError",
+    "stand_in_command",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(_stand_in())
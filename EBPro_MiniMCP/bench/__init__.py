@@ -0,0 +1 @@
+"""Бенчмарки EBPro Mini-MCP."""
@@ -0,0 +1,105 @@
+"""Мікробенчмарк розбору інструкцій: автомат без кешу проти LRU-кешу.
+
+Запуск з кореня репозиторію::
+
+    python -m EBPro_MiniMCP.bench.nlp_bench --texts 200 --iterations 20000
+
+Набір текстів імітує чат-клієнт: шаблонні команди з різними проєктами та
+шляхами, серед них ланцюжки з кількох дій; частина текстів повторюється
+частіше за інші (``--repeat-share``).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..nlp import _scan, cache_info, clear_cache, parse_plan
+from .run_bench import percentile
+
+TEMPLATES = (
+    'Відкрий проєкт "D:/HMI/{name}.emtp"',
+    "Зібрати проект у exob",
+    "Запусти офлайн симуляцію",
+    'Зроби скріншот "D:/shots/{name}_{index}.png"',
+    'Запакуй проект у ecmp "D:/export/{name}.ecmp"',
+    'Відкрий проєкт "D:/HMI/{name}.emtp", збери і запусти офлайн симуляцію',
+    'Відкрий проєкт "D:/HMI/{name}.emtp", збери, потім запакуй у ecmp "D:/export/{name}.ecmp"',
+)
+
+
+def make_corpus(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(name=f"line_{rng.randrange(count)}", index=index % 8)
+        for index in range(count)
+    ]
+
+
+def make_stream(corpus: List[str], iterations: int, repeat_share: float, seed: int = 0) -> List[str]:
+    """Послідовність запитів: ``repeat_share`` з них — найчастіші 10% текстів."""
+
+    rng = random.Random(seed)
+    hot = corpus[: max(1, len(corpus) // 10)]
+    return [rng.choice(hot) if rng.random() < repeat_share else rng.choice(corpus) for _ in range(iterations)]
+
+
+def _measure(parse: Any, stream: List[str]) -> Dict[str, float]:
+    samples: List[float] = []
+    started = time.perf_counter()
+    for text in stream:
+        begin = time.perf_counter()
+        parse(text)
+        samples.append((time.perf_counter() - begin) * 1e6)
+    wall = time.perf_counter() - started
+    return {
+        "ops": round(len(stream) / wall, 1) if wall > 0 else 0.0,
+        "p50_us": round(percentile(samples, 50), 2),
+        "p95_us": round(percentile(samples, 95), 2),
+        "p99_us": round(percentile(samples, 99), 2),
+    }
+
+
+def run(texts: int, iterations: int, repeat_share: float, seed: int = 0) -> Dict[str, Any]:
+    """Вимірює розбір без кешу (лише автомат) та з кешем на тому самому потоці текстів."""
+
+    corpus = make_corpus(texts, seed)
+    stream = make_stream(corpus, iterations, repeat_share, seed)
+    uncached = _scan.__wrapped__  # type: ignore[attr-defined]
+    results: Dict[str, Any] = {"automaton": _measure(uncached, stream)}
+    clear_cache()
+    results["cached"] = _measure(parse_plan, stream)
+    results["cache"] = cache_info()
+    results["steps_per_text"] = round(sum(len(uncached(text)) for text in corpus) / len(corpus), 2)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Мікробенчмарк NLP-парсера EBPro Mini-MCP")
+    parser.add_argument("--texts", type=int, default=200, help="кількість різних текстів")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--repeat-share", type=float, default=0.8, help="частка запитів з найчастіших текстів")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="зберегти результати у JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.texts, args.iterations, args.repeat_share, args.seed)
+    for name in ("automaton", "cached"):
+        summary = results[name]
+        print(
+            f"{name:10s} ops/s={summary['ops']:10.1f} p50={summary['p50_us']:7.2f} мкс "
+            f"p95={summary['p95_us']:7.2f} мкс p99={summary['p99_us']:7.2f} мкс"
+        )
+    cache = results["cache"]
+    print(f"кеш: влучань {cache['hits']}, промахів {cache['misses']}, записів {cache['size']}/{cache['maxsize']}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""Навантажувальний бенчмарк /run: латентність, пропускна здатність, етапи запиту.
+
+Запуск з кореня репозиторію::
+
+    python -m EBPro_MiniMCP.bench.run_bench --mode inprocess --clients 8 --requests 400
+    python -m EBPro_MiniMCP.bench.run_bench --mode uvicorn --workload all --save-baseline bench.json
+    python -m EBPro_MiniMCP.bench.run_bench --baseline bench.json  # код 1 при регресії
+
+GUI-дії виконує ``SimulatedBackend``, тож вимірюються накладні витрати самого
+сервера: розбір, авторизація, диспетчеризація через чергу та дія.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .. import ebpro_actions
+from ..ebpro_actions import set_backend
+from ..macros import MacroStore
+from ..simulated_backend import SimulatedBackend
+
+try:
+    import httpx
+except Exception:  # pragma: no cover - httpx потрібен лише для бенчмарку
+    httpx = None  # type: ignore
+
+STAGES = ("auth", "parse", "dispatch", "action")
+
+# Частки дій у змішаному навантаженні (скріншоти — найчастіший виклик).
+MIXED_WEIGHTS = {
+    "take_screenshot": 0.5,
+    "build_exob": 0.15,
+    "pack_ecmp": 0.15,
+    "open_project": 0.1,
+    "run_offline_sim": 0.1,
+}
+
+
+def _request_body(action: str, workdir: Path, index: int) -> Dict[str, Any]:
+    """Тіло запиту /run для дії (через NLP, як це роблять клієнти)."""
+
+    project = workdir / "bench.emtp"
+    if action == "open_project":
+        return {"text": f'Відкрий проєкт "{project}"'}
+    if action == "build_exob":
+        return {"text": "Зібрати проєкт у exob", "args": {"use_cache": False}}
+    if action == "run_offline_sim":
+        return {"text": "Запусти офлайн симуляцію"}
+    if action == "take_screenshot":
+        return {"text": "Зроби скріншот", "args": {"out": str(workdir / f"shot_{index % 8}.png")}}
+    if action == "pack_ecmp":
+        return {"text": "Запакуй проект у ecmp", "args": {"out": str(workdir / f"pack_{index % 8}.ecmp")}}
+    raise ValueError(f"Невідома дія {action}")
+
+
+def _plan(workload: str, count: int, seed: int) -> List[str]:
+    if workload == "mixed":
+        rng = random.Random(seed)
+        actions, weights = zip(*MIXED_WEIGHTS.items())
+        return rng.choices(actions, weights=weights, k=count)
+    return [workload] * count
+
+
+def _parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    stages: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, rest = part.strip().partition(";dur=")
+        if name and rest:
+            stages[name] = float(rest)
+    return stages
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Перцентиль методом найближчого рангу (0 для порожнього списку)."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], stages: Dict[str, List[float]], wall: float, errors: int) -> Dict[str, Any]:
+    """Зводить сирі виміри у p50/p95/p99, RPS і перцентилі етапів (мс)."""
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall > 0 else 0.0,
+        "p50": round(percentile(latencies, 50), 2),
+        "p95": round(percentile(latencies, 95), 2),
+        "p99": round(percentile(latencies, 99), 2),
+        "stages": {
+            name: {pct: round(percentile(values, float(pct[1:])), 3) for pct in ("p50", "p95", "p99")}
+            for name, values in stages.items()
+            if values
+        },
+    }
+
+
+async def _drive(client: Any, plan: List[str], clients: int, workdir: Path) -> Dict[str, Any]:
+    latencies: List[float] = []
+    stages: Dict[str, List[float]] = {name: [] for name in STAGES}
+    errors = 0
+    cursor = iter(enumerate(plan))
+
+    async def _client() -> None:
+        nonlocal errors
+        for index, action in cursor:
+            body = _request_body(action, workdir, index)
+            started = time.perf_counter()
+            response = await client.post("/run", json=body)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            if response.status_code != 200:
+                errors += 1
+                continue
+            for name, value in _parse_server_timing(response.headers.get("server-timing")).items():
+                stages.setdefault(name, []).append(value)
+
+    # Прогрів: відкритий проєкт і запущений симулятор, як у реальному конвеєрі.
+    for action in ("open_project", "run_offline_sim"):
+        await client.post("/run", json=_request_body(action, workdir, 0))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_client() for _ in range(clients)))
+    return summarize(latencies, stages, time.perf_counter() - started, errors)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _UvicornThread:
+    """Локальний uvicorn у фоновому потоці для вимірів через справжній HTTP."""
+
+    def __init__(self, app: Any):
+        import uvicorn
+
+        self.port = _free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> str:
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.server.should_exit = True
+        self.thread.join(5)
+
+
+async def run_scenario(app: Any, mode: str, workload: str, requests: int, clients: int, seed: int, workdir: Path) -> Dict[str, Any]:
+    """Проганяє одне навантаження та повертає зведення."""
+
+    plan = _plan(workload, requests, seed)
+    if mode == "inprocess":
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await _drive(client, plan, clients, workdir)
+    with _UvicornThread(app) as base_url:
+        limits = httpx.Limits(max_connections=clients)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            return await _drive(client, plan, clients, workdir)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Повертає список регресій відносно збереженої бази."""
+
+    regressions: List[str] = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ("p95", "p99"):
+            if base[metric] > 0 and current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {current[metric]} мс > {base[metric]} мс (+{tolerance:.0%})")
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: помилок {current['errors']} > {base.get('errors', 0)}")
+        if base["rps"] > 0 and current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {current['rps']} < {base['rps']} (-{tolerance:.0%})")
+    return regressions
+
+
+def _setup(latency: float, workdir: Path, lookup_latency: float = 0.0) -> Any:
+    """Підключає симульований бекенд і повертає FastAPI-застосунок.
+
+    Макроси дій пишуться у тимчасову теку прогону, щоб не змішуватися з робочими.
+    """
+
+    # Журнал кожного запиту спотворює виміри; лишаємо тільки попередження.
+    logging.getLogger("ebpro").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    set_backend(SimulatedBackend(latency=latency, seed=0, lookup_latency=lookup_latency))
+    ebpro_actions._MACRO_STORE = MacroStore(workdir / "macros.json")
+    (workdir / "bench.emtp").write_bytes(b"bench-project")
+    from ..mcp_server import app
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк EBPro Mini-MCP /run")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument(
+        "--workload",
+        default="mixed",
+        help="mixed, all або назва дії з SUPPORTED_ACTIONS",
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="тривалість кожної симульованої GUI-операції, с")
+    parser.add_argument(
+        "--lookup-latency",
+        type=float,
+        default=0.0,
+        help="вартість повного пошуку елемента UI, с (відтворення макросу її уникає)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, help="JSON з базовими результатами для порівняння")
+    parser.add_argument("--save-baseline", type=Path, help="зберегти результати як нову базу")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="допустиме погіршення (частка)")
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        print("Для бенчмарку потрібен httpx: pip install httpx", file=sys.stderr)
+        return 2
+
+    from ..mcp_server import SUPPORTED_ACTIONS
+
+    workloads = list(SUPPORTED_ACTIONS) + ["mixed"] if args.workload == "all" else [args.workload]
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="ebpro-bench-") as tmp:
+        workdir = Path(tmp)
+        app = _setup(args.latency, workdir, args.lookup_latency)
+        try:
+            for workload in workloads:
+                key = f"{args.mode}:{workload}:c{args.clients}"
+                results[key] = asyncio.run(
+                    run_scenario(app, args.mode, workload, args.requests, args.clients, args.seed, workdir)
+                )
+                summary = results[key]
+                print(
+                    f"{key:40s} rps={summary['rps']:8.1f} p50={summary['p50']:7.2f} "
+                    f"p95={summary['p95']:7.2f} p99={summary['p99']:7.2f} errors={summary['errors']}"
+                )
+                for stage, values in summary["stages"].items():
+                    print(
+                        f"    {stage:10s} p50={values['p50']:8.3f} p95={values['p95']:8.3f} p99={values['p99']:8.3f}"
+                    )
+        finally:
+            set_backend(None)
+            ebpro_actions.get_session().invalidate()
+            ebpro_actions._MACRO_STORE = None
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Базу збережено у {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print("РЕГРЕСІЯ:", line, file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Контентно-адресований кеш артефактів збірки EXOB/CXOB."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+LOGGER = logging.getLogger("ebpro.build_cache")
+
+INDEX_NAME = "index.json"
+_CHUNK = 1024 * 1024
+
+
+class BuildCache:
+    """Сховище артефактів збірки з ключем за хешем проєкту та налаштувань.
+
+    Об'єкти лежать у ``<root>/objects/<ab>/<key><suffix>``, а ``index.json``
+    зберігає розмір і час останнього використання для LRU-витіснення за
+    сумарним розміром ``max_bytes``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._digests: Dict[str, Tuple[int, int, str]] = {}
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+
+    # --- ключі -----------------------------------------------------------
+
+    def _file_digest(self, path: Path) -> str:
+        """SHA-256 файлу; повторно не рахується, поки не змінились розмір і mtime."""
+
+        stat = path.stat()
+        cached = self._digests.get(str(path))
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+        digest = hashlib.sha256()
+        with path.open("rb") as fp:
+            for chunk in iter(lambda: fp.read(_CHUNK), b""):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        self._digests[str(path)] = (stat.st_size, stat.st_mtime_ns, value)
+        return value
+
+    def key(self, project: Path, settings: Optional[Dict[str, Any]] = None) -> str:
+        """Ключ кешу: вміст проєкту плюс налаштування, що впливають на збірку."""
+
+        payload = json.dumps(
+            {"project": self._file_digest(Path(project)), "settings": settings or {}},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # --- індекс ----------------------------------------------------------
+
+    def _index_path(self) -> Path:
+        return self.root / INDEX_NAME
+
+    def _object_path(self, key: str, suffix: str) -> Path:
+        return self.root / "objects" / key[:2] / f"{key}{suffix}"
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with self._index_path().open("r", encoding="utf-8") as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            LOGGER.warning("Індекс кешу збірки пошкоджено, починаємо з порожнього.")
+            return {}
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._index_path().with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fp:
+            json.dump(self._index, fp, ensure_ascii=False)
+        tmp_path.replace(self._index_path())
+
+    # --- операції --------------------------------------------------------
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Повертає шлях до збереженого артефакту або None (рахує hit/miss)."""
+
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                path = self._object_path(key, entry["suffix"])
+                if path.exists():
+                    entry["last_used"] = time.time()
+                    self.hits += 1
+                    self._save_index()
+                    return path
+                del self._index[key]
+            self.misses += 1
+            return None
+
+    def store(self, key: str, artifact: Path, **meta: Any) -> Path:
+        """Копіює артефакт у сховище та за потреби витісняє найстаріші записи."""
+
+        artifact = Path(artifact)
+        with self._lock:
+            target = self._object_path(key, artifact.suffix)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(artifact, target)
+            self._index[key] = {
+                "suffix": artifact.suffix,
+                "size": target.stat().st_size,
+                "last_used": time.time(),
+                **meta,
+            }
+            self._evict()
+            self._save_index()
+            LOGGER.info("Артефакт %s збережено у кеші збірки (%s).", artifact.name, key[:12])
+            return target
+
+    def _evict(self) -> None:
+        total = sum(entry["size"] for entry in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            self._object_path(key, entry["suffix"]).unlink(missing_ok=True)
+            total -= entry["size"]
+            del self._index[key]
+            LOGGER.info("Артефакт %s витіснено з кешу збірки.", key[:12])
+
+    def stats(self) -> Dict[str, Any]:
+        """Лічильники та заповненість кешу."""
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "bytes": sum(entry["size"] for entry in self._index.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+__all__ = ["BuildCache"]
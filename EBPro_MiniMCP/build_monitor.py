@@ -0,0 +1,270 @@
+"""Відстеження збірки EXOB/CXOB: вивід компілятора, артефакт, підсумок.
+
+Завершення збірки визначається за підсумковим рядком компілятора
+(``N error(s), M warning(s)``) у вікні збірки EBPro або у файлі журналу, а за
+його відсутності — за появою артефакту, розмір якого перестав змінюватись.
+Журнал читається інкрементно: кожна перевірка обробляє лише дописані байти.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .progress import report
+
+LOGGER = logging.getLogger("ebpro.build_monitor")
+
+LEVEL_ERROR = "error"
+LEVEL_WARNING = "warning"
+
+SUMMARY_RE = re.compile(
+    r"(\d+)\s*(?:error|errors|error\(s\)|помил\w*)\s*[,;]\s*(\d+)\s*(?:warning|warnings|warning\(s\)|попереджен\w*)",
+    re.IGNORECASE,
+)
+_LEVEL_PATTERNS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    (LEVEL_ERROR, re.compile(r"(^\W*(?:error|помилка)\b)|(\b(?:error|помилка)\s*[A-Za-z]*\d*\s*:)", re.IGNORECASE)),
+    (LEVEL_WARNING, re.compile(r"(^\W*(?:warning|попередження)\b)|(\b(?:warning|попередження)\s*[A-Za-z]*\d*\s*:)", re.IGNORECASE)),
+)
+
+
+def classify_line(line: str) -> Optional[str]:
+    """Рівень рядка виводу компілятора: error, warning або None."""
+
+    if SUMMARY_RE.search(line):
+        return None
+    for level, pattern in _LEVEL_PATTERNS:
+        if pattern.search(line):
+            return level
+    return None
+
+
+@dataclass
+class BuildResult:
+    """Підсумок збірки, що повертається клієнту."""
+
+    ok: bool
+    artifact: Optional[str] = None
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    duration: float = 0.0
+    cached: bool = False
+    # Чи підтверджено завершення (підсумком компілятора або стабільним артефактом).
+    confirmed: bool = True
+    # Пояснення для клієнта, якщо результат не підтверджено.
+    hint: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["duration"] = round(self.duration, 3)
+        return data
+
+
+class IncrementalLogReader:
+    """Читає лише нові рядки файлу журналу, що дописується.
+
+    Позиція зберігається між викликами; якщо файл став коротшим (ротація або
+    перезапис), читання починається спочатку. Незавершений останній рядок
+    повертається, коли файл перестав рости між двома перевірками.
+    """
+
+    def __init__(self, path: Path, encoding: str = "utf-8", from_end: bool = True):
+        self.path = Path(path)
+        self.encoding = encoding
+        self.offset = 0
+        self._partial = b""
+        if from_end:
+            try:
+                self.offset = self.path.stat().st_size
+            except OSError:
+                self.offset = 0
+
+    def read_lines(self) -> List[str]:
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return []
+        if size < self.offset:
+            LOGGER.info("Журнал збірки %s перезаписано, читаємо спочатку.", self.path)
+            self.offset = 0
+            self._partial = b""
+        if size == self.offset:
+            if not self._partial:
+                return []
+            data, self._partial = self._partial, b""
+            return [self._decode(data)]
+        with self.path.open("rb") as fp:
+            fp.seek(self.offset)
+            chunk = fp.read(size - self.offset)
+        self.offset += len(chunk)
+        *complete, self._partial = (self._partial + chunk).split(b"\n")
+        return [self._decode(line) for line in complete]
+
+    def _decode(self, data: bytes) -> str:
+        return data.decode(self.encoding, errors="replace").rstrip("\r")
+
+
+class OutputTextTracker:
+    """Виділяє нові рядки з повного тексту вікна, що дописується.
+
+    Якщо вже оброблені перший і останній рядки не на своїх місцях (вікно
+    очищено чи перестворено новою збіркою), увесь текст вважається новим.
+    """
+
+    def __init__(self) -> None:
+        self._seen = 0
+        self._edges: Tuple[str, str] = ("", "")
+
+    def feed(self, text: Optional[str]) -> List[str]:
+        if not text:
+            return []
+        lines = [line for line in text.splitlines() if line.strip()]
+        if self._seen and (len(lines) < self._seen or (lines[0], lines[self._seen - 1]) != self._edges):
+            self._seen = 0
+        new = lines[self._seen :]
+        if lines:
+            self._seen = len(lines)
+            self._edges = (lines[0], lines[-1])
+        return new
+
+
+class BuildMonitor:
+    """Одна перевірка стану збірки на виклик ``poll`` (для ``wait_until``).
+
+    ``output`` повертає поточний текст вікна збірки (або None), ``log`` —
+    інкрементний читач журналу. Артефакт зараховується лише новіший за
+    ``started`` (epoch-секунди). Якщо підсумок без помилок уже є, а артефакт
+    не з'явився за ``summary_grace`` секунд, збірка вважається завершеною
+    без артефакту, але непідтвердженою (``confirmed=False`` з ``hint``).
+    """
+
+    def __init__(
+        self,
+        artifacts: Sequence[Path],
+        started: float,
+        output: Optional[Callable[[], Optional[str]]] = None,
+        log: Optional[IncrementalLogReader] = None,
+        stable_for: float = 0.5,
+        summary_grace: float = 2.0,
+    ):
+        self.artifacts = [Path(path) for path in artifacts]
+        self.started = started
+        self.output = output
+        self.log = log
+        self.stable_for = stable_for
+        self.summary_grace = summary_grace
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.summary: Optional[Tuple[int, int]] = None
+        self._summary_at: Optional[float] = None
+        self._tracker = OutputTextTracker()
+        self._sizes: Dict[Path, Tuple[int, float]] = {}
+        self._monotonic_start = time.monotonic()
+
+    def prime(self) -> None:
+        """Пропускає текст, що вже є у вікні збірки до її запуску."""
+
+        if self.output is not None:
+            try:
+                self._tracker.feed(self.output())
+            except Exception:
+                LOGGER.debug("Вікно збірки недоступне до запуску.", exc_info=True)
+
+    def _new_lines(self) -> List[str]:
+        lines: List[str] = []
+        if self.log is not None:
+            lines.extend(self.log.read_lines())
+        if self.output is not None:
+            try:
+                lines.extend(self._tracker.feed(self.output()))
+            except Exception:
+                LOGGER.debug("Вивід збірки поки недоступний.", exc_info=True)
+        return lines
+
+    def _consume(self, lines: Sequence[str]) -> None:
+        for line in lines:
+            summary = SUMMARY_RE.search(line)
+            if summary:
+                self.summary = (int(summary.group(1)), int(summary.group(2)))
+                if self._summary_at is None:
+                    self._summary_at = time.monotonic()
+                continue
+            level = classify_line(line)
+            if level is None:
+                continue
+            text = line.strip()
+            (self.errors if level == LEVEL_ERROR else self.warnings).append(text)
+            report("diagnostic", level=level, text=text)
+
+    def _artifact(self, require_stable: bool) -> Optional[Path]:
+        now = time.monotonic()
+        for candidate in self.artifacts:
+            try:
+                stat = candidate.stat()
+            except OSError:
+                continue
+            if stat.st_mtime < self.started:
+                continue
+            previous = self._sizes.get(candidate)
+            if previous is None or previous[0] != stat.st_size:
+                self._sizes[candidate] = (stat.st_size, now)
+                report("file", state="appeared" if previous is None else "growing", path=str(candidate), size=stat.st_size)
+                if require_stable:
+                    continue
+            if stat.st_size > 0 and (not require_stable or now - self._sizes[candidate][1] >= self.stable_for):
+                return candidate
+        return None
+
+    def result(
+        self, artifact: Optional[Path] = None, confirmed: bool = True, hint: Optional[str] = None
+    ) -> BuildResult:
+        return BuildResult(
+            ok=not self.errors and not (self.summary and self.summary[0]),
+            artifact=str(artifact) if artifact is not None else None,
+            errors=list(self.errors),
+            warnings=list(self.warnings),
+            duration=time.monotonic() - self._monotonic_start,
+            confirmed=confirmed,
+            hint=hint,
+        )
+
+    def poll(self) -> Optional[BuildResult]:
+        """Повертає результат, якщо збірка завершилась, інакше None."""
+
+        self._consume(self._new_lines())
+        if self.summary is not None and self.summary[0] > 0:
+            return self.result()
+        # Підсумок без помилок означає, що компілятор уже дописав артефакт.
+        artifact = self._artifact(require_stable=self.summary is None)
+        if artifact is not None:
+            report("file", state="stable", path=str(artifact), size=self._sizes[artifact][0])
+            return self.result(artifact)
+        if self._summary_at is not None and (
+            not self.artifacts or time.monotonic() - self._summary_at >= self.summary_grace
+        ):
+            if not self.artifacts:
+                return self.result(
+                    confirmed=False,
+                    hint="Шлях проєкту невідомий, артефакт не перевірено. Відкрийте проєкт через open_project.",
+                )
+            expected = ", ".join(map(str, self.artifacts))
+            LOGGER.warning("Підсумок збірки є, але артефакт не з'явився: %s.", expected)
+            return self.result(
+                confirmed=False,
+                hint=f"Компілятор завершив без помилок, але артефакту немає ({expected}). "
+                "Якщо EBPro пише його в інший каталог, задайте BUILD_ARTIFACT_DIR у config.json.",
+            )
+        return None
+
+
+__all__ = [
+    "BuildMonitor",
+    "BuildResult",
+    "IncrementalLogReader",
+    "OutputTextTracker",
+    "SUMMARY_RE",
+    "classify_line",
+]
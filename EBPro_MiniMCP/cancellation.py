@@ -0,0 +1,122 @@
+"""Кооперативне скасування завдань: токен, дедлайн і безпечні точки.
+
+GUI-дію не можна безпечно перервати посеред кліку, тому код дій лише
+викликає ``checkpoint()`` у безпечних місцях (між кроками, у циклах
+очікування). Токен поточного завдання береться з контексту, який
+встановлює черга (``bind_token``); вкладені завдання (пул -> локальна
+черга) успадковують скасування та дедлайн батьківського.
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+REASON_CANCELLED = "cancelled"
+REASON_DEADLINE = "deadline"
+
+_TOKEN: contextvars.ContextVar[Optional["CancelToken"]] = contextvars.ContextVar("ebpro_cancel", default=None)
+
+
+class JobCancelled(Exception):
+    """Завдання скасовано через /jobs/{id}/cancel або через перевищення дедлайну."""
+
+    def __init__(self, reason: str = REASON_CANCELLED):
+        if reason == REASON_DEADLINE:
+            message = "Завдання не встигло виконатися до дедлайну й було зупинене."
+            self.hint = "Збільште timeout запиту або зменште навантаження на чергу."
+        else:
+            message = "Завдання скасовано."
+            self.hint = "Повторіть запит, якщо дія все ще потрібна."
+        super().__init__(message)
+        self.reason = reason
+
+
+class CancelToken:
+    """Прапорець скасування з необов'язковим дедлайном (epoch-секунди)."""
+
+    def __init__(self, deadline: Optional[float] = None, parent: Optional["CancelToken"] = None):
+        if parent is not None and parent.deadline is not None:
+            deadline = parent.deadline if deadline is None else min(deadline, parent.deadline)
+        self.deadline = deadline
+        self.parent = parent
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = REASON_CANCELLED) -> bool:
+        """Позначає завдання скасованим; False, якщо це вже сталося раніше."""
+
+        if self._event.is_set():
+            return False
+        self.reason = reason
+        self._event.set()
+        return True
+
+    @property
+    def requested(self) -> bool:
+        """Чи просили скасувати явно (без урахування дедлайну)."""
+
+        return self._event.is_set() or (self.parent is not None and self.parent.requested)
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self.parent is not None and self.parent.cancelled:
+            self.cancel(self.parent.reason or REASON_CANCELLED)
+            return True
+        if self.deadline is not None and time.time() >= self.deadline:
+            self.cancel(REASON_DEADLINE)
+            return True
+        return False
+
+    def remaining(self) -> Optional[float]:
+        """Скільки секунд лишилось до дедлайну (None — без дедлайну)."""
+
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.time(), 0.0)
+
+    def check(self) -> None:
+        """Піднімає ``JobCancelled``, якщо завдання треба зупинити."""
+
+        if self.cancelled:
+            raise JobCancelled(self.reason or REASON_CANCELLED)
+
+
+def current_token() -> Optional[CancelToken]:
+    """Токен завдання, у межах якого виконується поточний код."""
+
+    return _TOKEN.get()
+
+
+@contextmanager
+def bind_token(token: Optional[CancelToken]) -> Iterator[None]:
+    """Робить ``token`` поточним для ``checkpoint`` всередині блоку."""
+
+    previous = _TOKEN.set(token)
+    try:
+        yield
+    finally:
+        _TOKEN.reset(previous)
+
+
+def checkpoint() -> None:
+    """Безпечна точка: зупиняє дію, якщо її завдання скасовано або дедлайн минув."""
+
+    token = _TOKEN.get()
+    if token is not None:
+        token.check()
+
+
+__all__ = [
+    "CancelToken",
+    "JobCancelled",
+    "REASON_CANCELLED",
+    "REASON_DEADLINE",
+    "bind_token",
+    "checkpoint",
+    "current_token",
+]
@@ -0,0 +1,156 @@
+"""Об'єднання однакових запитів у польоті та ключі ідемпотентності."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from .ebpro_actions import FriendlyError
+from .jobs import Job, Runner
+
+LOGGER = logging.getLogger("ebpro.coalescing")
+
+OUTCOME_NEW = "new"
+OUTCOME_COALESCED = "coalesced"
+OUTCOME_REPLAYED = "replayed"
+
+
+class IdempotencyConflict(FriendlyError):
+    """Ключ ідемпотентності вже використано для іншої дії чи інших параметрів."""
+
+
+@dataclass
+class CoalescedJob:
+    """Завдання, до якого приєднався запит, і як саме (new/coalesced/replayed).
+
+    ``artifact`` — дані в пам'яті, спільні для всіх учасників (наприклад,
+    байти знімка), які не потрапляють у ``Job.result`` та /jobs.
+    """
+
+    job: Job
+    outcome: str
+    artifact: Any = None
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    job: Job
+    artifact: Any
+    expires_at: Optional[float] = None
+
+
+def fingerprint(action: str, params: Dict[str, Any], session: Optional[str] = None) -> str:
+    """Стабільний відбиток дії, параметрів і сесії клієнта (порядок ключів не важливий)."""
+
+    payload = json.dumps([action, params, session], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RequestCoalescer:
+    """Дає однаковим запитам одне виконання GUI-дії та один результат.
+
+    Поки завдання з тим самим відбитком (дія + параметри після розбору) у
+    черзі чи виконується, нові такі самі запити чекають на нього замість
+    постановки ще одного. Запит з ключем ідемпотентності після успішного
+    завершення ще ``ttl`` секунд отримує збережений результат; невдалі
+    завдання ключ не займають, тож повтор виконає дію знову.
+    """
+
+    def __init__(self, ttl: float = 600.0, max_keys: int = 1024, coalesce: bool = True):
+        self.ttl = ttl
+        self.coalesce = coalesce
+        self.max_keys = max_keys
+        # RLock: колбек завершення може викликатися синхронно всередині submit.
+        self._lock = threading.RLock()
+        self._inflight: Dict[str, _Entry] = {}
+        self._keys: "OrderedDict[str, _Entry]" = OrderedDict()
+
+    def submit(
+        self,
+        dispatcher: Any,
+        action: str,
+        params: Dict[str, Any],
+        runner: Optional[Runner] = None,
+        idempotency_key: Optional[str] = None,
+        artifact: Any = None,
+        priority: Optional[int] = None,
+        deadline: Optional[float] = None,
+        session: Optional[str] = None,
+    ) -> CoalescedJob:
+        """Повертає наявне завдання для таких самих запитів або ставить нове.
+
+        ``priority`` і ``deadline`` застосовуються лише до нового завдання.
+        Запити різних сесій (``session``) не об'єднуються: у пулі воркерів
+        кожна з них працює з власним відкритим проєктом.
+        """
+
+        digest = fingerprint(action, params, session)
+        with self._lock:
+            self._expire()
+            if idempotency_key:
+                keyed = self._keys.get(idempotency_key)
+                if keyed is not None:
+                    if keyed.fingerprint != digest:
+                        raise IdempotencyConflict(
+                            f"Ключ ідемпотентності {idempotency_key} вже використано для іншого запиту.",
+                            "Згенеруйте новий Idempotency-Key для кожної окремої команди.",
+                        )
+                    outcome = OUTCOME_REPLAYED if keyed.job.future.done() else OUTCOME_COALESCED
+                    return CoalescedJob(keyed.job, outcome, keyed.artifact)
+
+            entry = self._inflight.get(digest) if self.coalesce else None
+            outcome = OUTCOME_COALESCED
+            if entry is None:
+                job = dispatcher.submit(
+                    action, params, runner=runner, priority=priority, deadline=deadline, session=session
+                )
+                entry = _Entry(digest, job, artifact)
+                if self.coalesce:
+                    self._inflight[digest] = entry
+                outcome = OUTCOME_NEW
+            else:
+                LOGGER.info("Запит %s приєднано до завдання %s, що вже виконується.", action, entry.job.id)
+            if idempotency_key:
+                self._keys[idempotency_key] = entry
+                self._keys.move_to_end(idempotency_key)
+                while len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+            if outcome == OUTCOME_NEW:
+                entry.job.future.add_done_callback(lambda _future, entry=entry: self._finished(entry))
+            return CoalescedJob(entry.job, outcome, entry.artifact)
+
+    def _finished(self, entry: _Entry) -> None:
+        with self._lock:
+            if self._inflight.get(entry.fingerprint) is entry:
+                del self._inflight[entry.fingerprint]
+            if entry.job.future.exception() is not None:
+                for key in [key for key, value in self._keys.items() if value is entry]:
+                    del self._keys[key]
+                return
+            entry.expires_at = time.monotonic() + self.ttl
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, entry in self._keys.items() if entry.expires_at is not None and entry.expires_at <= now]:
+            del self._keys[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"inflight": len(self._inflight), "keys": len(self._keys)}
+
+
+__all__ = [
+    "CoalescedJob",
+    "IdempotencyConflict",
+    "OUTCOME_COALESCED",
+    "OUTCOME_NEW",
+    "OUTCOME_REPLAYED",
+    "RequestCoalescer",
+    "fingerprint",
+]
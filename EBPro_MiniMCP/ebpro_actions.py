@@ -1,35 +1,64 @@
 """Набір обгорток для автоматизації дій у EasyBuilder Pro."""
 from __future__ import annotations
 
+import functools
+import importlib
+import io
 import json
+import locale
 import logging
 import os
+import shutil
 import subprocess
 import sys
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import MISSING, dataclass, field, fields
 from pathlib import Path
-from typing import Iterable, Optional
-
-try:
-    from pywinauto import Desktop
-    from pywinauto.application import Application
-    from pywinauto.findwindows import ElementNotFoundError
-except Exception:  # pragma: no cover - середовище Linux під час тестів
-    Desktop = None  # type: ignore
-    Application = None  # type: ignore
-    ElementNotFoundError = Exception  # type: ignore
-
-try:
-    from PIL import ImageGrab
-except Exception:  # pragma: no cover - Pillow може не мати ImageGrab на Linux
-    ImageGrab = None  # type: ignore
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .ahk_worker import AhkTimeoutError, AhkWorker, AhkWorkerError
+from .build_cache import BuildCache
+from .build_monitor import BuildMonitor, BuildResult, IncrementalLogReader
+from .cancellation import JobCancelled, checkpoint
+from .locators import SCOPE_POPUP, SCOPE_WINDOW, ElementLocator, Layout, MenuLocatorCache, SelectorRegistry
+from .logging_setup import VERBOSE
+from .macros import STEP_DIALOG, STEP_MENU, MacroStep, MacroStore, current_run, macro_scope
+from .metrics import stage
+from .project_index import ProjectIndex
+from .progress import report
 
 LOGGER = logging.getLogger("ebpro.actions")
 BASE_DIR = Path(__file__).resolve().parent
 CONFIG_PATH = BASE_DIR / "config.json"
 
 
+@functools.lru_cache(maxsize=None)
+def _optional_module(name: str) -> Any:
+    """Імпортує важку залежність (pywinauto, Pillow) при першому використанні.
+
+    Повертає None, якщо модуль недоступний (наприклад, pywinauto на Linux).
+    Імпорт comtypes/UIA займає секунди, тож на старті сервісу його не робимо.
+    """
+
+    try:
+        return importlib.import_module(name)
+    except Exception:  # pragma: no cover - залежить від середовища
+        return None
+
+
+def _pywinauto(name: str = "pywinauto") -> Any:
+    """Модуль pywinauto (або його підмодуль); FriendlyError, якщо його немає."""
+
+    module = _optional_module(name)
+    if module is None:
+        raise FriendlyError(
+            "pywinauto недоступна у середовищі.",
+            "Переконайтеся, що пакети pywinauto та залежності встановлені у Windows.",
+        )
+    return module
+
+
 class FriendlyError(RuntimeError):
     """Спеціальний виняток з дружнім підказуванням для користувача."""
 
@@ -49,6 +78,81 @@ class EBProConfig:
     EBPRO_WINDOW_TITLE: str
     API_TOKEN: str
     AUTOHOTKEY_EXE: str
+    # Верхні межі очікувань (секунди); фактичне очікування завершується раніше.
+    EBPRO_START_TIMEOUT: float = 60.0
+    DIALOG_TIMEOUT: float = 10.0
+    SIMULATOR_TIMEOUT: float = 30.0
+    WAIT_MAX_INTERVAL: float = 0.5
+    BUILD_TIMEOUT: float = 300.0
+    # Скільки чекати артефакт після підсумку компілятора без помилок.
+    BUILD_SUMMARY_GRACE: float = 2.0
+    # Каталог, куди EBPro кладе EXOB/CXOB; порожній — поруч із проєктом.
+    BUILD_ARTIFACT_DIR: str = ""
+    # Вивід компілятора: вікно збірки EBPro і (за наявності) файл журналу, що дописується.
+    BUILD_WINDOW_TITLE_RE: str = r"^(Compile|Build|Компіляція|Збірка)\b.*"
+    BUILD_LOG_PATH: str = ""
+    BUILD_LOG_ENCODING: str = "utf-8"
+    # Кеш артефактів збірки; порожній BUILD_CACHE_DIR означає <пакет>/cache/builds.
+    BUILD_CACHE_ENABLED: bool = True
+    BUILD_CACHE_DIR: str = ""
+    BUILD_CACHE_MAX_MB: int = 2048
+    # Пул воркерів; порожній список — одна локальна сесія EBPro.
+    WORKERS: List[Dict[str, Any]] = field(default_factory=list)
+    # pywinauto — справжня EBPro; simulated — GUI у пам'яті (Linux CI, бенчмарки).
+    AUTOMATION_BACKEND: str = "pywinauto"
+    SIMULATED_LATENCY: float = 0.0
+    SIMULATED_FAIL_RATE: float = 0.0
+    # Вартість повного пошуку елемента в імітації (секунди), якого уникає відтворення макросу.
+    SIMULATED_LOOKUP_LATENCY: float = 0.0
+    # Логування: text або json, ротація за розміром/часом, проріджування докладних записів.
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"
+    LOG_MAX_MB: int = 50
+    LOG_ROTATE_HOURS: float = 24.0
+    LOG_BACKUP_COUNT: int = 14
+    LOG_COMPRESS: bool = True
+    LOG_SAMPLE_RATE: float = 1.0
+    # Прогрів на старті: імпорти, запуск EBPro і пошук головного вікна до /ready.
+    WARMUP_ON_START: bool = False
+    # Постійний помічник AutoHotkey для fallback; порожній AHK_WORKER_SCRIPT — gui_fallback/ahk_worker.ahk.
+    AHK_WORKER_ENABLED: bool = True
+    AHK_WORKER_SCRIPT: str = ""
+    AHK_START_TIMEOUT: float = 10.0
+    AHK_COMMAND_TIMEOUT: float = 15.0
+    # Вивчені селектори діалогів; порожній шлях — <пакет>/cache/selectors.json.
+    SELECTOR_REGISTRY_PATH: str = ""
+    # Швидкий шлях діалогів: ввести шлях і натиснути Enter без пошуку кнопки.
+    DIALOG_KEYBOARD_INPUT: bool = False
+    # Макроси дій: записані кроки відтворюються без пошуку; порожній шлях — %LOCALAPPDATA%/EBPro_MiniMCP/macros.json.
+    MACROS_ENABLED: bool = True
+    MACRO_STORE_PATH: str = ""
+    # Профіль макросів; порожні значення визначаються за EBPro.exe та мовою інтерфейсу Windows.
+    EBPRO_VERSION: str = ""
+    EBPRO_LOCALE: str = ""
+    # Однакові запити в польоті виконуються один раз; результати за Idempotency-Key живуть TTL секунд.
+    COALESCE_REQUESTS: bool = True
+    IDEMPOTENCY_TTL: float = 600.0
+    # Скільки чекати, поки *.ecmp допишеться, якщо пакування запущено з очікуванням (wait).
+    PACK_TIMEOUT: float = 120.0
+    # Теки з проєктами для "відкрий проєкт pump"; порожній PROJECT_INDEX_PATH — <пакет>/cache/projects.json.
+    PROJECT_ROOTS: List[str] = field(default_factory=list)
+    PROJECT_INDEX_PATH: str = ""
+    PROJECT_INDEX_MAX_AGE: float = 300.0
+    # Візуальна регресія: каталог для відносних шляхів baseline та типові допуски порівняння.
+    BASELINE_DIR: str = ""
+    DIFF_TOLERANCE: int = 8
+    DIFF_MAX_RATIO: float = 0.0
+    DIFF_PHASH_DISTANCE: int = 20
+    DIFF_WORKERS: int = 0
+    # Клас пріоритету дії в черзі (interactive/normal/batch); не вказані дії — normal.
+    ACTION_PRIORITIES: Dict[str, str] = field(
+        default_factory=lambda: {
+            "take_screenshot": "interactive",
+            "build_exob": "batch",
+            "pack_ecmp": "batch",
+            "batch": "batch",
+        }
+    )
 
     @property
     def ebpro_path(self) -> Path:
@@ -60,6 +164,27 @@ class EBProConfig:
 _CONFIG_CACHE: Optional[EBProConfig] = None
 
 
+def _coerce_config_values(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Приводить рядкові значення (зі змінних середовища) до типу за замовчуванням."""
+
+    coerced = dict(data)
+    for item in fields(EBProConfig):
+        if item.name not in coerced:
+            continue
+        value = coerced[item.name]
+        if item.default_factory is not MISSING and isinstance(value, str):
+            coerced[item.name] = json.loads(value) if value.strip() else item.default_factory()
+            continue
+        if item.default is MISSING:
+            continue
+        default = item.default
+        if isinstance(default, bool) and isinstance(value, str):
+            coerced[item.name] = value.strip().lower() in ("1", "true", "yes", "on")
+        elif isinstance(default, (int, float)) and not isinstance(default, bool):
+            coerced[item.name] = type(default)(value)
+    return coerced
+
+
 def load_config() -> EBProConfig:
     """Завантажує конфігурацію з файлу та накладає змінні середовища."""
 
@@ -71,7 +196,7 @@ def load_config() -> EBProConfig:
         data = json.load(fp)
 
     # Змінні середовища мають пріоритет (EBPRO_MCP_<KEY> або просто <KEY>).
-    for key in list(data.keys()):
+    for key in set(data.keys()) | {item.name for item in fields(EBProConfig)}:
         env_key = f"EBPRO_MCP_{key}"
         if env_key in os.environ:
             data[key] = os.environ[env_key]
@@ -79,7 +204,7 @@ def load_config() -> EBProConfig:
         if key in os.environ:
             data[key] = os.environ[key]
 
-    _CONFIG_CACHE = EBProConfig(**data)
+    _CONFIG_CACHE = EBProConfig(**_coerce_config_values(data))
     return _CONFIG_CACHE
 
 
@@ -91,61 +216,937 @@ def _ensure_windows_environment() -> None:
             "Керування вікнами доступне лише на Windows.",
             "Запустіть сервіс на Windows 10/11 з встановленою EasyBuilder Pro.",
         )
-    if Application is None or Desktop is None:
-        raise FriendlyError(
-            "pywinauto недоступна у середовищі.",
-            "Переконайтеся, що пакети pywinauto та залежності встановлені у Windows.",
-        )
+    _pywinauto()
+    _pywinauto("pywinauto.application")
 
 
-def _connect_to_ebpro_window(title: str):
-    """Повертає вікно EBPro за частиною заголовка."""
+class WaitTimeoutError(FriendlyError):
+    """Умова очікування не виконалась за відведений час."""
+
+
+@dataclass
+class WaitResult:
+    """Результат очікування: знайдене значення, фактичний час і кількість перевірок."""
+
+    value: Any
+    elapsed: float
+    attempts: int
+
+
+def wait_until(
+    condition: Callable[[], Any],
+    timeout: float,
+    description: str,
+    hint: Optional[str] = None,
+    initial_interval: float = 0.05,
+    max_interval: Optional[float] = None,
+    backoff: float = 1.5,
+) -> WaitResult:
+    """Опитує ``condition`` до першого істинного значення з адаптивною паузою.
+
+    Пауза між перевірками зростає від ``initial_interval`` до ``max_interval``,
+    тож швидкі події ловляться майже миттєво, а довгі не навантажують CPU.
+    Винятки всередині умови вважаються ознакою "ще не готово"; кожна
+    перевірка — безпечна точка для скасування завдання.
+    """
+
+    if max_interval is None:
+        max_interval = load_config().WAIT_MAX_INTERVAL
+    started = time.monotonic()
+    deadline = started + timeout
+    interval = initial_interval
+    attempts = 0
+    while True:
+        checkpoint()
+        attempts += 1
+        try:
+            value = condition()
+        except JobCancelled:
+            raise
+        except Exception:
+            value = None
+        now = time.monotonic()
+        if value:
+            elapsed = now - started
+            LOGGER.debug(
+                "Очікування '%s' завершено за %.2f с (%s перевірок).", description, elapsed, attempts, extra=VERBOSE
+            )
+            return WaitResult(value=value, elapsed=elapsed, attempts=attempts)
+        if now >= deadline:
+            raise WaitTimeoutError(
+                f"Не дочекалися: {description} (ліміт {timeout:.0f} с).",
+                hint or "Збільште відповідний *_TIMEOUT у config.json або перевірте стан EBPro.",
+            )
+        time.sleep(min(interval, max(deadline - now, 0.0)))
+        interval = min(interval * backoff, max_interval)
+
+
+def _ready_wrapper(spec: Any) -> Any:
+    """Повертає обгортку вікна, якщо воно існує, видиме та активне."""
+
+    if not spec.exists(timeout=0):
+        return None
+    wrapper = spec.wrapper_object()
+    if wrapper.is_visible() and wrapper.is_enabled():
+        return wrapper
+    return None
+
+
+def wait_for_window(spec: Any, timeout: float, description: str, hint: Optional[str] = None) -> WaitResult:
+    """Чекає, поки вікно за специфікацією pywinauto стане готовим до взаємодії."""
+
+    return wait_until(lambda: _ready_wrapper(spec), timeout, description, hint)
+
+
+def wait_for_window_closed(spec: Any, timeout: float, description: str, hint: Optional[str] = None) -> WaitResult:
+    """Чекає, поки вікно (наприклад, діалог) зникне."""
+
+    return wait_until(lambda: not spec.exists(timeout=0), timeout, description, hint)
+
+
+def wait_for_file(
+    path: Any,
+    timeout: float,
+    stable_for: float = 0.5,
+    newer_than: Optional[float] = None,
+) -> WaitResult:
+    """Чекає появи файлу, розмір якого не змінюється протягом ``stable_for`` секунд.
+
+    ``path`` може бути списком кандидатів (наприклад, .exob та .cxob) — повертається
+    перший стабільний. ``newer_than`` відсіює старі файли за mtime (epoch-секунди).
+    Поява, зміни розміру та стабілізація файлу повідомляються як події прогресу.
+    """
+
+    candidates = [Path(item) for item in path] if isinstance(path, (list, tuple)) else [Path(path)]
+    state: Dict[Path, Tuple[int, float]] = {}
+
+    def _stable() -> Optional[Path]:
+        now = time.monotonic()
+        for candidate in candidates:
+            if not candidate.exists():
+                continue
+            stat = candidate.stat()
+            if newer_than is not None and stat.st_mtime < newer_than:
+                continue
+            previous = state.get(candidate)
+            if previous is None or previous[0] != stat.st_size:
+                state[candidate] = (stat.st_size, now)
+                report("file", state="appeared" if previous is None else "growing", path=str(candidate), size=stat.st_size)
+                continue
+            if stat.st_size > 0 and now - previous[1] >= stable_for:
+                return candidate
+        return None
+
+    result = wait_until(
+        _stable,
+        timeout,
+        "файл " + " або ".join(str(candidate) for candidate in candidates),
+        "Перевірте, що EBPro має права на запис і шлях вказано правильно.",
+    )
+    report("file", state="stable", path=str(result.value), size=state[result.value][0], wait_ms=round(result.elapsed * 1000.0, 1))
+    return result
+
+
+class EBProSession:
+    """Кеш підключення до EBPro між запитами.
+
+    Зберігає підключений ``Application`` та обгортки вже знайдених вікон
+    (головне вікно, EasySimulator). Перед повторним використанням робиться
+    дешева перевірка, що процес і HWND ще живі; перепідключення та пошук
+    вікна по всьому робочому столу виконуються лише коли перевірка не пройшла.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._app: Any = None
+        self._app_path: Optional[str] = None
+        self._windows: Dict[str, Any] = {}
+        self.project_path: Optional[Path] = None
+
+    @staticmethod
+    def _app_alive(app: Any) -> bool:
+        try:
+            return bool(app.is_process_running())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _window_alive(wrapper: Any) -> bool:
+        try:
+            handle = wrapper.element_info.handle
+            handleprops = _optional_module("pywinauto.handleprops")
+            if handle and handleprops is not None and not handleprops.iswindow(handle):
+                return False
+            return bool(wrapper.is_visible())
+        except Exception:
+            return False
+
+    def cached_application(self, ebpro_path: Path) -> Any:
+        """Повертає збережений Application, якщо процес EBPro ще працює."""
+
+        with self._lock:
+            if self._app is None or self._app_path != str(ebpro_path):
+                return None
+            if self._app_alive(self._app):
+                return self._app
+            LOGGER.info("Процес EBPro завершився, скидаємо кеш сесії.")
+            self.invalidate()
+            return None
+
+    def remember_application(self, app: Any, ebpro_path: Path) -> None:
+        """Запам'ятовує підключений Application; кеш вікон скидається."""
+
+        with self._lock:
+            self._app = app
+            self._app_path = str(ebpro_path)
+            self._windows.clear()
+
+    def application(self) -> Any:
+        """Повертає підключений Application, за потреби запускаючи EBPro."""
+
+        config = load_config()
+        app = self.cached_application(config.ebpro_path)
+        if app is None:
+            run_ebpro()
+            app = self._app
+        return app
+
+    def window(self, title: str) -> Any:
+        """Повертає живу обгортку вікна, заголовок якого містить ``title``."""
+
+        with self._lock:
+            wrapper = self._windows.get(title)
+            if wrapper is not None:
+                if self._window_alive(wrapper):
+                    return wrapper
+                LOGGER.info("Вікно '%s' більше не існує, шукаємо заново.", title)
+                del self._windows[title]
+
+            _ensure_windows_environment()
+            desktop = _pywinauto().Desktop(backend="uia")
+            spec = desktop.window(title_re=rf".*{title}.*")
+            waited = wait_for_window(spec, load_config().DIALOG_TIMEOUT, f"вікно '{title}'")
+            LOGGER.info("Вікно '%s' знайдено за %.2f с.", title, waited.elapsed)
+            self._windows[title] = waited.value
+            return waited.value
+
+    def remember_window(self, title: str, wrapper: Any) -> None:
+        """Зберігає вже знайдену обгортку вікна, щоб не шукати її повторно."""
+
+        with self._lock:
+            self._windows[title] = wrapper
+
+    def invalidate(self) -> None:
+        """Скидає всі збережені обгортки, наступний запит перепідключиться."""
+
+        with self._lock:
+            self._app = None
+            self._app_path = None
+            self._windows.clear()
+            self.project_path = None
+
+
+_SESSION = EBProSession()
+
+
+def get_session() -> EBProSession:
+    """Повертає спільну сесію EBPro процесу."""
+
+    return _SESSION
+
+
+@dataclass(frozen=True)
+class DialogSpec:
+    """Опис стандартного файлового діалогу Windows (заголовок і кнопка підтвердження)."""
+
+    title_re: str
+    button_re: str
+    description: str
+    hint: str
+    # Ключ у реєстрі вивчених селекторів.
+    key: str = ""
+
+
+OPEN_DIALOG = DialogSpec(
+    title_re=r".*(Open|Відкрити).*",
+    button_re=r"(Open|Відкрити)",
+    description="діалог відкриття файлу",
+    hint="Перевірте локалізацію кнопок у open_project та налаштуйте селектори.",
+    key="open",
+)
+SAVE_DIALOG = DialogSpec(
+    title_re=r".*(Save As|Зберегти як).*",
+    button_re=r"(Save|Зберегти)",
+    description="діалог 'Save As'",
+    hint="Перевірте локалізацію діалогу 'Save As' та підлаштуйте селектори.",
+    key="save",
+)
+
+Rect = Tuple[int, int, int, int]
+
+
+class AutomationBackend:
+    """Інтерфейс низькорівневих GUI-операцій, з яких складаються дії Mini-MCP.
+
+    Реалізації: ``PywinautoBackend`` (реальна EBPro у Windows) та
+    ``SimulatedBackend`` (у пам'яті, для Linux CI та бенчмарків).
+    Бекенд вибирається параметром AUTOMATION_BACKEND у config.json.
+    """
+
+    name = "base"
+
+    def ensure_running(self, timeout: Optional[float] = None) -> None:
+        """Підключається до EBPro або запускає її."""
+
+        raise NotImplementedError
+
+    def focus_window(self, title: str) -> Any:
+        """Активує вікно, заголовок якого містить ``title``, і повертає його."""
+
+        raise NotImplementedError
+
+    def window_rect(self, title: str, focus: bool = True) -> Rect:
+        """Екранні координати вікна (left, top, right, bottom)."""
+
+        raise NotImplementedError
+
+    def menu_select(self, path: Sequence[str]) -> None:
+        """Вибирає пункт меню головного вікна EBPro."""
+
+        raise NotImplementedError
+
+    def fill_file_dialog(self, dialog: DialogSpec, path: Path) -> float:
+        """Вводить шлях у файловий діалог, підтверджує та чекає закриття.
+
+        Повертає час очікування закриття діалогу (секунди).
+        """
+
+        raise NotImplementedError
+
+    def wait_window(self, title: str, timeout: float, hint: Optional[str] = None) -> WaitResult:
+        """Чекає появи вікна з ``title`` у заголовку."""
+
+        raise NotImplementedError
+
+    def capture(self, bbox: Rect) -> Any:
+        """Повертає PIL-зображення прямокутника екрана."""
+
+        raise NotImplementedError
+
+    def run_ahk(self, command: str, script_path: Path, timeout: float) -> None:
+        """Виконує fallback-команду AutoHotkey (``script_path`` — окремий скрипт тієї ж дії)."""
+
+        raise NotImplementedError
+
+    def build_output(self) -> Optional[str]:
+        """Поточний текст вікна збірки EBPro (None, якщо вікна немає)."""
+
+        return None
+
+    def ui_profile(self) -> Tuple[str, str]:
+        """Версія EBPro та мова інтерфейсу — профіль, для якого записуються макроси."""
+
+        return ("unknown", "unknown")
+
+    def invalidate(self) -> None:
+        """Скидає кешовані підключення (після збою або перезапуску EBPro)."""
+
+
+# Типи елементів, що поводяться як пункти меню: класичне меню та стрічка (ribbon).
+MENU_CONTROL_TYPES = ("MenuItem", "TabItem", "Button", "SplitButton")
+
+
+def _window_dpi(handle: Any) -> int:
+    """DPI монітора вікна (0, якщо Windows API недоступний)."""
 
-    _ensure_windows_environment()
     try:
-        desktop = Desktop(backend="uia")
-        window = desktop.window(title_re=rf".*{title}.*")
-        window.wait("ready", timeout=10)
-        window.set_focus()
-        return window
-    except ElementNotFoundError as exc:  # type: ignore[arg-type]
-        raise FriendlyError(
-            f"Не знайдено вікно з назвою, що містить '{title}'.",
-            "Змініть SIMULATOR_WINDOW_TITLE/EBPRO_WINDOW_TITLE у config.json під свою локалізацію.",
-        ) from exc
+        import ctypes
 
+        return int(ctypes.windll.user32.GetDpiForWindow(handle))  # type: ignore[attr-defined]
+    except Exception:
+        return 0
 
-def run_ebpro(timeout: float = 20.0) -> None:
-    """Стартує EBPro.exe, якщо ще не запущено."""
 
-    config = load_config()
-    _ensure_windows_environment()
+def _layout_signature(window: Any) -> Layout:
+    """Розмір вікна та DPI: від них залежить розкладка стрічки та меню."""
+
+    rect = window.rectangle()
+    return (rect.width(), rect.height(), _window_dpi(window.element_info.handle))
+
+
+_SELECTOR_REGISTRY: Optional[SelectorRegistry] = None
+
+
+def get_selector_registry() -> SelectorRegistry:
+    """Реєстр селекторів діалогів, вивчених на цій машині."""
+
+    global _SELECTOR_REGISTRY
+    if _SELECTOR_REGISTRY is None:
+        path = load_config().SELECTOR_REGISTRY_PATH
+        _SELECTOR_REGISTRY = SelectorRegistry(Path(path) if path else BASE_DIR / "cache" / "selectors.json")
+    return _SELECTOR_REGISTRY
+
+
+def _keys_literal(text: str) -> str:
+    """Екранує спецсимволи type_keys (``{}+^%~()``), щоб текст вводився як є."""
+
+    return "".join(f"{{{char}}}" if char in "{}+^%~()" else char for char in text)
+
+
+def _find_dialog(app: Any, dialog: DialogSpec, variants: Sequence[Dict[str, str]]) -> Optional[Tuple[Any, str]]:
+    """Шукає діалог спершу за вивченими точними заголовками, потім за регуляркою."""
+
+    for variant in variants:
+        spec = app.window(title=variant["title"])
+        if _ready_wrapper(spec) is not None:
+            return spec, variant["title"]
+    spec = app.window(title_re=dialog.title_re)
+    wrapper = _ready_wrapper(spec)
+    if wrapper is not None:
+        return spec, wrapper.window_text()
+    return None
+
+
+# Поле "Ім'я файлу" стандартного діалогу Windows (поле пошуку теж є Edit).
+_FILE_NAME_EDIT_ID = "1148"
 
-    ebpro_path = config.ebpro_path
-    if not ebpro_path.exists():
-        raise FriendlyError(
-            f"Файл {ebpro_path} не знайдено.",
-            "Укажіть правильний шлях EBPRO_DIR/EBPRO_EXE у config.json.",
-        )
 
+def _dialog_edit(spec: Any, variants: Sequence[Dict[str, str]]) -> Tuple[Any, str]:
+    """Поле імені файлу: за вивченим або стандартним automation id, інакше перше Edit."""
+
+    learned = [variant.get("edit_auto_id") for variant in variants]
+    for auto_id in dict.fromkeys(learned + [_FILE_NAME_EDIT_ID]):
+        if auto_id:
+            edit = spec.child_window(auto_id=auto_id, control_type="Edit")
+            if edit.exists(timeout=0):
+                return edit, auto_id
+    edit = spec.child_window(control_type="Edit", found_index=0)
+    return edit, edit.wrapper_object().element_info.automation_id or ""
+
+
+def _dialog_button(spec: Any, dialog: DialogSpec, variants: Sequence[Dict[str, str]]) -> Tuple[Any, str]:
+    """Кнопка підтвердження: за вивченою назвою або за регуляркою діалогу."""
+
+    for title in dict.fromkeys(variant.get("button") for variant in variants):
+        if title:
+            button = spec.child_window(title=title, control_type="Button")
+            if button.exists(timeout=0):
+                return button, title
+    button = spec.child_window(title_re=dialog.button_re, control_type="Button", found_index=0)
+    return button, button.wrapper_object().window_text()
+
+
+def _file_version(path: Path) -> str:
+    """Версія файлу EBPro.exe (``6.9.1.262``) або ``unknown`` без pywin32."""
+
+    win32api = _optional_module("win32api")
+    if win32api is None or not path.exists():
+        return "unknown"
     try:
-        app = Application(backend="uia")  # type: ignore[call-arg]
-        app.connect(path=str(ebpro_path))
-        LOGGER.info("EBPro вже запущено, підключаємося до процесу.")
-        return
+        info = win32api.GetFileVersionInfo(str(path), "\\")
+        high, low = info["FileVersionMS"], info["FileVersionLS"]
+        return f"{high >> 16}.{high & 0xFFFF}.{low >> 16}.{low & 0xFFFF}"
     except Exception:
-        LOGGER.info("EBPro не знайдено серед процесів, запускаємо новий екземпляр.")
+        return "unknown"
+
+
+def _ui_locale() -> str:
+    """Мова інтерфейсу Windows (``uk_UA``), інакше локаль процесу."""
 
     try:
-        app = Application(backend="uia")  # type: ignore[call-arg]
-        app.start(str(ebpro_path))
-        app.wait_cpu_usage_lower(threshold=5.0, timeout=timeout)
-        LOGGER.info("EBPro успішно запущено.")
-    except Exception as exc:  # pragma: no cover - залежить від Windows
-        raise FriendlyError(
-            "Не вдалося стартувати EasyBuilder Pro.",
-            "Запустіть EBPro вручну та повторіть запит, або перевірте права доступу.",
-        ) from exc
+        import ctypes
+
+        language = int(ctypes.windll.kernel32.GetUserDefaultUILanguage())  # type: ignore[attr-defined]
+        return locale.windows_locale.get(language, str(language))
+    except Exception:
+        return locale.getlocale()[0] or "unknown"
+
+
+def _check_dialog_step(spec: Any, title: str, step: MacroStep, keyboard: bool) -> Optional[str]:
+    """Дешева перевірка кроку макросу для діалогу; повертає причину розбіжності або None."""
+
+    if title != step.expect:
+        return f"заголовок діалогу '{title}' замість '{step.expect}'"
+    if keyboard != ("keys" in step.data):
+        return "змінився спосіб введення (DIALOG_KEYBOARD_INPUT)"
+    if keyboard:
+        return None
+    if not spec.child_window(auto_id=step.data.get("edit_auto_id", ""), control_type="Edit").exists(timeout=0):
+        return "поле імені файлу не знайдено"
+    if not spec.child_window(title=step.data.get("button", ""), control_type="Button").exists(timeout=0):
+        return "кнопку підтвердження не знайдено"
+    return None
+
+
+def _activate_menu_element(element: Any, last: bool) -> None:
+    """Розкриває проміжний пункт або виконує кінцевий (invoke, інакше клік)."""
+
+    if not last:
+        try:
+            element.expand()
+            return
+        except Exception:
+            pass
+    try:
+        element.invoke()
+    except Exception:
+        element.click_input()
+
+
+class PywinautoBackend(AutomationBackend):
+    """Керування справжньою EBPro через pywinauto/UIA, ImageGrab та AutoHotkey."""
+
+    name = "pywinauto"
+
+    def __init__(self, session: Optional[EBProSession] = None):
+        self.session = session or get_session()
+        self.menu_locators = MenuLocatorCache()
+        self._profile: Optional[Tuple[str, str]] = None
+
+    def ensure_running(self, timeout: Optional[float] = None) -> None:
+        config = load_config()
+        _ensure_windows_environment()
+
+        session = self.session
+        ebpro_path = config.ebpro_path
+        if session.cached_application(ebpro_path) is not None:
+            return
+        Application = _pywinauto("pywinauto.application").Application  # noqa: N806
+
+        if not ebpro_path.exists():
+            raise FriendlyError(
+                f"Файл {ebpro_path} не знайдено.",
+                "Укажіть правильний шлях EBPRO_DIR/EBPRO_EXE у config.json.",
+            )
+
+        try:
+            app = Application(backend="uia")  # type: ignore[call-arg]
+            app.connect(path=str(ebpro_path))
+            session.remember_application(app, ebpro_path)
+            LOGGER.info("EBPro вже запущено, підключаємося до процесу.")
+            return
+        except Exception:
+            LOGGER.info("EBPro не знайдено серед процесів, запускаємо новий екземпляр.")
+
+        try:
+            app = Application(backend="uia")  # type: ignore[call-arg]
+            app.start(str(ebpro_path))
+            waited = wait_for_window(
+                app.window(title_re=rf".*{config.EBPRO_WINDOW_TITLE}.*"),
+                timeout if timeout is not None else config.EBPRO_START_TIMEOUT,
+                "головне вікно EasyBuilder Pro",
+            )
+            session.remember_application(app, ebpro_path)
+            LOGGER.info("EBPro успішно запущено за %.2f с.", waited.elapsed)
+        except Exception as exc:  # pragma: no cover - залежить від Windows
+            raise FriendlyError(
+                "Не вдалося стартувати EasyBuilder Pro.",
+                "Запустіть EBPro вручну та повторіть запит, або перевірте права доступу.",
+            ) from exc
+
+    def _window(self, title: str) -> Any:
+        _ensure_windows_environment()
+        try:
+            return self.session.window(title)
+        except (_pywinauto("pywinauto.findwindows").ElementNotFoundError, WaitTimeoutError) as exc:
+            raise FriendlyError(
+                f"Не знайдено вікно з назвою, що містить '{title}'.",
+                "Змініть SIMULATOR_WINDOW_TITLE/EBPRO_WINDOW_TITLE у config.json під свою локалізацію.",
+            ) from exc
+
+    def focus_window(self, title: str) -> Any:
+        window = self._window(title)
+        window.set_focus()
+        return window
+
+    def window_rect(self, title: str, focus: bool = True) -> Rect:
+        window = self.focus_window(title) if focus else self._window(title)
+        rect = window.rectangle()
+        return (rect.left, rect.top, rect.right, rect.bottom)
+
+    def menu_select(self, path: Sequence[str]) -> None:
+        """Вибирає пункт меню, за можливості без обходу всього дерева UIA.
+
+        Перший вибір шляху робить повний обхід і запам'ятовує ідентифікатори
+        кожного пункту; наступні йдуть прямо за ними. Після перезапуску EBPro
+        ідентифікатори беруться з макросу дії, якщо компонування вікна те саме.
+        Якщо кешований шлях не спрацював, він відкидається і виконується повний обхід.
+        """
+
+        title = load_config().EBPRO_WINDOW_TITLE
+        window = self.focus_window(title)
+        window_id = window.element_info.handle
+        layout = _layout_signature(window)
+        run = current_run()
+        target = "->".join(path)
+        recorded = run.next_step(STEP_MENU, target) if run is not None else None
+        route = self.menu_locators.get(window_id, path, layout)
+        if route is None and recorded is not None:
+            if recorded.data.get("layout") == list(layout):
+                steps = [ElementLocator(**item) for item in recorded.data.get("locators", [])]
+                route = self.menu_locators.put(window_id, path, layout, steps)
+            else:
+                run.miss(recorded, "змінилось компонування вікна")
+                recorded = None
+        steps = None
+        if route is not None:
+            try:
+                self._follow_menu_route(window, route.steps)
+                steps = route.steps
+            except Exception as exc:
+                LOGGER.info("Кешований шлях меню %s не спрацював (%s), шукаємо заново.", target, exc)
+                self.menu_locators.discard(path)
+                if recorded is not None:
+                    run.miss(recorded, exc)
+                    recorded = None
+        if steps is None:
+            steps = self._walk_menu(window, path)
+            self.menu_locators.put(window_id, path, layout, steps)
+        if run is not None:
+            run.record(
+                STEP_MENU,
+                target,
+                expect=title,
+                replayed=recorded is not None,
+                layout=list(layout),
+                locators=[step.to_dict() for step in steps],
+            )
+
+    def _menu_containers(self, window: Any, scope: str) -> List[Any]:
+        """Де шукати пункти: головне вікно або відкриті випадні меню процесу."""
+
+        if scope == SCOPE_WINDOW:
+            return [window]
+        desktop = _pywinauto().Desktop(backend="uia")
+        return list(desktop.windows(process=window.process_id(), control_type="Menu"))
+
+    def _walk_menu(self, window: Any, path: Sequence[str]) -> List[ElementLocator]:
+        """Повний обхід дерева: знаходить кожен пункт за назвою та запам'ятовує його."""
+
+        steps: List[ElementLocator] = []
+        previous: Any = None
+        for index, title in enumerate(path):
+            found: Optional[Tuple[str, Any]] = None
+            # Після розкриття проміжного пункту наступний рівень — у випадному меню.
+            for scope in (SCOPE_POPUP, SCOPE_WINDOW) if index else (SCOPE_WINDOW,):
+                for container in self._menu_containers(window, scope):
+                    for element in container.descendants():
+                        info = element.element_info
+                        # На стрічці вкладка і кнопка можуть мати однакову назву ("Build").
+                        if element is previous:
+                            continue
+                        if info.control_type in MENU_CONTROL_TYPES and info.name == title:
+                            found = (scope, element)
+                            break
+                    if found:
+                        break
+                if found:
+                    break
+            if found is None:
+                raise FriendlyError(
+                    f"Пункт меню '{title}' не знайдено.",
+                    "Перевірте назви пунктів меню/стрічки під локалізацію EBPro або використайте AHK.",
+                )
+            scope, element = found
+            info = element.element_info
+            steps.append(
+                ElementLocator(
+                    title=info.name,
+                    control_type=info.control_type,
+                    auto_id=info.automation_id or "",
+                    scope=scope,
+                    element=element if scope == SCOPE_WINDOW else None,
+                )
+            )
+            _activate_menu_element(element, last=index == len(path) - 1)
+            previous = element
+        return steps
+
+    def _follow_menu_route(self, window: Any, steps: Sequence[ElementLocator]) -> None:
+        """Проходить шлях за збереженими обгортками та ідентифікаторами."""
+
+        for index, step in enumerate(steps):
+            element = step.element
+            if element is None or not EBProSession._window_alive(element):
+                element = self._locate(window, step)
+                if step.scope == SCOPE_WINDOW:
+                    step.element = element
+            _activate_menu_element(element, last=index == len(steps) - 1)
+
+    def _locate(self, window: Any, step: ElementLocator) -> Any:
+        for container in self._menu_containers(window, step.scope):
+            for element in container.descendants(control_type=step.control_type):
+                if step.matches(element.element_info):
+                    return element
+        raise LookupError(f"елемент '{step.title}' ({step.control_type}) не знайдено")
+
+    def fill_file_dialog(self, dialog: DialogSpec, path: Path) -> float:
+        """Заповнює діалог, пробуючи спершу селектори, що вже спрацювали на цій машині.
+
+        З DIALOG_KEYBOARD_INPUT шлях вводиться у поле, що має фокус після
+        відкриття діалогу, і підтверджується Enter — без пошуку Edit і кнопки.
+        Крок макросу дії дає точний заголовок і елементи діалогу; вони лише
+        перевіряються (``exists`` без очікування), а при розбіжності
+        виконується звичайний пошук.
+        """
+
+        config = load_config()
+        app = self.session.application()
+        registry = get_selector_registry()
+        variants = registry.variants(dialog.key)
+        run = current_run()
+        recorded = run.next_step(STEP_DIALOG, dialog.key) if run is not None else None
+        if recorded is not None:
+            variants = [{"title": recorded.expect}] + variants
+        waited = wait_until(
+            lambda: _find_dialog(app, dialog, variants), config.DIALOG_TIMEOUT, dialog.description, dialog.hint
+        )
+        spec, title = waited.value
+        if recorded is not None:
+            reason = _check_dialog_step(spec, title, recorded, config.DIALOG_KEYBOARD_INPUT)
+            if reason:
+                run.miss(recorded, reason)
+                recorded = None
+        if config.DIALOG_KEYBOARD_INPUT:
+            spec.wrapper_object().type_keys(_keys_literal(str(path)) + "{ENTER}", with_spaces=True)
+            learned = {"title": title, "keys": "{ENTER}"}
+        else:
+            if recorded is not None:
+                edit = spec.child_window(auto_id=recorded.data["edit_auto_id"], control_type="Edit")
+                edit_id = recorded.data["edit_auto_id"]
+            else:
+                edit, edit_id = _dialog_edit(spec, variants)
+            edit.set_edit_text(str(path))
+            if recorded is not None:
+                button = spec.child_window(title=recorded.data["button"], control_type="Button")
+                button_title = recorded.data["button"]
+            else:
+                button, button_title = _dialog_button(spec, dialog, variants)
+            button.click()
+            learned = {"title": title, "button": button_title, "edit_auto_id": edit_id}
+        elapsed = wait_for_window_closed(spec, config.DIALOG_TIMEOUT, f"закриття: {dialog.description}").elapsed
+        if recorded is None:
+            registry.learn(dialog.key, **{key: value for key, value in learned.items() if key != "keys"})
+        if run is not None:
+            data = {key: value for key, value in learned.items() if key != "title"}
+            run.record(STEP_DIALOG, dialog.key, expect=title, replayed=recorded is not None, **data)
+        return elapsed
+
+    def wait_window(self, title: str, timeout: float, hint: Optional[str] = None) -> WaitResult:
+        _ensure_windows_environment()
+        waited = wait_for_window(
+            _pywinauto().Desktop(backend="uia").window(title_re=rf".*{title}.*"),
+            timeout,
+            f"вікно '{title}'",
+            hint,
+        )
+        self.session.remember_window(title, waited.value)
+        return waited
+
+    def capture(self, bbox: Rect) -> Any:
+        ImageGrab = _optional_module("PIL.ImageGrab")  # noqa: N806
+        if ImageGrab is None:
+            raise FriendlyError(
+                "Модуль ImageGrab недоступний.",
+                "Запустіть сервіс на Windows з Pillow та увімкніть Desktop experience.",
+            )
+        return ImageGrab.grab(bbox=bbox, all_screens=True)
+
+    def run_ahk(self, command: str, script_path: Path, timeout: float) -> None:
+        config = load_config()
+        worker = get_ahk_worker()
+        if worker is not None:
+            try:
+                worker.call(command, config.EBPRO_WINDOW_TITLE, timeout=timeout)
+            except AhkTimeoutError as exc:
+                raise FriendlyError(
+                    str(exc), "Збільште AHK_COMMAND_TIMEOUT або перевірте, чи не відкрито модальне вікно EBPro."
+                ) from exc
+            except AhkWorkerError as exc:
+                raise FriendlyError(f"Помічник AHK: {exc}", "Перевірте gui_fallback/ahk_worker.ahk.") from exc
+            return
+        ahk_exe = Path(config.AUTOHOTKEY_EXE)
+        if not ahk_exe.exists():
+            raise FriendlyError(
+                "AutoHotkey не знайдено.",
+                "Встановіть AutoHotkey та оновіть AUTOHOTKEY_EXE у config.json.",
+            )
+        try:
+            subprocess.run([str(ahk_exe), str(script_path)], check=True, timeout=timeout)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as exc:
+            raise FriendlyError(
+                "AHK-скрипт завершився з помилкою.",
+                "Перевірте гарячі клавіші у simulate_offline.ahk.",
+            ) from exc
+
+    def build_output(self) -> Optional[str]:
+        spec = self.session.application().window(title_re=load_config().BUILD_WINDOW_TITLE_RE)
+        if not spec.exists(timeout=0):
+            return None
+        texts: List[str] = []
+        for control in spec.wrapper_object().descendants():
+            if control.element_info.control_type in ("Edit", "Document", "ListItem", "DataItem", "Text"):
+                texts.extend(text for text in control.texts() if text)
+        return "\n".join(texts)
+
+    def ui_profile(self) -> Tuple[str, str]:
+        if self._profile is None:
+            self._profile = (_file_version(load_config().ebpro_path), _ui_locale())
+        return self._profile
+
+    def invalidate(self) -> None:
+        self.session.invalidate()
+        self.menu_locators.invalidate()
+        # Після перезапуску EBPro могла оновитися.
+        self._profile = None
+
+
+_BACKEND: Optional[AutomationBackend] = None
+
+
+def get_backend() -> AutomationBackend:
+    """Повертає бекенд автоматизації, вибраний у AUTOMATION_BACKEND."""
+
+    global _BACKEND
+    if _BACKEND is None:
+        config = load_config()
+        name = config.AUTOMATION_BACKEND.lower()
+        if name == "pywinauto":
+            _BACKEND = PywinautoBackend()
+        elif name == "simulated":
+            from .simulated_backend import SimulatedBackend
+
+            _BACKEND = SimulatedBackend(
+                latency=config.SIMULATED_LATENCY,
+                fail_rate=config.SIMULATED_FAIL_RATE,
+                lookup_latency=config.SIMULATED_LOOKUP_LATENCY,
+            )
+        else:
+            raise FriendlyError(
+                f"Невідомий бекенд автоматизації '{config.AUTOMATION_BACKEND}'.",
+                "Встановіть AUTOMATION_BACKEND у config.json: pywinauto або simulated.",
+            )
+        LOGGER.info("Бекенд автоматизації: %s", _BACKEND.name)
+    return _BACKEND
+
+
+def set_backend(backend: Optional[AutomationBackend]) -> None:
+    """Підміняє бекенд процесу (None — повернутися до вибору з config.json)."""
+
+    global _BACKEND
+    _BACKEND = backend
+
+
+_AHK_WORKER: Optional[AhkWorker] = None
+
+
+def ahk_worker_command(config: EBProConfig) -> List[str]:
+    """Команда запуску помічника: AutoHotkey зі скриптом або замінник на Python для *.py."""
+
+    script = BASE_DIR / "gui_fallback" / "ahk_worker.ahk"
+    if config.AHK_WORKER_SCRIPT:
+        script = Path(config.AHK_WORKER_SCRIPT)
+    if script.suffix == ".py":
+        return [sys.executable, "-u", str(script)]
+    return [config.AUTOHOTKEY_EXE, "/ErrorStdOut", str(script)]
+
+
+def get_ahk_worker() -> Optional[AhkWorker]:
+    """Постійний помічник AutoHotkey або None, якщо AHK_WORKER_ENABLED вимкнено.
+
+    Процес стартує під час першої команди (або прогріву) і живе до зупинки сервісу.
+    """
+
+    global _AHK_WORKER
+    config = load_config()
+    if not config.AHK_WORKER_ENABLED:
+        return None
+    if _AHK_WORKER is None:
+        _AHK_WORKER = AhkWorker(
+            ahk_worker_command(config),
+            start_timeout=config.AHK_START_TIMEOUT,
+            command_timeout=config.AHK_COMMAND_TIMEOUT,
+        )
+    return _AHK_WORKER
+
+
+def stop_ahk_worker() -> None:
+    """Завершує помічника AutoHotkey (зупинка сервісу)."""
+
+    global _AHK_WORKER
+    worker, _AHK_WORKER = _AHK_WORKER, None
+    if worker is not None:
+        worker.close()
+
+
+_MACRO_STORE: Optional[MacroStore] = None
+
+
+def _user_data_dir() -> Path:
+    """Каталог даних користувача сервісу (поза деревом пакета, яке може бути лише для читання)."""
+
+    root = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(root) / "EBPro_MiniMCP"
+
+
+def get_macro_store() -> Optional[MacroStore]:
+    """Сховище макросів дій або None, якщо MACROS_ENABLED вимкнено."""
+
+    global _MACRO_STORE
+    config = load_config()
+    if not config.MACROS_ENABLED:
+        return None
+    if _MACRO_STORE is None:
+        path = Path(config.MACRO_STORE_PATH) if config.MACRO_STORE_PATH else _user_data_dir() / "macros.json"
+        _MACRO_STORE = MacroStore(path)
+    return _MACRO_STORE
+
+
+def macro_profile() -> str:
+    """Профіль макросів ``<версія EBPro>/<мова>``; значення з config.json мають пріоритет."""
+
+    config = load_config()
+    version, ui_locale = get_backend().ui_profile()
+    return f"{config.EBPRO_VERSION or version}/{config.EBPRO_LOCALE or ui_locale}"
+
+
+def with_macro(action: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Записує GUI-кроки дії у макрос і відтворює їх під час наступних викликів.
+
+    Кроки вкладеної дії потрапляють у макрос зовнішньої.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            store = get_macro_store()
+            if store is None or current_run() is not None:
+                return func(*args, **kwargs)
+            with macro_scope(action, store, macro_profile()):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@stage("window_connect")
+def _connect_to_ebpro_window(title: str):
+    """Повертає вікно EBPro за частиною заголовка."""
+
+    return get_backend().focus_window(title)
+
+
+@stage("run_ebpro")
+def run_ebpro(timeout: Optional[float] = None) -> None:
+    """Стартує EBPro.exe, якщо ще не запущено.
+
+    Після старту чекаємо появи головного вікна, а не простою CPU;
+    ``timeout`` — верхня межа (за замовчуванням EBPRO_START_TIMEOUT).
+    """
+
+    checkpoint()
+    get_backend().ensure_running(timeout)
 
 
 def focus_window(title_contains: str):
@@ -159,28 +1160,120 @@ def focus_window(title_contains: str):
     return _connect_to_ebpro_window(title_contains)
 
 
-def click_menu(path: Iterable[str]) -> None:
-    """Натискає пункт меню за шляхом типу ["File", "Open..."] у EBPro."""
+def warm_up() -> Dict[str, float]:
+    """Виконує холодний старт наперед: імпорти, запуск EBPro, пошук головного вікна.
+
+    Повертає тривалість кожного кроку (мс). Викликається з GUI-потоку черги.
+    """
 
     config = load_config()
-    window = _connect_to_ebpro_window(config.EBPRO_WINDOW_TITLE)
+    backend = get_backend()
+    modules = ["PIL.Image"]
+    if backend.name == "pywinauto":
+        modules += [
+            "pywinauto",
+            "pywinauto.application",
+            "pywinauto.findwindows",
+            "pywinauto.handleprops",
+            "PIL.ImageGrab",
+        ]
+    steps: List[Tuple[str, Callable[[], Any]]] = [
+        ("imports", lambda: [_optional_module(name) for name in modules]),
+        ("run_ebpro", run_ebpro),
+        ("main_window", lambda: backend.window_rect(config.EBPRO_WINDOW_TITLE, focus=False)),
+    ]
+    worker = get_ahk_worker() if backend.name == "pywinauto" else None
+    if worker is not None and Path(config.AUTOHOTKEY_EXE).exists():
+        steps.append(("ahk_worker", worker.start))
+    timings: Dict[str, float] = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        step()
+        timings[name] = round((time.perf_counter() - started) * 1000.0, 1)
+    LOGGER.info("Прогрів завершено: %s", ", ".join(f"{name} {value} мс" for name, value in timings.items()))
+    return timings
+
+
+@stage("click_menu")
+def click_menu(path: Iterable[str]) -> None:
+    """Натискає пункт меню за шляхом типу ["File", "Open..."] у EBPro."""
 
+    items = list(path)
+    checkpoint()
+    report("step", step="menu", path="->".join(items))
     try:
-        menu_path = "->".join(path)
-        LOGGER.info("Виконуємо вибір меню: %s", menu_path)
-        window.menu_select(menu_path)
+        LOGGER.info("Виконуємо вибір меню: %s", "->".join(items), extra=VERBOSE)
+        get_backend().menu_select(items)
+    except FriendlyError:
+        raise
     except Exception as exc:
         raise FriendlyError(
             "Не вдалося натиснути пункт меню.",
-            "Для стрічкового інтерфейсу налаштуйте кліки в ebpro_actions.click_menu або використайте AHK.",
+            "Перевірте назви пунктів меню/стрічки під локалізацію EBPro або використайте AHK.",
         ) from exc
 
 
+@stage("dialog")
+def _fill_file_dialog(dialog: DialogSpec, path: Path, message: str) -> float:
+    """Заповнює файловий діалог, перетворюючи збої селекторів на FriendlyError."""
+
+    checkpoint()
+    report("step", step="dialog", dialog=dialog.key)
+    try:
+        elapsed = get_backend().fill_file_dialog(dialog, path)
+    except FriendlyError:
+        raise
+    except Exception as exc:
+        raise FriendlyError(message, dialog.hint) from exc
+    report("dialog", dialog=dialog.key, path=str(path), dialog_ms=round(elapsed * 1000.0, 1))
+    return elapsed
+
+
+_PROJECT_INDEX: Optional[ProjectIndex] = None
+
+
+def get_project_index() -> Optional[ProjectIndex]:
+    """Індекс проєктів у PROJECT_ROOTS або None, якщо теки не задано."""
+
+    global _PROJECT_INDEX
+    config = load_config()
+    if not config.PROJECT_ROOTS:
+        return None
+    if _PROJECT_INDEX is None:
+        path = Path(config.PROJECT_INDEX_PATH) if config.PROJECT_INDEX_PATH else BASE_DIR / "cache" / "projects.json"
+        _PROJECT_INDEX = ProjectIndex(config.PROJECT_ROOTS, path, max_age=config.PROJECT_INDEX_MAX_AGE)
+    return _PROJECT_INDEX
+
+
+def resolve_project(name: str) -> str:
+    """Шлях до проєкту за назвою (``pump``, ``pump.emtp``) через індекс PROJECT_ROOTS.
+
+    Піднімає ``LookupError`` (з індексу — ``ProjectLookupError``), якщо назва
+    не знайдена чи неоднозначна або пошук за назвою вимкнено (немає PROJECT_ROOTS).
+    """
+
+    index = get_project_index()
+    if index is None:
+        raise LookupError(
+            f"Проєкт '{name}' не знайдено: пошук за назвою вимкнено, задайте PROJECT_ROOTS у config.json."
+        )
+    return index.resolve(name).path
+
+
+@with_macro("open_project")
 def open_project(path: str) -> None:
-    """Відкриває файл проєкту *.emtp або *.ecmp у EBPro."""
+    """Відкриває файл проєкту *.emtp або *.ecmp у EBPro.
+
+    Замість шляху можна передати назву проєкту з PROJECT_ROOTS.
+    """
 
     run_ebpro()
     normalized_path = Path(path)
+    if not normalized_path.exists() and len(normalized_path.parts) == 1 and get_project_index() is not None:
+        try:
+            normalized_path = Path(resolve_project(path))
+        except LookupError as exc:
+            raise FriendlyError(str(exc), "Перевірте назву проєкту або вкажіть повний шлях.") from exc
     if not normalized_path.exists():
         raise FriendlyError(
             f"Файл {normalized_path} не знайдено.",
@@ -188,98 +1281,402 @@ def open_project(path: str) -> None:
         )
 
     click_menu(["File", "Open..."])
+    elapsed = _fill_file_dialog(
+        OPEN_DIALOG, normalized_path, "Не вдалося взаємодіяти з діалогом відкриття файлу."
+    )
+    get_session().project_path = normalized_path.resolve()
+    LOGGER.info("Проєкт відкрито: %s (діалог закрито за %.2f с)", normalized_path, elapsed)
+
+
+BUILD_ARTIFACT_SUFFIXES = (".exob", ".cxob")
+
+_BUILD_CACHE: Optional[BuildCache] = None
+
+
+def get_build_cache() -> Optional[BuildCache]:
+    """Повертає кеш збірки процесу або None, якщо його вимкнено у config.json."""
+
+    global _BUILD_CACHE
+    config = load_config()
+    if not config.BUILD_CACHE_ENABLED:
+        return None
+    if _BUILD_CACHE is None:
+        root = Path(config.BUILD_CACHE_DIR) if config.BUILD_CACHE_DIR else BASE_DIR / "cache" / "builds"
+        _BUILD_CACHE = BuildCache(root, config.BUILD_CACHE_MAX_MB * 1024 * 1024)
+    return _BUILD_CACHE
 
+
+def _build_settings() -> Dict[str, Any]:
+    """Налаштування, зміна яких має інвалідувати кеш (шлях і версія EBPro.exe)."""
+
+    ebpro_path = load_config().ebpro_path
     try:
-        app = Application(backend="uia")  # type: ignore[call-arg]
-        dialog = app.window(title_re=r".*(Open|Відкрити).*")
-        dialog.wait("ready", timeout=10)
-        edit = dialog.child_window(control_type="Edit")
-        edit.set_edit_text(str(normalized_path))
-        open_button = dialog.child_window(title_re=r"(Open|Відкрити)", control_type="Button")
-        open_button.click()
-        LOGGER.info("Проєкт відкрито: %s", normalized_path)
-    except Exception as exc:
-        raise FriendlyError(
-            "Не вдалося взаємодіяти з діалогом відкриття файлу.",
-            "Перевірте локалізацію кнопок у open_project та налаштуйте селектори.",
-        ) from exc
+        ebpro_mtime = ebpro_path.stat().st_mtime_ns
+    except OSError:
+        ebpro_mtime = None
+    return {"ebpro": str(ebpro_path), "ebpro_mtime": ebpro_mtime}
+
+
+def _artifact_dir(project: Path) -> Path:
+    """Каталог артефактів збірки: BUILD_ARTIFACT_DIR або тека проєкту."""
 
+    configured = load_config().BUILD_ARTIFACT_DIR
+    return Path(configured) if configured else project.parent
 
-def build_exob() -> None:
-    """Запускає збірку EXOB/CXOB через меню EBPro."""
+
+def _artifact_candidates(project: Path) -> List[Path]:
+    return [_artifact_dir(project) / (project.stem + suffix) for suffix in BUILD_ARTIFACT_SUFFIXES]
+
+
+def _restore_cached_artifact(project: Path, cached: Path) -> Path:
+    """Кладе артефакт з кешу в каталог артефактів, якщо там його немає або він інший."""
+
+    target = _artifact_dir(project) / (project.stem + cached.suffix)
+    cached_stat = cached.stat()
+    if target.exists():
+        target_stat = target.stat()
+        if (target_stat.st_size, target_stat.st_mtime_ns) == (cached_stat.st_size, cached_stat.st_mtime_ns):
+            return target
+    shutil.copy2(cached, target)
+    return target
+
+
+class BuildFailedError(FriendlyError):
+    """Компілятор EBPro повідомив про помилки; повний підсумок — у ``result``."""
+
+    def __init__(self, result: BuildResult):
+        shown = "; ".join(result.errors[:3]) or "див. вікно збірки EBPro"
+        super().__init__(
+            f"Збірка завершилась з помилками ({len(result.errors)}): {shown}.",
+            "Виправте помилки у проєкті та повторіть збірку.",
+        )
+        self.result = result
+
+
+def _build_log_reader() -> Optional[IncrementalLogReader]:
+    config = load_config()
+    if not config.BUILD_LOG_PATH:
+        return None
+    return IncrementalLogReader(Path(config.BUILD_LOG_PATH), encoding=config.BUILD_LOG_ENCODING)
+
+
+@with_macro("build_exob")
+def build_project(use_cache: bool = True) -> BuildResult:
+    """Збирає EXOB/CXOB через меню EBPro і чекає завершення збірки.
+
+    Якщо відкритий проєкт і налаштування не змінились з останньої успішної
+    збірки, артефакт повертається з кешу без GUI-збірки. Інакше результат
+    містить артефакт, помилки й попередження компілятора та тривалість;
+    помилки компіляції піднімають ``BuildFailedError``.
+    """
 
     run_ebpro()
+    project = get_session().project_path
+    cache = get_build_cache() if use_cache and project is not None and project.exists() else None
+    key: Optional[str] = None
+    if cache is not None:
+        lookup_started = time.monotonic()
+        with stage("build_cache"):
+            key = cache.key(project, _build_settings())
+            cached = cache.lookup(key)
+        if cached is not None:
+            artifact = _restore_cached_artifact(project, cached)
+            report("file", state="cached", path=str(artifact), size=artifact.stat().st_size)
+            LOGGER.info("Збірку пропущено: проєкт не змінився, артефакт %s взято з кешу.", artifact)
+            return BuildResult(ok=True, artifact=str(artifact), cached=True, duration=time.monotonic() - lookup_started)
+
+    backend = get_backend()
+    monitor = BuildMonitor(
+        _artifact_candidates(project) if project is not None else [],
+        started=time.time(),
+        output=backend.build_output,
+        log=_build_log_reader(),
+        summary_grace=load_config().BUILD_SUMMARY_GRACE,
+    )
+    # Текст попередньої збірки, що лишився у вікні, не належить новій.
+    monitor.prime()
     try:
         click_menu(["Build", "Build"])
-        LOGGER.info("Команда збірки EXOB виконана.")
+        LOGGER.info("Команда збірки EXOB виконана, чекаємо завершення.")
     except FriendlyError:
         raise
     except Exception as exc:
         raise FriendlyError(
             "Не вдалося запустити збірку через меню.",
-            "Змініть шлях меню у build_exob або використайте гарячі клавіші через AHK.",
+            "Змініть шлях меню у build_project або використайте гарячі клавіші через AHK.",
         ) from exc
 
-
-def _invoke_autohotkey(script_name: str) -> None:
-    """Запускає скрипт AutoHotkey як fallback."""
+    try:
+        with stage("build_wait"):
+            result = wait_until(
+                monitor.poll,
+                load_config().BUILD_TIMEOUT,
+                "завершення збірки",
+                "Збільште BUILD_TIMEOUT або перевірте BUILD_WINDOW_TITLE_RE/BUILD_LOG_PATH у config.json.",
+            ).value
+    except WaitTimeoutError:
+        if not monitor.errors:
+            raise
+        result = monitor.result(confirmed=False)
+
+    LOGGER.info(
+        "Збірку завершено за %.2f с: %s помилок, %s попереджень, артефакт %s.",
+        result.duration,
+        len(result.errors),
+        len(result.warnings),
+        result.artifact,
+    )
+    if not result.ok:
+        raise BuildFailedError(result)
+    if cache is not None and key is not None and result.artifact is not None:
+        cache.store(key, Path(result.artifact), project=str(project))
+    return result
+
+
+def build_exob(use_cache: bool = True) -> Optional[str]:
+    """Збирає EXOB/CXOB і повертає шлях артефакту (див. ``build_project``)."""
+
+    return build_project(use_cache).artifact
+
+
+@stage("ahk")
+def _invoke_autohotkey(command: str, timeout: Optional[float] = None) -> None:
+    """Виконує fallback-команду AutoHotkey (постійним помічником або скриптом ``<command>.ahk``)."""
 
     config = load_config()
-    ahk_exe = Path(config.AUTOHOTKEY_EXE)
-    script_path = BASE_DIR / "gui_fallback" / script_name
-
-    if not ahk_exe.exists():
-        raise FriendlyError(
-            "AutoHotkey не знайдено.",
-            "Встановіть AutoHotkey та оновіть AUTOHOTKEY_EXE у config.json.",
-        )
-    if not script_path.exists():
+    script_path = BASE_DIR / "gui_fallback" / f"{command}.ahk"
+    if not config.AHK_WORKER_ENABLED and not script_path.exists():
         raise FriendlyError(
             f"AHK-скрипт {script_path} не знайдено.",
             "Переконайтеся, що файли збережено разом із сервісом.",
         )
 
-    LOGGER.info("Запускаємо AHK fallback: %s", script_path)
-    try:
-        subprocess.run([str(ahk_exe), str(script_path)], check=True)
-    except subprocess.CalledProcessError as exc:
-        raise FriendlyError(
-            "AHK-скрипт завершився з помилкою.",
-            "Перевірте гарячі клавіші у simulate_offline.ahk.",
-        ) from exc
+    LOGGER.info("Запускаємо AHK fallback: %s", command)
+    get_backend().run_ahk(command, script_path, config.AHK_COMMAND_TIMEOUT if timeout is None else timeout)
 
 
-def run_offline_sim(timeout: float = 5.0) -> None:
-    """Запускає Offline Simulation через меню або AHK."""
+@with_macro("run_offline_sim")
+def run_offline_sim(timeout: Optional[float] = None) -> None:
+    """Запускає Offline Simulation через меню або AHK.
 
+    Повертається, щойно з'явилося вікно EasySimulator; ``timeout`` — верхня
+    межа очікування (за замовчуванням SIMULATOR_TIMEOUT).
+    """
+
+    config = load_config()
     run_ebpro()
     try:
         click_menu(["Tools", "Offline Simulation"])
         LOGGER.info("Офлайн-симуляцію запущено через меню.")
-        time.sleep(timeout)
     except FriendlyError as menu_error:
         LOGGER.warning("Не вдалося запустити симуляцію через меню: %s", menu_error)
         LOGGER.info("Пробуємо fallback з AutoHotkey.")
-        _invoke_autohotkey("simulate_offline.ahk")
+        _invoke_autohotkey("simulate_offline")
+
+    with stage("wait_window"):
+        waited = get_backend().wait_window(
+            config.SIMULATOR_WINDOW_TITLE,
+            timeout if timeout is not None else config.SIMULATOR_TIMEOUT,
+            "Збільште SIMULATOR_TIMEOUT або перевірте SIMULATOR_WINDOW_TITLE у config.json.",
+        )
+    LOGGER.info("EasySimulator готовий за %.2f с.", waited.elapsed)
+
+
+IMAGE_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "jpg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+
+@dataclass
+class ScreenshotData:
+    """Закодований знімок у пам'яті."""
 
+    content: bytes
+    media_type: str
+    width: int
+    height: int
+    # Результат порівняння з еталоном (``visual_diff.DiffResult``), якщо його просили.
+    diff: Optional[Any] = None
 
-def take_screenshot(out_path: str) -> str:
-    """Зберігає знімок екрана або активного вікна симулятора."""
 
-    if ImageGrab is None:
+def _normalize_format(fmt: Optional[str], out_path: Optional[str] = None) -> str:
+    """Визначає формат з параметра або розширення файлу (типово PNG)."""
+
+    name = (fmt or (Path(out_path).suffix.lstrip(".") if out_path else "") or "png").lower()
+    if name not in IMAGE_FORMATS:
+        raise FriendlyError(
+            f"Формат зображення '{name}' не підтримується.",
+            "Використайте png, jpeg або webp.",
+        )
+    return name
+
+
+def _grab_simulator(
+    region: Optional[Sequence[int]] = None,
+    scale: Optional[float] = None,
+    focus: bool = True,
+):
+    """Знімає лише прямокутник вікна симулятора (з опційною обрізкою та масштабом).
+
+    ``region`` — ``[x, y, width, height]`` відносно лівого верхнього кута вікна.
+    Без ``focus`` вікно не активується (для потокових кадрів).
+    """
+
+    backend = get_backend()
+    with stage("window_connect"):
+        left, top, right, bottom = backend.window_rect(load_config().SIMULATOR_WINDOW_TITLE, focus=focus)
+    bbox: Rect = (left, top, right, bottom)
+    if region:
+        if len(region) != 4:
+            raise FriendlyError(
+                "Область обрізки має містити 4 числа.",
+                "Передайте region як [x, y, ширина, висота] відносно вікна симулятора.",
+            )
+        x, y, width, height = (int(value) for value in region)
+        bbox = (
+            max(left + x, left),
+            max(top + y, top),
+            min(left + x + width, right),
+            min(top + y + height, bottom),
+        )
+    if bbox[2] <= bbox[0] or bbox[3] <= bbox[1]:
         raise FriendlyError(
-            "Модуль ImageGrab недоступний.",
-            "Запустіть сервіс на Windows з Pillow та увімкніть Desktop experience.",
+            "Область знімка порожня.",
+            "Перевірте, що вікно симулятора не згорнуте, а region лежить у його межах.",
         )
 
-    focus_window("SIMULATOR")
+    with stage("capture"):
+        image = backend.capture(bbox)
+    if scale and 0 < scale < 1:
+        size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        image = image.resize(size, _optional_module("PIL.Image").BILINEAR)
+    return image
+
+
+def grab_frame(scale: Optional[float] = None) -> Any:
+    """Кадр вікна симулятора для трансляції: PIL-зображення, вікно не активується.
+
+    Як і інші GUI-операції, викликається лише з робочого потоку черги.
+    """
+
+    return _grab_simulator(scale=scale, focus=False)
+
+
+@stage("encode")
+def encode_image(
+    image: Any,
+    fmt: str,
+    quality: Optional[int] = None,
+    compress_level: Optional[int] = None,
+) -> bytes:
+    """Кодує зображення у вибраний формат без проміжного файлу."""
+
+    pil_format, _ = IMAGE_FORMATS[fmt]
+    options: Dict[str, Any] = {}
+    if pil_format == "PNG":
+        # Рівень 1 у рази швидший за типовий 6 при невеликій різниці в розмірі.
+        options["compress_level"] = 1 if compress_level is None else int(compress_level)
+    else:
+        options["quality"] = 85 if quality is None else int(quality)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, **options)
+    return buffer.getvalue()
+
+
+def diff_options(
+    mask: Optional[Sequence[Sequence[int]]] = None,
+    tolerance: Optional[int] = None,
+    max_diff_ratio: Optional[float] = None,
+) -> Any:
+    """Параметри порівняння з еталоном: значення запиту або типові з config.json."""
+
+    from .visual_diff import DiffOptions
+
+    config = load_config()
+    masks = [[int(value) for value in region] for region in mask or []]
+    if any(len(region) != 4 for region in masks):
+        raise FriendlyError(
+            "Кожна маска має містити 4 числа.",
+            "Передайте mask як список [x, y, ширина, висота] відносно знімка.",
+        )
+    return DiffOptions(
+        tolerance=config.DIFF_TOLERANCE if tolerance is None else int(tolerance),
+        max_ratio=config.DIFF_MAX_RATIO if max_diff_ratio is None else float(max_diff_ratio),
+        masks=masks,
+        phash_distance=config.DIFF_PHASH_DISTANCE,
+    )
+
+
+def baseline_path(baseline: str) -> Path:
+    """Шлях до еталона; відносні шляхи беруться від BASELINE_DIR."""
+
+    path = Path(baseline)
+    base_dir = load_config().BASELINE_DIR
+    if not path.is_absolute() and base_dir:
+        path = Path(base_dir) / path
+    return path
+
+
+def capture_screenshot(
+    fmt: Optional[str] = None,
+    region: Optional[Sequence[int]] = None,
+    quality: Optional[int] = None,
+    compress_level: Optional[int] = None,
+    scale: Optional[float] = None,
+    baseline: Optional[str] = None,
+    mask: Optional[Sequence[Sequence[int]]] = None,
+    tolerance: Optional[int] = None,
+    max_diff_ratio: Optional[float] = None,
+) -> ScreenshotData:
+    """Повертає знімок вікна симулятора у пам'яті, без запису на диск.
+
+    З ``baseline`` знімок ще до кодування порівнюється з еталоном
+    (``visual_diff``); результат — у полі ``diff``.
+    """
+
+    name = _normalize_format(fmt)
+    image = _grab_simulator(region, scale)
+    diff = None
+    if baseline:
+        from .visual_diff import compare_to_baseline
+
+        with stage("diff"):
+            diff = compare_to_baseline(image, baseline_path(baseline), diff_options(mask, tolerance, max_diff_ratio))
+    try:
+        content = encode_image(image, name, quality, compress_level)
+    except Exception as exc:
+        raise FriendlyError(
+            "Не вдалося закодувати скріншот.",
+            "Перевірте параметри format/quality/compress_level.",
+        ) from exc
+    return ScreenshotData(content, IMAGE_FORMATS[name][1], image.width, image.height, diff)
+
+
+def take_screenshot(
+    out_path: str,
+    fmt: Optional[str] = None,
+    region: Optional[Sequence[int]] = None,
+    quality: Optional[int] = None,
+    compress_level: Optional[int] = None,
+    scale: Optional[float] = None,
+) -> str:
+    """Зберігає знімок вікна симулятора у файл."""
+
+    name = _normalize_format(fmt, out_path)
+    image = _grab_simulator(region, scale)
     output = Path(out_path)
     output.parent.mkdir(parents=True, exist_ok=True)
 
     try:
-        image = ImageGrab.grab()
-        image.save(output)
-        LOGGER.info("Скріншот збережено у %s", output)
+        content = encode_image(image, name, quality, compress_level)
+        with stage("file_save"):
+            output.write_bytes(content)
+        LOGGER.info("Скріншот %sx%s збережено у %s", image.width, image.height, output)
         return str(output)
     except Exception as exc:
         raise FriendlyError(
@@ -288,8 +1685,12 @@ def take_screenshot(out_path: str) -> str:
         ) from exc
 
 
-def pack_ecmp(out_path: str) -> str:
-    """Запускає процес Compress Project для створення *.ecmp."""
+@with_macro("pack_ecmp")
+def pack_ecmp(out_path: str, wait: bool = False) -> str:
+    """Запускає процес Compress Project для створення *.ecmp.
+
+    З ``wait=True`` повертається лише після того, як файл перестане рости.
+    """
 
     run_ebpro()
     click_menu(["File", "Compress"])
@@ -297,33 +1698,59 @@ def pack_ecmp(out_path: str) -> str:
     output = Path(out_path)
     output.parent.mkdir(parents=True, exist_ok=True)
 
-    try:
-        app = Application(backend="uia")  # type: ignore[call-arg]
-        dialog = app.window(title_re=r".*(Save As|Зберегти як).*")
-        dialog.wait("ready", timeout=10)
-        edit = dialog.child_window(control_type="Edit")
-        edit.set_edit_text(str(output))
-        save_button = dialog.child_window(title_re=r"(Save|Зберегти)", control_type="Button")
-        save_button.click()
-        LOGGER.info("Проєкт запаковано у ECMP: %s", output)
-        return str(output)
-    except Exception as exc:
-        raise FriendlyError(
-            "Не вдалося завершити пакування у ECMP.",
-            "Перевірте локалізацію діалогу 'Save As' та підлаштуйте селектори.",
-        ) from exc
+    started = time.time()
+    elapsed = _fill_file_dialog(SAVE_DIALOG, output, "Не вдалося завершити пакування у ECMP.")
+    if wait:
+        with stage("pack_wait"):
+            wait_for_file(output, load_config().PACK_TIMEOUT, newer_than=started)
+    LOGGER.info("Проєкт запаковано у ECMP: %s (діалог закрито за %.2f с)", output, elapsed)
+    return str(output)
 
 
 __all__ = [
     "FriendlyError",
     "EBProConfig",
+    "EBProSession",
+    "AutomationBackend",
+    "PywinautoBackend",
+    "DialogSpec",
+    "OPEN_DIALOG",
+    "SAVE_DIALOG",
+    "get_backend",
+    "set_backend",
+    "WaitResult",
+    "WaitTimeoutError",
+    "get_session",
+    "wait_until",
+    "wait_for_window",
+    "wait_for_window_closed",
+    "wait_for_file",
     "load_config",
     "run_ebpro",
+    "warm_up",
     "focus_window",
     "click_menu",
     "open_project",
     "build_exob",
+    "build_project",
+    "BuildFailedError",
+    "get_build_cache",
+    "get_selector_registry",
+    "get_macro_store",
+    "get_ahk_worker",
+    "ahk_worker_command",
+    "stop_ahk_worker",
+    "macro_profile",
+    "with_macro",
+    "get_project_index",
+    "resolve_project",
     "run_offline_sim",
     "take_screenshot",
+    "capture_screenshot",
+    "grab_frame",
+    "encode_image",
+    "diff_options",
+    "baseline_path",
+    "ScreenshotData",
     "pack_ecmp",
 ]
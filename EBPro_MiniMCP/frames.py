@@ -0,0 +1,108 @@
+"""Потокова трансляція кадрів вікна EasySimulator (MJPEG) без повторів."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Tuple
+
+from .ebpro_actions import FriendlyError, encode_image
+
+LOGGER = logging.getLogger("ebpro.frames")
+BOUNDARY = "frame"
+
+BBox = Tuple[int, int, int, int]
+# Знімає кадр (PIL-зображення) з потрібним масштабом у GUI-потоці та повертає його.
+FrameCapture = Callable[[Optional[float]], Awaitable[Any]]
+
+
+class FrameDiffer:
+    """Дешево визначає, чи змінився кадр відносно попереднього.
+
+    Порівнюються зменшені у ``sample`` разів копії кадрів, тож навіть 4K-кадр
+    перевіряється за частки мілісекунди. Раз на ``keyframe_interval`` секунд
+    кадр надсилається примусово, щоб нові клієнти та проксі не чекали змін.
+    """
+
+    def __init__(self, keyframe_interval: float = 5.0, sample: int = 4):
+        self.keyframe_interval = keyframe_interval
+        self.sample = max(1, sample)
+        self._previous = None
+        self._last_sent = 0.0
+        self.sent = 0
+        self.skipped = 0
+
+    def changed_region(self, image, now: Optional[float] = None) -> Optional[BBox]:
+        """Повертає змінену область кадру або None, якщо кадр можна пропустити."""
+
+        now = time.monotonic() if now is None else now
+        thumb = image.reduce(self.sample) if self.sample > 1 else image
+        if thumb.mode not in ("RGB", "L"):
+            thumb = thumb.convert("RGB")
+        previous, self._previous = self._previous, thumb
+
+        bbox: Optional[BBox]
+        from PIL import ImageChops  # кадр уже є PIL-зображенням, тож Pillow встановлена
+
+        if previous is None or previous.size != thumb.size:
+            bbox = (0, 0, image.width, image.height)
+        else:
+            diff = ImageChops.difference(previous, thumb).getbbox()
+            bbox = None
+            if diff is not None:
+                left, top, right, bottom = (value * self.sample for value in diff)
+                bbox = (left, top, min(right, image.width), min(bottom, image.height))
+
+        if bbox is None and now - self._last_sent >= self.keyframe_interval:
+            bbox = (0, 0, image.width, image.height)
+        if bbox is None:
+            self.skipped += 1
+            return None
+        self._last_sent = now
+        self.sent += 1
+        return bbox
+
+
+def _frame_part(content: bytes, bbox: BBox) -> bytes:
+    header = (
+        f"--{BOUNDARY}\r\n"
+        "Content-Type: image/jpeg\r\n"
+        f"Content-Length: {len(content)}\r\n"
+        f"X-Changed-Region: {','.join(str(value) for value in bbox)}\r\n\r\n"
+    )
+    return header.encode("ascii") + content + b"\r\n"
+
+
+async def mjpeg_stream(
+    capture: FrameCapture,
+    max_fps: float = 5.0,
+    quality: int = 70,
+    scale: Optional[float] = None,
+    keyframe_interval: float = 5.0,
+) -> AsyncIterator[bytes]:
+    """Генерує multipart/x-mixed-replace потік, пропускаючи незмінні кадри.
+
+    ``capture`` виконує знімок там, де живе GUI-сесія (у робочому потоці черги);
+    тут кадри лише порівнюються та кодуються.
+    """
+
+    differ = FrameDiffer(keyframe_interval=keyframe_interval)
+    period = 1.0 / max_fps
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                image = await capture(scale)
+            except FriendlyError as exc:
+                LOGGER.warning("Трансляцію зупинено: %s", exc)
+                return
+            bbox = differ.changed_region(image)
+            if bbox is not None:
+                content = await asyncio.to_thread(encode_image, image, "jpeg", quality)
+                yield _frame_part(content, bbox)
+            await asyncio.sleep(max(0.0, period - (time.monotonic() - started)))
+    finally:
+        LOGGER.info("Трансляція завершена: надіслано %s кадрів, пропущено %s.", differ.sent, differ.skipped)
+
+
+__all__ = ["FrameDiffer", "mjpeg_stream", "BOUNDARY"]
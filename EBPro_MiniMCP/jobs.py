@@ -0,0 +1,413 @@
+"""Черга завдань EBPro Mini-MCP з окремим робочим потоком для GUI-сесії."""
+from __future__ import annotations
+
+import contextvars
+import itertools
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .cancellation import REASON_CANCELLED, REASON_DEADLINE, CancelToken, JobCancelled, bind_token, current_token
+
+LOGGER = logging.getLogger("ebpro.jobs")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# Класи пріоритету: менше число виконується раніше.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 10
+PRIORITY_BATCH = 20
+PRIORITIES = {"interactive": PRIORITY_INTERACTIVE, "normal": PRIORITY_NORMAL, "batch": PRIORITY_BATCH}
+
+Runner = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+ErrorFormatter = Callable[[BaseException], Dict[str, Any]]
+
+
+def _default_error_formatter(exc: BaseException) -> Dict[str, Any]:
+    """Мінімальний опис помилки, якщо сервер не передав власний."""
+
+    return {
+        "code": "action_failed",
+        "message": str(exc),
+        "hint": getattr(exc, "hint", "Перевірте логи ebpro_mcp.log для детальної інформації."),
+    }
+
+
+def parse_priority(value: Union[str, int, None], default: int = PRIORITY_NORMAL) -> int:
+    """Число пріоритету з назви класу (interactive/normal/batch) або числа."""
+
+    if value is None or value == "":
+        return default
+    if isinstance(value, int):
+        return value
+    if value in PRIORITIES:
+        return PRIORITIES[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Невідомий пріоритет {value!r}. Доступні: {', '.join(PRIORITIES)}.") from None
+
+
+def priority_name(priority: int) -> Union[str, int]:
+    for name, value in PRIORITIES.items():
+        if value == priority:
+            return name
+    return priority
+
+
+def _ms(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return round((end - start) * 1000.0, 1)
+
+
+@dataclass
+class Job:
+    """Одне завдання у черзі: дія, параметри, стан і таймінги."""
+
+    id: str
+    action: str
+    params: Dict[str, Any]
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    worker: Optional[str] = None
+    attempts: int = 0
+    future: Future = field(default_factory=Future, repr=False, compare=False)
+    runner: Optional[Runner] = field(default=None, repr=False, compare=False)
+    # Контекст того, хто поставив завдання (request_id для логів), для робочого потоку.
+    context: contextvars.Context = field(default_factory=contextvars.copy_context, repr=False, compare=False)
+    priority: int = PRIORITY_NORMAL
+    token: CancelToken = field(default_factory=CancelToken, repr=False, compare=False)
+    # Службове завдання (кадр трансляції): не потрапляє в історію /jobs, успіх логується як DEBUG.
+    internal: bool = False
+    # Ключ сесії клієнта: пул воркерів виконує її дії там, де відкрито її проєкт.
+    session: Optional[str] = None
+
+    @property
+    def deadline(self) -> Optional[float]:
+        return self.token.deadline
+
+    def order(self) -> Tuple[int, float, float]:
+        """Ключ планування: клас пріоритету, потім найближчий дедлайн, потім FIFO."""
+
+        return (self.priority, self.deadline if self.deadline is not None else float("inf"), self.created_at)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Серіалізує завдання для відповіді /jobs."""
+
+        return {
+            "id": self.id,
+            "action": self.action,
+            "params": self.params,
+            "status": self.status,
+            "priority": priority_name(self.priority),
+            "deadline": self.deadline,
+            "cancel_requested": self.token.requested,
+            "worker": self.worker,
+            "session": self.session,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_ms": _ms(self.created_at, self.started_at),
+            "run_ms": _ms(self.started_at, self.finished_at),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobHistory:
+    """Потокобезпечний реєстр завдань з обмеженою історією завершених."""
+
+    def __init__(self, max_history: int = 200):
+        self._max_history = max_history
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+            # Видаляємо найстаріші завершені завдання, активні не чіпаємо.
+            excess = len(self._jobs) - self._max_history
+            for job_id in list(self._jobs.keys()):
+                if excess <= 0:
+                    break
+                if self._jobs[job_id].status in FINISHED_STATES:
+                    del self._jobs[job_id]
+                    excess -= 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, status: Optional[str] = None) -> List[Job]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if status:
+            jobs = [job for job in jobs if job.status == status]
+        return jobs
+
+
+def new_job(
+    action: str,
+    params: Dict[str, Any],
+    runner: Optional[Runner] = None,
+    priority: Optional[int] = None,
+    deadline: Optional[float] = None,
+    internal: bool = False,
+    session: Optional[str] = None,
+) -> Job:
+    """Створює завдання з унікальним ідентифікатором.
+
+    Завдання, поставлене з іншого завдання (воркер пулу -> локальна черга),
+    успадковує його скасування та дедлайн.
+    """
+
+    return Job(
+        id=uuid.uuid4().hex,
+        action=action,
+        params=dict(params),
+        runner=runner,
+        priority=PRIORITY_NORMAL if priority is None else priority,
+        token=CancelToken(deadline, parent=current_token()),
+        internal=internal,
+        session=session,
+    )
+
+
+def arm_deadline(job: Job, on_expire: Callable[[Job], Any]) -> None:
+    """Викликає ``on_expire`` у момент дедлайну, якщо завдання ще не завершене."""
+
+    remaining = job.token.remaining()
+    if remaining is None:
+        return
+    timer = threading.Timer(remaining, on_expire, args=(job,))
+    timer.daemon = True
+    timer.start()
+    job.future.add_done_callback(lambda _future: timer.cancel())
+
+
+def finish_job(
+    job: Job,
+    result: Optional[Dict[str, Any]] = None,
+    exc: Optional[BaseException] = None,
+    error_formatter: Optional[ErrorFormatter] = None,
+) -> None:
+    """Фіксує результат або помилку завдання та розблоковує його ``future``."""
+
+    job.finished_at = time.time()
+    if isinstance(exc, JobCancelled):
+        job.error = (error_formatter or _default_error_formatter)(exc)
+        job.status = JOB_CANCELLED
+        LOGGER.info(
+            "Завдання %s (%s) скасовано (%s).",
+            job.id,
+            job.action,
+            exc.reason,
+            extra={"job_id": job.id, "duration_ms": _ms(job.started_at, job.finished_at)},
+        )
+        job.future.set_exception(exc)
+        return
+    if exc is not None:
+        job.error = (error_formatter or _default_error_formatter)(exc)
+        job.status = JOB_FAILED
+        LOGGER.warning(
+            "Завдання %s (%s) завершилось помилкою: %s",
+            job.id,
+            job.action,
+            exc,
+            extra={"job_id": job.id, "duration_ms": _ms(job.started_at, job.finished_at)},
+        )
+        job.future.set_exception(exc)
+        return
+    job.result = result
+    job.status = JOB_DONE
+    duration_ms = _ms(job.started_at, job.finished_at)
+    LOGGER.log(
+        logging.DEBUG if job.internal else logging.INFO,
+        "Завдання %s (%s) виконано за %s мс.",
+        job.id,
+        job.action,
+        duration_ms,
+        extra={"job_id": job.id, "duration_ms": duration_ms},
+    )
+    job.future.set_result(result)
+
+
+class JobQueue:
+    """Черга з пріоритетами та одним робочим потоком, що володіє GUI-сесією EBPro.
+
+    pywinauto/UIA не люблять звернень з різних потоків, тому всі дії
+    виконуються послідовно в одному потоці, а event loop FastAPI лише
+    чекає на ``Future`` завдання. Наступним береться завдання з найвищим
+    класом пріоритету, серед рівних — з найближчим дедлайном, далі FIFO.
+    Завдання, що чекає в черзі, скасовується одразу; те, що виконується, —
+    у найближчій безпечній точці дії (``cancellation.checkpoint``).
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        error_formatter: Optional[ErrorFormatter] = None,
+        max_history: int = 200,
+    ):
+        self._runner = runner
+        self._error_formatter = error_formatter or _default_error_formatter
+        self._history = JobHistory(max_history)
+        self._queue: "queue.PriorityQueue[Tuple[Any, ...]]" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Запускає робочий потік, якщо він ще не працює."""
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._worker, name="ebpro-gui-worker", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Зупиняє робочий потік після завершення поточних завдань."""
+
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put((float("inf"), float("inf"), next(self._sequence), None))
+        thread.join(timeout)
+        self._thread = None
+
+    def submit(
+        self,
+        action: str,
+        params: Dict[str, Any],
+        runner: Optional[Runner] = None,
+        priority: Optional[int] = None,
+        deadline: Optional[float] = None,
+        internal: bool = False,
+        session: Optional[str] = None,
+    ) -> Job:
+        """Ставить дію в чергу та повертає створене завдання.
+
+        ``runner`` дозволяє виконати завдання іншою функцією (наприклад, пакет
+        кроків), але все одно в тому самому робочому потоці. ``deadline`` —
+        epoch-секунди, після яких завдання скасовується. ``internal`` — службове
+        завдання без запису в історію (кадри трансляції). ``session`` лише
+        зберігається: у локальній черзі всі дії й так виконуються в одній сесії.
+        """
+
+        job = new_job(
+            action, params, runner, priority=priority, deadline=deadline, internal=internal, session=session
+        )
+        if not internal:
+            self._history.add(job)
+        self.start()
+        self._queue.put(job.order()[:2] + (next(self._sequence), job))
+        arm_deadline(job, lambda expired: self._cancel(expired, REASON_DEADLINE))
+        LOGGER.log(
+            logging.DEBUG if internal else logging.INFO,
+            "Завдання %s (%s) поставлено в чергу.",
+            job.id,
+            action,
+            extra={"job_id": job.id},
+        )
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Скасовує завдання; повертає його або None, якщо id невідомий."""
+
+        job = self._history.get(job_id)
+        if job is not None:
+            self._cancel(job, REASON_CANCELLED)
+        return job
+
+    def _cancel(self, job: Job, reason: str) -> None:
+        with self._state_lock:
+            if job.future.done() or not job.token.cancel(reason):
+                return
+            if job.status != JOB_QUEUED:
+                LOGGER.info("Завдання %s буде зупинено у найближчій безпечній точці.", job.id)
+                return
+            job.status = JOB_CANCELLED
+        finish_job(job, exc=JobCancelled(reason), error_formatter=self._error_formatter)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Повертає завдання за ідентифікатором або None."""
+
+        return self._history.get(job_id)
+
+    def list(self, status: Optional[str] = None) -> List[Job]:
+        """Повертає завдання у порядку постановки, з опційним фільтром стану."""
+
+        return self._history.list(status)
+
+    def pending(self) -> int:
+        """Кількість завдань, що очікують на виконання."""
+
+        return self._queue.qsize()
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()[-1]
+            if job is None:
+                break
+            job.context.run(self._run, job)
+
+    def _run(self, job: Job) -> None:
+        with self._state_lock:
+            if job.status != JOB_QUEUED:
+                return  # скасовано, поки чекало в черзі
+            expired = job.token.cancelled
+            if not expired:
+                job.status = JOB_RUNNING
+                job.started_at = time.time()
+        if expired:
+            finish_job(job, exc=JobCancelled(job.token.reason or REASON_DEADLINE), error_formatter=self._error_formatter)
+            return
+        try:
+            with bind_token(job.token):
+                result = (job.runner or self._runner)(job.action, job.params)
+        except Exception as exc:  # noqa: BLE001 - помилку повертаємо клієнту
+            finish_job(job, exc=exc, error_formatter=self._error_formatter)
+            return
+        finish_job(job, result)
+
+
+__all__ = [
+    "FINISHED_STATES",
+    "PRIORITIES",
+    "PRIORITY_BATCH",
+    "PRIORITY_INTERACTIVE",
+    "PRIORITY_NORMAL",
+    "arm_deadline",
+    "parse_priority",
+    "priority_name",
+    "Job",
+    "JobHistory",
+    "JobQueue",
+    "new_job",
+    "finish_job",
+    "JOB_QUEUED",
+    "JOB_RUNNING",
+    "JOB_DONE",
+    "JOB_FAILED",
+    "JOB_CANCELLED",
+]
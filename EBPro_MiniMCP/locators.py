@@ -0,0 +1,195 @@
+"""Кеш розв'язаних локаторів елементів UI EBPro: меню, стрічка, файлові діалоги."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger("ebpro.locators")
+
+Layout = Tuple[int, ...]
+
+SCOPE_WINDOW = "window"
+SCOPE_POPUP = "popup"
+
+
+@dataclass
+class ElementLocator:
+    """Ідентифікатори елемента UIA, знайденого повним обходом дерева.
+
+    ``scope`` — де шукати елемент повторно: у головному вікні (пункти меню
+    верхнього рівня, вкладки й кнопки стрічки) чи у випадному меню. Для
+    елементів головного вікна зберігається й сама обгортка ``element``.
+    """
+
+    title: str
+    control_type: str
+    auto_id: str = ""
+    scope: str = SCOPE_WINDOW
+    element: Any = field(default=None, repr=False, compare=False)
+
+    def matches(self, info: Any) -> bool:
+        """Чи відповідає ``element_info`` цьому локатору (спершу за automation id)."""
+
+        if getattr(info, "control_type", None) != self.control_type:
+            return False
+        if self.auto_id:
+            return getattr(info, "automation_id", "") == self.auto_id
+        return getattr(info, "name", None) == self.title
+
+    def to_dict(self) -> Dict[str, str]:
+        """Ідентифікатори без обгортки — для збереження у макросі."""
+
+        return {"title": self.title, "control_type": self.control_type, "auto_id": self.auto_id, "scope": self.scope}
+
+
+@dataclass
+class MenuRoute:
+    """Розв'язаний шлях меню для конкретного вікна та його компонування."""
+
+    window_id: Any
+    layout: Layout
+    steps: List[ElementLocator]
+    hits: int = 0
+
+
+class MenuLocatorCache:
+    """Кеш шляхів меню: ключ — шлях, запис дійсний лише для того самого вікна.
+
+    Запис відкидається, якщо змінився дескриптор вікна (EBPro перезапущено,
+    вікно перестворено) або компонування — розмір вікна чи DPI, від яких
+    залежить розкладка стрічки.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._routes: Dict[Tuple[str, ...], MenuRoute] = {}
+        self._lock = threading.Lock()
+
+    def get(self, window_id: Any, path: Sequence[str], layout: Layout) -> Optional[MenuRoute]:
+        """Повертає збережений шлях або None (застарілий запис видаляється)."""
+
+        key = tuple(path)
+        with self._lock:
+            route = self._routes.get(key)
+            if route is not None and (route.window_id != window_id or route.layout != layout):
+                LOGGER.info("Локатори меню %s застаріли (вікно або компонування змінились).", "->".join(key))
+                del self._routes[key]
+                route = None
+            if route is None:
+                self.misses += 1
+                return None
+            route.hits += 1
+            self.hits += 1
+            return route
+
+    def put(self, window_id: Any, path: Sequence[str], layout: Layout, steps: Sequence[ElementLocator]) -> MenuRoute:
+        """Запам'ятовує шлях, знайдений повним обходом."""
+
+        route = MenuRoute(window_id=window_id, layout=tuple(layout), steps=list(steps))
+        with self._lock:
+            if len(self._routes) >= self.max_entries:
+                self._routes.pop(next(iter(self._routes)))
+            self._routes[tuple(path)] = route
+        return route
+
+    def discard(self, path: Sequence[str]) -> None:
+        """Видаляє шлях, за яким кешовані локатори не спрацювали."""
+
+        with self._lock:
+            self._routes.pop(tuple(path), None)
+
+    def invalidate(self) -> None:
+        """Скидає всі шляхи (перезапуск EBPro, зміна локалізації)."""
+
+        with self._lock:
+            self._routes.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._routes)}
+
+
+class SelectorRegistry:
+    """Варіанти селекторів діалогів, що спрацювали на цій машині.
+
+    Для кожного діалогу (``open``, ``save``) зберігається список варіантів —
+    точний заголовок, назва кнопки, automation id поля Edit — від останнього
+    успішного. Пошук спершу пробує їх, а широкі регулярні вирази лишаються
+    запасним варіантом. Список зберігається у JSON між перезапусками.
+    """
+
+    def __init__(self, path: Optional[Path], max_variants: int = 4):
+        self.path = Path(path) if path else None
+        self.max_variants = max_variants
+        self._lock = threading.Lock()
+        self._data: Dict[str, List[Dict[str, str]]] = self._load()
+
+    def _load(self) -> Dict[str, List[Dict[str, str]]]:
+        if self.path is None:
+            return {}
+        try:
+            with self.path.open("r", encoding="utf-8") as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            LOGGER.warning("Реєстр селекторів %s пошкоджено, починаємо з порожнього.", self.path)
+            return {}
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fp:
+            json.dump(self._data, fp, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+
+    def variants(self, name: str) -> List[Dict[str, str]]:
+        """Вивчені варіанти діалогу від останнього успішного."""
+
+        with self._lock:
+            return [dict(variant) for variant in self._data.get(name, [])]
+
+    def learn(self, name: str, **selectors: str) -> None:
+        """Ставить варіант, що щойно спрацював, першим (поля з тим самим title зливаються)."""
+
+        selectors = {key: value for key, value in selectors.items() if value}
+        with self._lock:
+            variants = self._data.setdefault(name, [])
+            current = next((item for item in variants if item.get("title") == selectors.get("title")), None)
+            merged = {**(current or {}), **selectors}
+            if variants and variants[0] == merged:
+                return
+            if current is not None:
+                variants.remove(current)
+            variants.insert(0, merged)
+            del variants[self.max_variants :]
+            self._save()
+        LOGGER.info("Селектор діалогу '%s' запам'ятовано: %s", name, merged)
+
+    def forget(self, name: Optional[str] = None) -> None:
+        """Забуває варіанти діалогу (або всі), наприклад після зміни локалізації."""
+
+        with self._lock:
+            if name is None:
+                self._data.clear()
+            else:
+                self._data.pop(name, None)
+            self._save()
+
+
+__all__ = [
+    "ElementLocator",
+    "MenuLocatorCache",
+    "MenuRoute",
+    "SCOPE_POPUP",
+    "SCOPE_WINDOW",
+    "SelectorRegistry",
+]
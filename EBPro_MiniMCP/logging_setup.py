@@ -0,0 +1,272 @@
+"""Неблокуюче логування Mini-MCP: черга, ротація зі стисненням, JSON-рядки.
+
+Обробники запитів і GUI-потік лише кладуть запис у чергу (``QueueHandler``);
+запис на диск, ротація та gzip старих сегментів виконуються окремим потоком
+``QueueListener``. Кожен запис отримує ``request_id`` і ``action`` з контексту
+запиту, тож їх видно і в текстовому, і в JSON-форматі.
+"""
+from __future__ import annotations
+
+import atexit
+import contextvars
+import gzip
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .metrics import current_action
+
+LOGGER = logging.getLogger("ebpro.logging")
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s [%(request_id)s] - %(message)s"
+
+# Позначка для докладних записів про під-кроки, які можна проріджувати:
+# LOGGER.info("...", extra=VERBOSE).
+VERBOSE = {"verbose": True}
+
+_REQUEST: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("ebpro_request", default=None)
+_EXTRA_FIELDS = ("request_id", "action", "duration_ms", "job_id")
+
+_LISTENER: Optional[logging.handlers.QueueListener] = None
+_QUEUE_HANDLER: Optional[logging.Handler] = None
+
+
+def new_request_id() -> str:
+    """Короткий ідентифікатор запиту для кореляції записів логу."""
+
+    return uuid.uuid4().hex[:12]
+
+
+@contextmanager
+def request_scope(request_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Встановлює контекст запиту; записи всередині отримують його ``request_id``."""
+
+    scope = {"request_id": request_id or new_request_id(), "action": ""}
+    token = _REQUEST.set(scope)
+    try:
+        yield scope
+    finally:
+        _REQUEST.reset(token)
+
+
+def set_request_action(action: str) -> None:
+    """Фіксує розпізнану дію у контексті поточного запиту."""
+
+    scope = _REQUEST.get()
+    if scope is not None:
+        scope["action"] = action
+
+
+class ContextFilter(logging.Filter):
+    """Додає до запису ``request_id`` та ``action`` з контексту запиту."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        scope = _REQUEST.get() or {}
+        if not getattr(record, "request_id", None):
+            record.request_id = scope.get("request_id") or "-"
+        if not getattr(record, "action", None):
+            record.action = current_action() or scope.get("action", "")
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускає кожен ``1/rate``-й докладний запис з кожного місця виклику.
+
+    Докладними вважаються DEBUG-записи та записи з ``extra=VERBOSE``;
+    попередження й помилки проходять завжди.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.period = max(1, round(1.0 / rate)) if rate > 0 else 0
+        self._counters: Dict[Any, Iterator[int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if record.levelno > logging.DEBUG and not getattr(record, "verbose", False):
+            return True
+        if self.period == 0:
+            return False
+        counter = self._counters.setdefault((record.pathname, record.lineno), itertools.count())
+        return next(counter) % self.period == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Один JSON-об'єкт на рядок: час, рівень, логер, повідомлення та контекст."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in _EXTRA_FIELDS:
+            value = getattr(record, name, None)
+            if value not in (None, "", "-"):
+                payload[name] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class CompressingRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """Файл логу з ротацією за розміром та/або часом і gzip старих сегментів.
+
+    Сегменти мають вигляд ``ebpro_mcp.log.20240101-120000[.gz]``; зберігається
+    не більше ``backup_count`` найновіших.
+    """
+
+    def __init__(
+        self,
+        filename: Path,
+        max_bytes: int = 0,
+        interval: float = 0.0,
+        backup_count: int = 7,
+        compress: bool = True,
+        encoding: str = "utf-8",
+    ):
+        # Каталог і файл створюються під час першого запису, а не в конструкторі.
+        super().__init__(str(filename), "a", encoding=encoding, delay=True)
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.compress = compress
+        self.rollover_at = time.time() + interval if interval > 0 else None
+
+    def _open(self) -> Any:
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:  # noqa: N802 - API logging
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def _segment_path(self) -> Path:
+        base = Path(self.baseFilename)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        target = base.with_name(f"{base.name}.{stamp}")
+        for index in itertools.count(1):
+            if not target.exists() and not target.with_name(target.name + ".gz").exists():
+                return target
+            target = base.with_name(f"{base.name}.{stamp}-{index}")
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def segments(self) -> List[Path]:
+        """Збережені сегменти від найстарішого до найновішого."""
+
+        base = Path(self.baseFilename)
+        return sorted(base.parent.glob(base.name + ".*"), key=lambda path: path.stat().st_mtime)
+
+    def doRollover(self) -> None:  # noqa: N802 - API logging
+        if self.stream:
+            self.stream.close()
+            self.stream = None  # type: ignore[assignment]
+        base = Path(self.baseFilename)
+        if base.exists() and base.stat().st_size > 0:
+            segment = self._segment_path()
+            os.replace(base, segment)
+            if self.compress:
+                with segment.open("rb") as source, gzip.open(f"{segment}.gz", "wb") as target:
+                    shutil.copyfileobj(source, target)
+                segment.unlink()
+        segments = self.segments()
+        for stale in segments[: max(0, len(segments) - self.backup_count)]:
+            stale.unlink(missing_ok=True)
+        if self.interval > 0:
+            self.rollover_at = time.time() + self.interval
+        self.stream = self._open()
+
+
+def configure_logging(
+    log_file: Path,
+    level: str = "INFO",
+    fmt: str = "text",
+    max_bytes: int = 0,
+    rotate_interval: float = 0.0,
+    backup_count: int = 7,
+    compress: bool = True,
+    sample_rate: float = 1.0,
+) -> logging.handlers.QueueListener:
+    """Перенаправляє кореневий логер у фонову чергу з консоллю та файлом.
+
+    Повторний виклик замінює попередню конфігурацію (зупиняє старий потік).
+    """
+
+    global _LISTENER, _QUEUE_HANDLER
+    shutdown_logging()
+
+    formatter: logging.Formatter
+    formatter = JsonFormatter() if fmt.lower() == "json" else logging.Formatter(TEXT_FORMAT)
+    console = logging.StreamHandler()
+    file_handler = CompressingRotatingFileHandler(
+        log_file,
+        max_bytes=max_bytes,
+        interval=rotate_interval,
+        backup_count=backup_count,
+        compress=compress,
+    )
+    for handler in (console, file_handler):
+        handler.setFormatter(formatter)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    if sample_rate < 1.0:
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    root.addHandler(queue_handler)
+
+    _LISTENER = logging.handlers.QueueListener(log_queue, console, file_handler, respect_handler_level=True)
+    _LISTENER.start()
+    _QUEUE_HANDLER = queue_handler
+    return _LISTENER
+
+
+def shutdown_logging() -> None:
+    """Дописує чергу на диск і від'єднує обробники (при зупинці сервісу)."""
+
+    global _LISTENER, _QUEUE_HANDLER
+    if _QUEUE_HANDLER is not None:
+        logging.getLogger().removeHandler(_QUEUE_HANDLER)
+        _QUEUE_HANDLER = None
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        for handler in _LISTENER.handlers:
+            handler.close()
+        _LISTENER = None
+
+
+atexit.register(shutdown_logging)
+
+
+__all__ = [
+    "VERBOSE",
+    "CompressingRotatingFileHandler",
+    "ContextFilter",
+    "JsonFormatter",
+    "SamplingFilter",
+    "configure_logging",
+    "new_request_id",
+    "request_scope",
+    "set_request_action",
+    "shutdown_logging",
+]
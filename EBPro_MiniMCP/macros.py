@@ -0,0 +1,281 @@
+"""Макроси GUI-дій: запис розв'язаних кроків і їх швидке відтворення.
+
+Успішне виконання дії (``open_project``, ``pack_ecmp`` ...) записується як
+компактна послідовність кроків: пункт меню з ідентифікаторами UIA кожного
+рівня, файловий діалог із точним заголовком, automation id поля та кнопки
+або клавішами підтвердження, а також очікуваний стан вікна перед кроком.
+Наступні виконання беруть крок із макросу, перевіряють його дешевою
+перевіркою і діють напряму; якщо перевірка не пройшла, бекенд виконує
+повний пошук, а макрос перезаписується новою послідовністю.
+
+Макроси зберігаються у JSON окремо для кожного профілю — версії EBPro та
+мови інтерфейсу, — бо саме від них залежать назви й ідентифікатори.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+LOGGER = logging.getLogger("ebpro.macros")
+
+STORE_VERSION = 1
+
+STEP_MENU = "menu"
+STEP_DIALOG = "dialog"
+
+_RUN: contextvars.ContextVar[Optional["MacroRun"]] = contextvars.ContextVar("ebpro_macro", default=None)
+
+
+@dataclass
+class MacroStep:
+    """Один розв'язаний крок: тип, ціль (шлях меню або ключ діалогу), очікуване вікно та дані."""
+
+    kind: str
+    target: str
+    expect: str = ""
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "target": self.target, "expect": self.expect, "data": self.data}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MacroStep":
+        return cls(kind=data["kind"], target=data["target"], expect=data.get("expect", ""), data=data.get("data", {}))
+
+
+@dataclass
+class Macro:
+    """Записана послідовність кроків дії."""
+
+    action: str
+    steps: List[MacroStep]
+    recorded_at: float = field(default_factory=time.time)
+    replays: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "action": self.action,
+            "steps": [step.to_dict() for step in self.steps],
+            "recorded_at": self.recorded_at,
+            "replays": self.replays,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Macro":
+        return cls(
+            action=data["action"],
+            steps=[MacroStep.from_dict(item) for item in data.get("steps", [])],
+            recorded_at=data.get("recorded_at", 0.0),
+            replays=data.get("replays", 0),
+        )
+
+
+class MacroRun:
+    """Запис і відтворення однієї дії; бекенд звертається до нього через ``current_run``.
+
+    Крок макросу видається за позицією: n-й GUI-крок дії отримує n-й
+    записаний крок, якщо збігаються тип і ціль. Кожен фактично виконаний
+    крок (відтворений чи знайдений повним пошуком) записується заново.
+    """
+
+    def __init__(self, action: str, profile: str, macro: Optional[Macro] = None):
+        self.action = action
+        self.profile = profile
+        self.macro = macro
+        self.recorded: List[MacroStep] = []
+        self.replayed = 0
+        self.misses = 0
+
+    def next_step(self, kind: str, target: str) -> Optional[MacroStep]:
+        """Записаний крок для поточної позиції або None (макросу немає чи послідовність інша)."""
+
+        if self.macro is None:
+            return None
+        index = len(self.recorded)
+        if index >= len(self.macro.steps):
+            return None
+        step = self.macro.steps[index]
+        if step.kind != kind or step.target != target:
+            return None
+        return step
+
+    def record(self, kind: str, target: str, expect: str = "", replayed: bool = False, **data: Any) -> None:
+        """Додає виконаний крок до нового запису."""
+
+        self.recorded.append(MacroStep(kind=kind, target=target, expect=expect, data=data))
+        if replayed:
+            self.replayed += 1
+
+    def miss(self, step: MacroStep, reason: Any) -> None:
+        """Позначає, що перевірка записаного кроку не пройшла і буде повний пошук."""
+
+        self.misses += 1
+        LOGGER.info("Крок макросу %s (%s %s) не пройшов перевірку: %s.", self.action, step.kind, step.target, reason)
+
+    @property
+    def matched(self) -> bool:
+        """Чи дія пройшла точно за записаним макросом."""
+
+        return self.macro is not None and not self.misses and self.recorded == self.macro.steps
+
+
+def current_run() -> Optional[MacroRun]:
+    """Макрос дії, в межах якої виконується поточний код."""
+
+    return _RUN.get()
+
+
+class MacroStore:
+    """Макроси за профілем (``<версія EBPro>/<мова>``) і назвою дії у JSON-файлі."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = Path(path) if path else None
+        self.replays = 0
+        self.recordings = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, Dict[str, Macro]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Macro]]:
+        if self.path is None:
+            return {}
+        try:
+            with self.path.open("r", encoding="utf-8") as fp:
+                data = json.load(fp)
+            if data.get("version") != STORE_VERSION:
+                return {}
+            return {
+                profile: {action: Macro.from_dict(item) for action, item in macros.items()}
+                for profile, macros in data.get("profiles", {}).items()
+            }
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            LOGGER.warning("Сховище макросів %s пошкоджено, починаємо з порожнього.", self.path)
+            return {}
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": STORE_VERSION,
+            "profiles": {
+                profile: {action: macro.to_dict() for action, macro in macros.items()}
+                for profile, macros in self._profiles.items()
+            },
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fp:
+            json.dump(data, fp, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+
+    def get(self, profile: str, action: str) -> Optional[Macro]:
+        with self._lock:
+            return self._profiles.get(profile, {}).get(action)
+
+    def put(self, profile: str, macro: Macro) -> None:
+        with self._lock:
+            self._profiles.setdefault(profile, {})[macro.action] = macro
+            self._save()
+
+    def discard(self, profile: str, action: str) -> None:
+        """Видаляє макрос, який більше не відповідає інтерфейсу."""
+
+        with self._lock:
+            if self._profiles.get(profile, {}).pop(action, None) is not None:
+                self._save()
+                LOGGER.info("Макрос %s для %s видалено.", action, profile)
+
+    def forget(self, profile: Optional[str] = None, action: Optional[str] = None) -> int:
+        """Забуває макроси профілю, дії або всі; повертає кількість видалених."""
+
+        with self._lock:
+            removed = 0
+            for name in [profile] if profile is not None else list(self._profiles):
+                macros = self._profiles.get(name, {})
+                for key in [action] if action is not None else list(macros):
+                    removed += macros.pop(key, None) is not None
+                if not macros:
+                    self._profiles.pop(name, None)
+            if removed:
+                self._save()
+            return removed
+
+    def finish(self, run: MacroRun) -> None:
+        """Підсумок успішної дії: зараховує відтворення або зберігає новий запис."""
+
+        if run.misses:
+            self.fallbacks += 1
+        if not run.recorded:
+            # Дія не торкалася GUI (наприклад, збірку взято з кешу) — записувати нічого.
+            return
+        if run.matched:
+            with self._lock:
+                run.macro.replays += 1
+                self.replays += 1
+            return
+        self.put(run.profile, Macro(action=run.action, steps=list(run.recorded)))
+        self.recordings += 1
+        LOGGER.info("Макрос %s для %s записано: %s кроків.", run.action, run.profile, len(run.recorded))
+
+    def snapshot(self, profile: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Макроси профілю (або всіх профілів) для діагностики."""
+
+        with self._lock:
+            return {
+                name: {action: macro.to_dict() for action, macro in macros.items()}
+                for name, macros in self._profiles.items()
+                if profile is None or name == profile
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "profiles": len(self._profiles),
+                "macros": sum(len(macros) for macros in self._profiles.values()),
+                "replays": self.replays,
+                "recordings": self.recordings,
+                "fallbacks": self.fallbacks,
+            }
+
+
+@contextmanager
+def macro_scope(action: str, store: MacroStore, profile: str) -> Iterator[MacroRun]:
+    """Виконує блок як дію ``action``: відтворює її макрос і записує новий.
+
+    Невдала дія не змінює сховище, крім одного випадку: якщо записаний крок
+    не пройшов перевірку, застарілий макрос видаляється.
+    """
+
+    run = MacroRun(action, profile, store.get(profile, action))
+    token = _RUN.set(run)
+    try:
+        yield run
+    except BaseException:
+        if run.misses:
+            store.discard(profile, action)
+        raise
+    else:
+        store.finish(run)
+    finally:
+        _RUN.reset(token)
+
+
+__all__ = [
+    "Macro",
+    "MacroRun",
+    "MacroStep",
+    "MacroStore",
+    "STEP_DIALOG",
+    "STEP_MENU",
+    "current_run",
+    "macro_scope",
+]
@@ -0,0 +1,369 @@
+"""Model Context Protocol (JSON-RPC 2.0) для EBPro Mini-MCP: stdio та streamable HTTP.
+
+Кожна дія з ``SUPPORTED_ACTIONS`` доступна як інструмент зі схемою
+аргументів, тож NLP не потрібен. Запити з одного з'єднання обробляються
+конкурентно: відповідь на ``ping`` чи ``tools/list`` не чекає на збірку, а
+відповіді надсилаються в порядку завершення (з ``id`` запиту). Сама дія
+виконується через ту саму чергу, що й ``/run``; цей модуль лише розбирає
+повідомлення та форматує результати, а виконання передається функцією
+``execute`` з ``mcp_server``.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+LOGGER = logging.getLogger("ebpro.mcp")
+
+PROTOCOL_VERSIONS = ("2025-06-18", "2025-03-26", "2024-11-05")
+JSONRPC = "2.0"
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+Message = Dict[str, Any]
+Send = Callable[[Message], None]
+Progress = Callable[[Dict[str, Any]], None]
+
+_SCHEDULING = {
+    "priority": {"type": "string", "enum": ["interactive", "normal", "batch"], "description": "Клас пріоритету в черзі."},
+    "timeout": {"type": "number", "exclusiveMinimum": 0, "description": "Дедлайн у секундах, включно з чергою."},
+}
+
+# Аргументи інструментів; priority і timeout додаються до кожного.
+TOOL_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "open_project": {
+        "description": "Відкрити проєкт *.emtp або *.ecmp у EasyBuilder Pro (шлях або назва з PROJECT_ROOTS).",
+        "properties": {"path": {"type": "string", "description": "Шлях до файлу проєкту або його назва."}},
+        "required": ["path"],
+    },
+    "build_exob": {
+        "description": "Зібрати відкритий проєкт у EXOB і повернути помилки та попередження компілятора.",
+        "properties": {"use_cache": {"type": "boolean", "description": "Брати артефакт з кешу, якщо проєкт не змінився."}},
+    },
+    "run_offline_sim": {
+        "description": "Запустити офлайн-симуляцію відкритого проєкту.",
+        "properties": {},
+    },
+    "take_screenshot": {
+        "description": "Знімок вікна симулятора; зображення повертається прямо в результаті.",
+        "properties": {
+            "out": {"type": "string", "description": "Необов'язковий шлях для збереження файлу."},
+            "format": {"type": "string", "enum": ["png", "jpeg", "webp"]},
+            "region": {"type": "array", "items": {"type": "integer"}, "minItems": 4, "maxItems": 4},
+            "quality": {"type": "integer", "minimum": 1, "maximum": 100},
+            "compress_level": {"type": "integer", "minimum": 0, "maximum": 9},
+            "scale": {"type": "number", "exclusiveMinimum": 0, "maximum": 1},
+            "baseline": {"type": "string", "description": "Еталонне зображення для візуальної регресії."},
+            "mask": {
+                "type": "array",
+                "description": "Області [x, y, ширина, висота], що не порівнюються (годинник, анімації).",
+                "items": {"type": "array", "items": {"type": "integer"}, "minItems": 4, "maxItems": 4},
+            },
+            "tolerance": {"type": "integer", "minimum": 0, "maximum": 255},
+            "max_diff_ratio": {"type": "number", "minimum": 0, "maximum": 1},
+        },
+        "annotations": {"readOnlyHint": True},
+    },
+    "pack_ecmp": {
+        "description": "Запакувати проєкт у *.ecmp (Compress Project).",
+        "properties": {
+            "out": {"type": "string", "description": "Шлях до вихідного *.ecmp."},
+            "wait": {"type": "boolean", "description": "Чекати, поки файл перестане рости."},
+        },
+        "required": ["out"],
+    },
+}
+
+_JSON_TYPES = {
+    "string": str,
+    "boolean": bool,
+    "integer": int,
+    "number": (int, float),
+    "array": list,
+    "object": dict,
+}
+
+
+class ProtocolError(Exception):
+    """Помилка рівня JSON-RPC (невідомий метод, некоректні параметри)."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+@dataclass
+class ToolOutput:
+    """Результат інструмента: структуровані дані та необов'язкове зображення."""
+
+    data: Dict[str, Any]
+    image: Optional[bytes] = None
+    media_type: Optional[str] = None
+
+
+Execute = Callable[[str, Dict[str, Any], Optional[Progress]], Awaitable[ToolOutput]]
+DescribeError = Callable[[BaseException], Dict[str, Any]]
+
+
+def build_tools(actions: Sequence[str]) -> List[Dict[str, Any]]:
+    """Описи інструментів для ``tools/list`` у порядку ``actions``."""
+
+    tools: List[Dict[str, Any]] = []
+    for name in actions:
+        spec = TOOL_SCHEMAS[name]
+        tool: Dict[str, Any] = {
+            "name": name,
+            "description": spec["description"],
+            "inputSchema": {
+                "type": "object",
+                "properties": {**spec["properties"], **_SCHEDULING},
+                "required": list(spec.get("required", [])),
+                "additionalProperties": False,
+            },
+        }
+        if "annotations" in spec:
+            tool["annotations"] = dict(spec["annotations"])
+        tools.append(tool)
+    return tools
+
+
+def _check_value(name: str, value: Any, schema: Dict[str, Any]) -> None:
+    expected = _JSON_TYPES[schema["type"]]
+    if not isinstance(value, expected) or (schema["type"] in ("integer", "number") and isinstance(value, bool)):
+        raise ProtocolError(INVALID_PARAMS, f"Аргумент {name} має бути типу {schema['type']}.")
+    if "enum" in schema and value not in schema["enum"]:
+        raise ProtocolError(INVALID_PARAMS, f"Аргумент {name}: допустимі значення {', '.join(schema['enum'])}.")
+    if "minimum" in schema and value < schema["minimum"] or "maximum" in schema and value > schema["maximum"]:
+        raise ProtocolError(INVALID_PARAMS, f"Аргумент {name} поза допустимими межами.")
+    if "exclusiveMinimum" in schema and value <= schema["exclusiveMinimum"]:
+        raise ProtocolError(INVALID_PARAMS, f"Аргумент {name} має бути більшим за {schema['exclusiveMinimum']}.")
+    if schema["type"] == "array":
+        if not schema.get("minItems", 0) <= len(value) <= schema.get("maxItems", len(value)):
+            raise ProtocolError(INVALID_PARAMS, f"Аргумент {name} має неправильну кількість елементів.")
+        for item in value:
+            _check_value(name, item, schema["items"])
+
+
+def validate_arguments(tool: Dict[str, Any], arguments: Any) -> Dict[str, Any]:
+    """Перевіряє аргументи за ``inputSchema`` (лише використані в схемах ключові слова)."""
+
+    if not isinstance(arguments, dict):
+        raise ProtocolError(INVALID_PARAMS, "arguments має бути об'єктом.")
+    schema = tool["inputSchema"]
+    missing = [name for name in schema["required"] if name not in arguments]
+    if missing:
+        raise ProtocolError(INVALID_PARAMS, f"Не вистачає аргументів: {', '.join(missing)}.")
+    unknown = [name for name in arguments if name not in schema["properties"]]
+    if unknown:
+        raise ProtocolError(INVALID_PARAMS, f"Невідомі аргументи: {', '.join(unknown)}.")
+    for name, value in arguments.items():
+        _check_value(name, value, schema["properties"][name])
+    return dict(arguments)
+
+
+def _error(message_id: Any, code: int, message: str) -> Message:
+    return {"jsonrpc": JSONRPC, "id": message_id, "error": {"code": code, "message": message}}
+
+
+def _summary(data: Dict[str, Any]) -> str:
+    lines = [data.get("notes") or "Дію виконано успішно."]
+    if data.get("file"):
+        lines.append(f"Файл: {data['file']}")
+    build = data.get("build") or {}
+    for level in ("errors", "warnings"):
+        lines.extend(build.get(level) or [])
+    return "\n".join(lines)
+
+
+class MCPServer:
+    """Обробник повідомлень MCP, незалежний від транспорту.
+
+    ``execute(action, arguments, progress)`` ставить дію в чергу й чекає на
+    результат; ``describe_error`` перетворює виняток дії на ``code``/
+    ``message``/``hint``. Помилки дій повертаються як результат з
+    ``isError``, щоб агент бачив підказку, а помилки протоколу — як
+    JSON-RPC error.
+    """
+
+    def __init__(
+        self,
+        execute: Execute,
+        describe_error: DescribeError,
+        tools: List[Dict[str, Any]],
+        name: str = "ebpro-mini-mcp",
+        version: str = "0.1.0",
+        instructions: str = "",
+    ):
+        self.execute = execute
+        self.describe_error = describe_error
+        self.tools = {tool["name"]: tool for tool in tools}
+        self.server_info = {"name": name, "version": version}
+        self.instructions = instructions
+        # Запити, що виконуються, за (сесія клієнта, id): різні клієнти /mcp можуть мати однакові id.
+        self._inflight: Dict[Tuple[Optional[str], Any], "asyncio.Task[Any]"] = {}
+
+    async def handle_payload(
+        self, payload: Union[bytes, str], send: Send, session: Optional[str] = None
+    ) -> Union[None, Message, List[Message]]:
+        """Розбирає тіло (одне повідомлення або масив) і повертає відповіді.
+
+        ``session`` — сесія або з'єднання клієнта; ``notifications/cancelled``
+        скасовує лише запити тієї самої сесії.
+        """
+
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return _error(None, PARSE_ERROR, "Некоректний JSON.")
+        if isinstance(data, list):
+            if not data:
+                return _error(None, INVALID_REQUEST, "Порожній масив повідомлень.")
+            responses = await asyncio.gather(*(self.handle_message(item, send, session) for item in data))
+            found = [response for response in responses if response is not None]
+            return found or None
+        return await self.handle_message(data, send, session)
+
+    async def handle_message(self, message: Any, send: Send, session: Optional[str] = None) -> Optional[Message]:
+        """Повертає відповідь на запит або None для сповіщень і скасованих запитів."""
+
+        if not isinstance(message, dict) or message.get("jsonrpc") != JSONRPC:
+            return _error(None, INVALID_REQUEST, "Очікується повідомлення JSON-RPC 2.0.")
+        method = message.get("method")
+        if method is None:
+            return None  # відповідь клієнта на запит сервера; сервер таких не надсилає
+        if "id" not in message:
+            self._notification(method, message.get("params") or {}, session)
+            return None
+        message_id = message["id"]
+        key = (session, message_id)
+        task = asyncio.ensure_future(self._dispatch(method, message.get("params") or {}, send))
+        self._inflight[key] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            LOGGER.info("MCP-запит %s скасовано клієнтом.", message_id)
+            return None
+        except ProtocolError as exc:
+            return _error(message_id, exc.code, str(exc))
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+        return {"jsonrpc": JSONRPC, "id": message_id, "result": result}
+
+    def _notification(self, method: str, params: Dict[str, Any], session: Optional[str] = None) -> None:
+        if method == "notifications/cancelled":
+            task = self._inflight.get((session, params.get("requestId")))
+            if task is not None:
+                task.cancel()
+
+    async def _dispatch(self, method: str, params: Dict[str, Any], send: Send) -> Dict[str, Any]:
+        if method == "initialize":
+            requested = params.get("protocolVersion")
+            return {
+                "protocolVersion": requested if requested in PROTOCOL_VERSIONS else PROTOCOL_VERSIONS[0],
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": dict(self.server_info),
+                "instructions": self.instructions,
+            }
+        if method == "ping":
+            return {}
+        if method == "tools/list":
+            return {"tools": list(self.tools.values())}
+        if method == "tools/call":
+            return await self._call_tool(params, send)
+        raise ProtocolError(METHOD_NOT_FOUND, f"Метод {method} не підтримується.")
+
+    async def _call_tool(self, params: Dict[str, Any], send: Send) -> Dict[str, Any]:
+        name = params.get("name")
+        tool = self.tools.get(name)
+        if tool is None:
+            raise ProtocolError(INVALID_PARAMS, f"Невідомий інструмент {name}. Доступні: {', '.join(self.tools)}.")
+        arguments = validate_arguments(tool, params.get("arguments") or {})
+        token = (params.get("_meta") or {}).get("progressToken")
+        progress: Optional[Progress] = None
+        if token is not None:
+            counter = iter(range(1, 1 << 31))
+
+            def progress(event: Dict[str, Any]) -> None:
+                details = {key: value for key, value in event.items() if key not in ("event", "elapsed_ms")}
+                text = event["event"] + (": " + json.dumps(details, ensure_ascii=False, default=str) if details else "")
+                send(
+                    {
+                        "jsonrpc": JSONRPC,
+                        "method": "notifications/progress",
+                        "params": {"progressToken": token, "progress": next(counter), "message": text},
+                    }
+                )
+
+        try:
+            output = await self.execute(name, arguments, progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001 - помилку дії повертаємо агенту
+            error = self.describe_error(exc)
+            text = error["message"] + (f"\nПідказка: {error['hint']}" if error.get("hint") else "")
+            return {"content": [{"type": "text", "text": text}], "structuredContent": error, "isError": True}
+        content: List[Dict[str, Any]] = []
+        if output.image is not None:
+            content.append(
+                {"type": "image", "data": base64.b64encode(output.image).decode("ascii"), "mimeType": output.media_type}
+            )
+        content.append({"type": "text", "text": _summary(output.data)})
+        return {"content": content, "structuredContent": output.data, "isError": False}
+
+
+async def serve_stdio(server: MCPServer, reader: BinaryIO, writer: BinaryIO) -> None:
+    """Обслуговує MCP через stdio: одне JSON-повідомлення на рядок.
+
+    Рядки читаються у фоновому потоці (працює і з каналами Windows), кожен
+    запит обробляється окремою задачею, а запис у ``writer`` серіалізовано.
+    """
+
+    loop = asyncio.get_running_loop()
+    lock = threading.Lock()
+    tasks: "set[asyncio.Task[Any]]" = set()
+
+    def send(message: Union[Message, List[Message]]) -> None:
+        data = json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+        with lock:
+            writer.write(data)
+            writer.flush()
+
+    async def _handle(line: bytes) -> None:
+        response = await server.handle_payload(line, send)
+        if response is not None:
+            send(response)
+
+    while True:
+        line = await loop.run_in_executor(None, reader.readline)
+        if not line:
+            break
+        if not line.strip():
+            continue
+        task = asyncio.ensure_future(_handle(line))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+__all__ = [
+    "MCPServer",
+    "PROTOCOL_VERSIONS",
+    "ProtocolError",
+    "TOOL_SCHEMAS",
+    "ToolOutput",
+    "build_tools",
+    "serve_stdio",
+    "validate_arguments",
+]
@@ -1,25 +1,56 @@
 """FastAPI-сервіс EBPro Mini-MCP."""
 from __future__ import annotations
 
+import argparse
+import asyncio
+import contextvars
+import json
 import logging
+import mimetypes
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
+from . import metrics
+from .cancellation import REASON_DEADLINE, JobCancelled, checkpoint
+from .coalescing import OUTCOME_NEW, OUTCOME_REPLAYED, IdempotencyConflict, RequestCoalescer
 from .ebpro_actions import (
+    BuildFailedError,
     FriendlyError,
-    build_exob,
+    WaitTimeoutError,
+    baseline_path,
+    build_project,
+    capture_screenshot,
+    diff_options,
+    get_build_cache,
+    get_macro_store,
+    get_project_index,
+    grab_frame,
     load_config,
+    macro_profile,
     open_project,
     pack_ecmp,
+    resolve_project,
     run_offline_sim,
+    stop_ahk_worker,
     take_screenshot,
+    warm_up,
 )
-from .nlp import NLPError, parse_instruction
+from .frames import BOUNDARY, mjpeg_stream
+from .jobs import FINISHED_STATES, PRIORITIES, PRIORITY_INTERACTIVE, JobQueue, parse_priority
+from .logging_setup import configure_logging, new_request_id, request_scope, set_request_action
+from .mcp_protocol import MCPServer, Progress, ToolOutput, build_tools, serve_stdio
+from .nlp import NLPError, Plan, parse_plan
+from .progress import ProgressChannel, bind_channel, report
+from .visual_diff import compare_directory
+from .workers import WorkerPool, create_pool
 
 APP_VERSION = "0.1.0"
 BUILD_DATE = datetime.utcnow().strftime("%Y-%m-%d")
@@ -31,19 +62,28 @@ SUPPORTED_ACTIONS = [
     "pack_ecmp",
 ]
 
-# Налаштування логування: консоль + файл.
+# Налаштування логування: консоль + файл через фонову чергу з ротацією.
+# Вмикається під час старту сервера (або в main для stdio), а не під час імпорту.
 LOG_DIR = Path(__file__).resolve().parent / "logs"
-LOG_DIR.mkdir(exist_ok=True)
 LOG_FILE = LOG_DIR / "ebpro_mcp.log"
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(LOG_FILE, encoding="utf-8"),
-    ],
-)
+
+
+def _configure_logging() -> None:
+    config = load_config()
+    configure_logging(
+        LOG_FILE,
+        level=config.LOG_LEVEL,
+        fmt=config.LOG_FORMAT,
+        max_bytes=config.LOG_MAX_MB * 1024 * 1024,
+        rotate_interval=config.LOG_ROTATE_HOURS * 3600.0,
+        backup_count=config.LOG_BACKUP_COUNT,
+        compress=config.LOG_COMPRESS,
+        sample_rate=config.LOG_SAMPLE_RATE,
+    )
+
+
 LOGGER = logging.getLogger("ebpro.server")
+ACCESS_LOGGER = logging.getLogger("ebpro.access")
 
 app = FastAPI(title="EBPro Mini-MCP", version=APP_VERSION)
 app.add_middleware(
@@ -55,12 +95,70 @@ app.add_middleware(
 )
 
 
+# Ендпоінти, чиї запити враховуються в ebpro_requests_total / ebpro_request_duration_seconds.
+METERED_PATHS = ("/run", "/run/stream", "/mcp")
+# Статус відмови до виконання дії -> мітка reason.
+_REJECTION_REASONS = {
+    400: metrics.REASON_PARSE,
+    401: metrics.REASON_AUTH,
+    403: metrics.REASON_AUTH,
+    422: metrics.REASON_PARSE,
+}
+
+
+@app.middleware("http")
+async def _request_context(request: Request, call_next: Any) -> Response:
+    """Присвоює запиту ідентифікатор (або бере X-Request-ID), логує тривалість і рахує відмови.
+
+    Запити, відхилені до виконання дії (токен — 401, розбір — 400/422),
+    обробник у метриках не записує, тож їх враховує middleware.
+    """
+
+    started = time.perf_counter()
+    with request_scope(request.headers.get("X-Request-ID")) as scope, metrics.request_outcome() as outcome:
+        response = await call_next(request)
+        if request.url.path in METERED_PATHS and not outcome["observed"]:
+            reason = _REJECTION_REASONS.get(response.status_code)
+            if reason is not None:
+                metrics.observe_request(scope["action"], time.perf_counter() - started, reason)
+        duration_ms = round((time.perf_counter() - started) * 1000.0, 1)
+        ACCESS_LOGGER.info(
+            "%s %s -> %s за %.1f мс",
+            request.method,
+            request.url.path,
+            response.status_code,
+            duration_ms,
+            extra={"duration_ms": duration_ms},
+        )
+    response.headers["X-Request-ID"] = scope["request_id"]
+    return response
+
+
+def _failure_reason(exc: BaseException) -> str:
+    """Причина для мітки ``reason``: вичерпаний час (очікування чи дедлайн) або помилка дії."""
+
+    if isinstance(exc, WaitTimeoutError) or (isinstance(exc, JobCancelled) and exc.reason == REASON_DEADLINE):
+        return metrics.REASON_TIMEOUT
+    return metrics.REASON_ACTION
+
+
 class RunRequest(BaseModel):
     """Схема запиту для виконання україномовного завдання."""
 
-    text: str
+    text: str = ""
     args: Optional[Dict[str, Any]] = None
     token: Optional[str] = None
+    async_mode: bool = False
+    # Явна дія з SUPPORTED_ACTIONS: NLP пропускається, параметри беруться з args.
+    action: Optional[str] = None
+    # Повтор з тим самим ключем протягом IDEMPOTENCY_TTL отримує збережений результат.
+    idempotency_key: Optional[str] = None
+    # Клас пріоритету (interactive/normal/batch); за замовчуванням — з ACTION_PRIORITIES.
+    priority: Optional[str] = None
+    # Дедлайн у секундах від прийому запиту, включно з очікуванням у черзі.
+    timeout: Optional[float] = Field(default=None, gt=0)
+    # Ключ сесії клієнта: у пулі воркерів дії з тим самим ключем ідуть туди, де відкрито його проєкт.
+    session: Optional[str] = None
 
 
 class RunResponse(BaseModel):
@@ -70,6 +168,13 @@ class RunResponse(BaseModel):
     action: str
     file: Optional[str] = None
     notes: Optional[str] = None
+    job_id: Optional[str] = None
+    # Підсумок збірки: ok, artifact, errors, warnings, duration, cached.
+    build: Optional[Dict[str, Any]] = None
+    # Результати кроків, якщо текст містив кілька дій ("відкрий ..., збери і ...").
+    steps: Optional[List[Dict[str, Any]]] = None
+    # Порівняння знімка з еталоном: passed, changed_ratio, boxes, precheck.
+    diff: Optional[Dict[str, Any]] = None
 
 
 class ErrorResponse(BaseModel):
@@ -80,20 +185,93 @@ class ErrorResponse(BaseModel):
     hint: str
 
 
+class ScreenshotRequest(BaseModel):
+    """Параметри знімка вікна симулятора, що повертається прямо у відповіді."""
+
+    token: Optional[str] = None
+    format: str = "png"
+    region: Optional[List[int]] = None
+    quality: Optional[int] = Field(default=None, ge=1, le=100)
+    compress_level: Optional[int] = Field(default=None, ge=0, le=9)
+    scale: Optional[float] = Field(default=None, gt=0, le=1)
+    # Еталон для візуальної регресії (відносний шлях — від BASELINE_DIR) і параметри порівняння.
+    baseline: Optional[str] = None
+    mask: Optional[List[List[int]]] = None
+    tolerance: Optional[int] = Field(default=None, ge=0, le=255)
+    max_diff_ratio: Optional[float] = Field(default=None, ge=0, le=1)
+
+
+class CompareRequest(BaseModel):
+    """Пакетне порівняння каталогу знімків з однойменними еталонами."""
+
+    token: Optional[str] = None
+    captures: str
+    baselines: str = ""
+    pattern: str = "*.png"
+    mask: Optional[List[List[int]]] = None
+    tolerance: Optional[int] = Field(default=None, ge=0, le=255)
+    max_diff_ratio: Optional[float] = Field(default=None, ge=0, le=1)
+    # Кількість процесів; 0 — DIFF_WORKERS або кількість ядер.
+    workers: int = Field(default=0, ge=0)
+
+
+class BatchStep(BaseModel):
+    """Один крок пакетного запиту: текст завдання та аргументи."""
+
+    text: str = ""
+    args: Optional[Dict[str, Any]] = None
+    action: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    """Послідовність кроків, що виконуються в одній сесії EBPro."""
+
+    steps: List[BatchStep]
+    token: Optional[str] = None
+    stop_on_error: bool = True
+    priority: Optional[str] = None
+    timeout: Optional[float] = Field(default=None, gt=0)
+    session: Optional[str] = None
+
+
+class BatchStepResult(BaseModel):
+    """Результат окремого кроку пакета."""
+
+    index: int
+    action: str
+    ok: bool
+    skipped: bool = False
+    file: Optional[str] = None
+    notes: Optional[str] = None
+    error: Optional[ErrorResponse] = None
+    duration_ms: Optional[float] = None
+    build: Optional[Dict[str, Any]] = None
+
+
+class BatchResponse(BaseModel):
+    """Відповідь пакетного запиту з результатами по кроках."""
+
+    ok: bool
+    steps: List[BatchStepResult]
+    duration_ms: float
+    job_id: Optional[str] = None
+
+
 def _ensure_token(token: Optional[str]) -> None:
     """Перевіряє токен API, якщо він налаштований."""
 
     config = load_config()
-    if config.API_TOKEN and token != config.API_TOKEN:
-        LOGGER.warning("Отримано некоректний токен доступу.")
-        raise HTTPException(
-            status_code=401,
-            detail=ErrorResponse(
-                code="unauthorized",
-                message="Потрібен коректний API token.",
-                hint="Встановіть правильний token у config.json або у полі запиту.",
-            ).dict(),
-        )
+    with metrics.stage("auth"):
+        if config.API_TOKEN and token != config.API_TOKEN:
+            LOGGER.warning("Отримано некоректний токен доступу.")
+            raise HTTPException(
+                status_code=401,
+                detail=ErrorResponse(
+                    code="unauthorized",
+                    message="Потрібен коректний API token.",
+                    hint="Встановіть правильний token у config.json або у полі запиту.",
+                ).dict(),
+            )
 
 
 @app.get("/health")
@@ -103,6 +281,24 @@ async def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/ready")
+async def ready() -> Dict[str, Any]:
+    """Готовність обслуговувати запити без холодного старту (на відміну від /health)."""
+
+    if READINESS["state"] == "ready":
+        return {"status": "ready", "warm_up_ms": READINESS["timings"]}
+    if READINESS["state"] == "failed":
+        raise HTTPException(status_code=503, detail=READINESS["error"])
+    raise HTTPException(
+        status_code=503,
+        detail=ErrorResponse(
+            code="warming_up",
+            message="Сервіс ще прогрівається: запуск EBPro та пошук вікон.",
+            hint="Повторіть запит за кілька секунд.",
+        ).dict(),
+    )
+
+
 @app.get("/version")
 async def version() -> Dict[str, Any]:
     """Повертає інформацію про версію та підтримувані команди."""
@@ -111,81 +307,1013 @@ async def version() -> Dict[str, Any]:
         "version": APP_VERSION,
         "build_date": BUILD_DATE,
         "commands": SUPPORTED_ACTIONS,
+        "backend": load_config().AUTOMATION_BACKEND,
     }
 
 
-@app.post("/run", response_model=RunResponse)
-async def run_command(request: RunRequest) -> RunResponse:
-    """Приймає україномовне завдання та виконує відповідну дію у EBPro."""
+def _screenshot_options(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Вибирає з args параметри кодування та обрізки знімка."""
 
-    _ensure_token(request.token)
+    return {
+        "fmt": params.get("format"),
+        "region": params.get("region"),
+        "quality": params.get("quality"),
+        "compress_level": params.get("compress_level"),
+        "scale": params.get("scale"),
+    }
 
-    try:
-        action, params = parse_instruction(request.text, request.args or {})
-    except NLPError as exc:
-        LOGGER.error("Помилка NLP: %s", exc)
-        raise HTTPException(
-            status_code=400,
-            detail=ErrorResponse(
-                code="invalid_instruction",
-                message=str(exc),
-                hint="Використайте ключові слова відкрий/зібрати/симуляція/скріншот/запакуй.",
-            ).dict(),
-        )
 
-    try:
+def _diff_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Вибирає з args еталон і параметри порівняння знімка."""
+
+    return {
+        "baseline": params.get("baseline"),
+        "mask": params.get("mask"),
+        "tolerance": params.get("tolerance"),
+        "max_diff_ratio": params.get("max_diff_ratio"),
+    }
+
+
+def _diff_notes(diff: Any) -> str:
+    if diff.passed:
+        return "Знімок збігається з еталоном."
+    return f"Знімок відрізняється від еталона: змінено {diff.changed_ratio:.2%} пікселів, областей {len(diff.boxes)}."
+
+
+def _compare_screenshot(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Знімок з порівнянням у пам'яті; файл ``out`` (необов'язковий) пишеться вже після порівняння."""
+
+    out = params.get("out")
+    options = _screenshot_options(params)
+    if not options["fmt"] and out:
+        options["fmt"] = Path(out).suffix.lstrip(".") or None
+    shot = capture_screenshot(**options, **_diff_params(params))
+    if out:
+        output = Path(out)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with metrics.stage("file_save"):
+            output.write_bytes(shot.content)
+    return {"file": out, "notes": _diff_notes(shot.diff), "diff": shot.diff.to_dict()}
+
+
+def _run_action(action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Виконує розпізнану дію у EBPro. Викликається з робочого потоку черги."""
+
+    with metrics.bind_action(action), metrics.stage("action"):
+        report("started", action=action)
         file_path: Optional[str] = None
+        build: Optional[Any] = None
         if action == "open_project":
             open_project(params["path"])
         elif action == "build_exob":
-            build_exob()
+            build = build_project(use_cache=params.get("use_cache", True))
+            file_path = build.artifact
         elif action == "run_offline_sim":
             run_offline_sim()
+        elif action == "take_screenshot" and params.get("baseline"):
+            return _compare_screenshot(params)
         elif action == "take_screenshot":
-            file_path = take_screenshot(params["out"])
+            file_path = take_screenshot(params["out"], **_screenshot_options(params))
         elif action == "pack_ecmp":
-            file_path = pack_ecmp(params["out"])
+            file_path = pack_ecmp(params["out"], wait=params.get("wait", False))
         else:
             raise FriendlyError(
                 f"Дія {action} ще не реалізована.",
                 "Оновіть Mini-MCP або зверніться до розробника для додавання функціоналу.",
             )
-    except KeyError as exc:
+
+    notes = "Дію виконано успішно."
+    if action == "run_offline_sim":
+        notes = "Симуляцію запущено. Перевірте вікно EasySimulator."
+    if build is None:
+        return {"file": file_path, "notes": notes}
+    if build.cached:
+        notes = "Проєкт не змінився, артефакт взято з кешу збірки."
+    elif not build.confirmed and build.hint:
+        notes = build.hint
+    elif build.warnings:
+        notes = f"Збірку завершено з попередженнями: {len(build.warnings)}."
+    return {"file": file_path, "notes": notes, "build": build.to_dict()}
+
+
+def _describe_error(exc: BaseException) -> Tuple[int, ErrorResponse]:
+    """Перетворює виняток дії на HTTP-статус та дружній опис."""
+
+    if isinstance(exc, KeyError):
+        return 400, ErrorResponse(
+            code="missing_argument",
+            message=f"Не вистачає параметра {exc}.",
+            hint="Передайте значення у полі args або в тексті запиту.",
+        )
+    if isinstance(exc, BuildFailedError):
+        return 422, ErrorResponse(
+            code="build_failed",
+            message=str(exc),
+            hint=exc.hint,
+        )
+    if isinstance(exc, JobCancelled):
+        deadline = exc.reason == REASON_DEADLINE
+        return (504 if deadline else 409), ErrorResponse(
+            code="deadline_exceeded" if deadline else "cancelled",
+            message=str(exc),
+            hint=exc.hint,
+        )
+    if isinstance(exc, IdempotencyConflict):
+        return 422, ErrorResponse(
+            code="idempotency_conflict",
+            message=str(exc),
+            hint=exc.hint,
+        )
+    if isinstance(exc, FriendlyError):
+        return 500, ErrorResponse(
+            code="action_failed",
+            message=str(exc),
+            hint=exc.hint,
+        )
+    return 500, ErrorResponse(
+        code="internal_error",
+        message="Сталася непередбачена помилка.",
+        hint="Перевірте логи ebpro_mcp.log для детальної інформації.",
+    )
+
+
+def _log_action_error(exc: BaseException) -> None:
+    if isinstance(exc, KeyError):
         LOGGER.error("Відсутній необхідний параметр: %s", exc)
+    elif isinstance(exc, JobCancelled):
+        LOGGER.warning("Завдання зупинено: %s", exc)
+    elif isinstance(exc, FriendlyError):
+        LOGGER.error("Помилка бізнес-логіки: %s", exc)
+    else:  # pragma: no cover - непередбачувані помилки
+        LOGGER.error("Непередбачена помилка виконання дії", exc_info=exc)
+
+
+def _action_http_error(exc: BaseException) -> HTTPException:
+    """Логує помилку дії та повертає відповідний HTTPException."""
+
+    _log_action_error(exc)
+    status_code, error = _describe_error(exc)
+    return HTTPException(status_code=status_code, detail=error.dict())
+
+
+def _job_error(exc: BaseException) -> Dict[str, Any]:
+    return _describe_error(exc)[1].dict()
+
+
+JOB_QUEUE = JobQueue(_run_action, error_formatter=_job_error)
+
+
+def _create_dispatcher() -> Union[JobQueue, WorkerPool]:
+    """Одна локальна черга або пул воркерів, якщо у config.json задано WORKERS."""
+
+    specs = load_config().WORKERS
+    if not specs:
+        return JOB_QUEUE
+    LOGGER.info("Запускаємо пул з %s воркерів.", len(specs))
+    return create_pool(specs, JOB_QUEUE, error_formatter=_job_error)
+
+
+DISPATCHER = _create_dispatcher()
+COALESCER = RequestCoalescer(
+    ttl=load_config().IDEMPOTENCY_TTL,
+    coalesce=load_config().COALESCE_REQUESTS,
+)
+
+
+def _coalesce(action: str, params: Dict[str, Any], dispatcher: Any, **options: Any) -> Any:
+    """Ставить завдання через COALESCER і рахує запити, що приєднались до чужого."""
+
+    shared = COALESCER.submit(dispatcher, action, params, **options)
+    if shared.outcome != OUTCOME_NEW:
+        metrics.COALESCED_TOTAL.inc(action=action, outcome=shared.outcome)
+    return shared
+
+
+def _scheduling(
+    action: str,
+    priority: Optional[str] = None,
+    timeout: Optional[float] = None,
+    session: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Пріоритет (з запиту або ACTION_PRIORITIES), дедлайн і сесія клієнта для диспетчера."""
+
+    try:
+        value = parse_priority(priority or load_config().ACTION_PRIORITIES.get(action))
+    except ValueError as exc:
         raise HTTPException(
             status_code=400,
             detail=ErrorResponse(
-                code="missing_argument",
-                message=f"Не вистачає параметра {exc}.",
-                hint="Передайте значення у полі args або в тексті запиту.",
+                code="invalid_priority",
+                message=str(exc),
+                hint=f"Використайте один з класів: {', '.join(PRIORITIES)}.",
             ).dict(),
         )
-    except FriendlyError as exc:
-        LOGGER.error("Помилка бізнес-логіки: %s", exc)
+    return {"priority": value, "deadline": time.time() + timeout if timeout else None, "session": session}
+
+
+def _submit_with_progress(
+    action: str, params: Dict[str, Any], idempotency_key: Optional[str], **scheduling: Any
+) -> Any:
+    """Ставить дію з каналом прогресу, спільним для всіх запитів, що до неї приєднались."""
+
+    channel = ProgressChannel()
+    runner = _run_batch if action == "batch" else None
+    with bind_channel(channel):
+        shared = _coalesce(
+            action, params, DISPATCHER, runner=runner, idempotency_key=idempotency_key, artifact=channel, **scheduling
+        )
+    if shared.outcome == OUTCOME_NEW:
+        shared.job.future.add_done_callback(lambda _future: channel.close())
+    return shared
+
+
+# Стан прогріву для /ready: ready, warming або failed.
+READINESS: Dict[str, Any] = {"state": "ready", "timings": None, "error": None}
+
+
+def _finish_warm_up(future: Any) -> None:
+    exc = future.exception()
+    if exc is None:
+        READINESS.update(state="ready", timings=future.result(), error=None)
+        return
+    LOGGER.error("Прогрів не вдався: %s", exc)
+    READINESS.update(state="failed", error=_job_error(exc))
+
+
+@app.on_event("startup")
+async def _start_logging() -> None:
+    """Підключає файл логу та фоновий потік запису перед рештою хуків старту."""
+
+    _configure_logging()
+
+
+@app.on_event("startup")
+async def _start_warm_up() -> None:
+    """Прогріває сесію EBPro у GUI-потоці, не затримуючи старт HTTP-сервера."""
+
+    if not load_config().WARMUP_ON_START:
+        return
+    READINESS.update(state="warming", timings=None, error=None)
+    job = JOB_QUEUE.submit("warm_up", {}, runner=lambda _action, _params: warm_up())
+    job.future.add_done_callback(_finish_warm_up)
+
+
+@app.on_event("startup")
+async def _start_project_index() -> None:
+    """Оновлює індекс проєктів у фоні, щоб перший пошук за назвою не сканував диск."""
+
+    index = get_project_index()
+    if index is not None:
+        index.refresh_async()
+
+
+def _parse_step(text: str, args: Optional[Dict[str, Any]], action: Optional[str] = None) -> Plan:
+    """Повертає план [(дія, параметри)]: явну дію або результат NLP-розбору тексту."""
+
+    started = time.perf_counter()
+    try:
+        if action is not None:
+            if action not in SUPPORTED_ACTIONS:
+                raise NLPError(f"Дія {action} не підтримується. Доступні: {', '.join(SUPPORTED_ACTIONS)}.")
+            plan = [(action, dict(args or {}))]
+        else:
+            # Без PROJECT_ROOTS пошук за назвою вимкнено: значення в лапках лишається шляхом.
+            resolver = resolve_project if get_project_index() is not None else None
+            plan = parse_plan(text, args or {}, resolve_project=resolver)
+    except NLPError as exc:
+        metrics.observe_stage("parse", time.perf_counter() - started, action or "", exc)
+        raise
+    metrics.observe_stage("parse", time.perf_counter() - started, plan[0][0] if len(plan) == 1 else "batch")
+    return plan
+
+
+def _parse_request(request: RunRequest) -> Tuple[str, Dict[str, Any]]:
+    """Розбирає текст запиту в одну дію або пакет, перетворюючи NLPError на HTTP 400.
+
+    Кілька дій в одному тексті виконуються як пакет (одне завдання, одна
+    сесія EBPro), що зупиняється на першій помилці.
+    """
+
+    try:
+        plan = _parse_step(request.text, request.args, request.action)
+    except NLPError as exc:
+        LOGGER.error("Помилка NLP: %s", exc)
         raise HTTPException(
-            status_code=500,
+            status_code=400,
             detail=ErrorResponse(
-                code="action_failed",
+                code="invalid_instruction",
                 message=str(exc),
-                hint=exc.hint,
+                hint="Використайте ключові слова відкрий/зібрати/симуляція/скріншот/запакуй.",
+            ).dict(),
+        )
+    if len(plan) == 1:
+        return plan[0]
+    return "batch", {"plan": plan, "stop_on_error": True}
+
+
+def _plan_outcome(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Поля RunResponse для пакета, отриманого з одного тексту."""
+
+    steps = result["steps"]
+    files = [step["file"] for step in steps if step.get("file")]
+    done = sum(1 for step in steps if step["ok"])
+    notes = f"Виконано кроків: {done} з {len(steps)}."
+    return {"ok": result["ok"], "steps": steps, "file": files[-1] if files else None, "notes": notes}
+
+
+def _server_timing(**stages_ms: float) -> str:
+    """Форматує заголовок Server-Timing (мілісекунди по етапах запиту)."""
+
+    return ", ".join(f"{name};dur={value:.2f}" for name, value in stages_ms.items())
+
+
+@app.post("/run", response_model=RunResponse)
+async def run_command(
+    request: RunRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> RunResponse:
+    """Приймає україномовне завдання та виконує відповідну дію у EBPro.
+
+    Однакові запити, що прийшли, поки перший ще виконується, отримують його
+    результат; ключ ідемпотентності (поле або заголовок Idempotency-Key)
+    повертає результат уже завершеного запиту.
+    """
+
+    started = time.perf_counter()
+    _ensure_token(request.token)
+    authorized = time.perf_counter()
+    action, params = _parse_request(request)
+    parsed = time.perf_counter()
+    set_request_action(action)
+    scheduling = _scheduling(action, request.priority, request.timeout, request.session)
+
+    try:
+        shared = _submit_with_progress(action, params, request.idempotency_key or idempotency_key, **scheduling)
+    except IdempotencyConflict as exc:
+        raise _action_http_error(exc) from exc
+    job = shared.job
+    if shared.outcome != OUTCOME_NEW:
+        response.headers["X-Coalesced"] = shared.outcome
+    if request.async_mode:
+        response.status_code = 202
+        return RunResponse(
+            ok=True,
+            action=action,
+            job_id=job.id,
+            notes="Завдання поставлено в чергу. Стан доступний у /jobs/{id}.",
+        )
+
+    try:
+        result = await asyncio.wrap_future(job.future)
+    except Exception as exc:
+        metrics.observe_request(action, time.perf_counter() - started, _failure_reason(exc))
+        raise _action_http_error(exc) from exc
+
+    total_ms = (time.perf_counter() - started) * 1000.0
+    action_ms = 0.0
+    if shared.outcome != OUTCOME_REPLAYED:
+        action_ms = ((job.finished_at or 0.0) - (job.started_at or 0.0)) * 1000.0
+    auth_ms = (authorized - started) * 1000.0
+    parse_ms = (parsed - authorized) * 1000.0
+    dispatch_ms = max(total_ms - auth_ms - parse_ms - action_ms, 0.0)
+    metrics.observe_stage("dispatch", dispatch_ms / 1000.0, action)
+    metrics.observe_request(action, total_ms / 1000.0)
+    response.headers["Server-Timing"] = _server_timing(
+        auth=auth_ms,
+        parse=parse_ms,
+        dispatch=dispatch_ms,
+        action=action_ms,
+    )
+    if action == "batch":
+        return RunResponse(action=action, job_id=job.id, **_plan_outcome(result))
+    return RunResponse(ok=True, action=action, job_id=job.id, **result)
+
+
+# Дії, що на час потоку прогресу чекають готового файлу замість "вистрілив і забув"
+# (збірка чекає завершення завжди).
+WAITABLE_ACTIONS = ("pack_ecmp",)
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    """Форматує подію прогресу як повідомлення text/event-stream."""
+
+    payload = {key: value for key, value in event.items() if key != "event"}
+    return f"event: {event['event']}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _progress_events(action: str, shared: Any, started: float) -> Any:
+    """Передає події каналу завдання, а наприкінці — done з результатом або error."""
+
+    job = shared.job
+    channel: Optional[ProgressChannel] = shared.artifact if isinstance(shared.artifact, ProgressChannel) else None
+    yield _sse({"event": "queued", "action": action, "job_id": job.id, "outcome": shared.outcome})
+    if channel is not None:
+        queue = channel.subscribe()
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield _sse(event)
+        finally:
+            channel.unsubscribe(queue)
+
+    try:
+        result = await asyncio.wrap_future(job.future)
+    except Exception as exc:
+        _log_action_error(exc)
+        metrics.observe_request(action, time.perf_counter() - started, _failure_reason(exc))
+        elapsed_ms = round((time.perf_counter() - started) * 1000.0, 1)
+        yield _sse({"event": "error", "elapsed_ms": elapsed_ms, **_job_error(exc)})
+        return
+    metrics.observe_request(action, time.perf_counter() - started)
+    elapsed_ms = round((time.perf_counter() - started) * 1000.0, 1)
+    yield _sse({"event": "done", "elapsed_ms": elapsed_ms, "action": action, "job_id": job.id, **result})
+
+
+@app.post("/run/stream")
+async def run_stream(
+    request: RunRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> StreamingResponse:
+    """Виконує завдання, як /run, але відповідає потоком подій прогресу (SSE).
+
+    Події: queued, started, step (меню, діалог), dialog, file (appeared,
+    growing, stable, cached), diagnostic (помилки й попередження збірки), а
+    наприкінці done або error; кожна має ``elapsed_ms`` від постановки
+    завдання. Пакування в цьому режимі чекає, поки вихідний файл перестане
+    рости.
+    """
+
+    started = time.perf_counter()
+    _ensure_token(request.token)
+    action, params = _parse_request(request)
+    set_request_action(action)
+    if action in WAITABLE_ACTIONS:
+        params = {**params, "wait": True}
+    scheduling = _scheduling(action, request.priority, request.timeout, request.session)
+
+    try:
+        shared = _submit_with_progress(action, params, request.idempotency_key or idempotency_key, **scheduling)
+    except IdempotencyConflict as exc:
+        raise _action_http_error(exc) from exc
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if shared.outcome != OUTCOME_NEW:
+        headers["X-Coalesced"] = shared.outcome
+    return StreamingResponse(
+        _progress_events(action, shared, started),
+        media_type="text/event-stream",
+        headers=headers,
+    )
+
+
+def _run_batch(_: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Виконує кроки пакета по черзі в робочому потоці черги.
+
+    Скасування чи дедлайн зупиняють увесь пакет (завдання стає cancelled).
+    """
+
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    failed = False
+    for index, (action, step_params) in enumerate(params["plan"]):
+        if failed and params["stop_on_error"]:
+            results.append({"index": index, "action": action, "ok": False, "skipped": True})
+            continue
+        checkpoint()
+        step_started = time.perf_counter()
+        try:
+            outcome = _run_action(action, step_params)
+        except JobCancelled:
+            raise
+        except Exception as exc:
+            _log_action_error(exc)
+            failed = True
+            results.append(
+                {
+                    "index": index,
+                    "action": action,
+                    "ok": False,
+                    "error": _job_error(exc),
+                    "duration_ms": round((time.perf_counter() - step_started) * 1000.0, 1),
+                }
+            )
+            continue
+        results.append(
+            {
+                "index": index,
+                "action": action,
+                "ok": True,
+                "duration_ms": round((time.perf_counter() - step_started) * 1000.0, 1),
+                **outcome,
+            }
+        )
+    return {
+        "ok": not failed,
+        "steps": results,
+        "duration_ms": round((time.perf_counter() - started) * 1000.0, 1),
+    }
+
+
+@app.post("/run/batch", response_model=BatchResponse)
+async def run_batch(request: BatchRequest) -> BatchResponse:
+    """Виконує послідовність завдань за один запит і в одній сесії EBPro."""
+
+    _ensure_token(request.token)
+    if not request.steps:
+        raise HTTPException(
+            status_code=400,
+            detail=ErrorResponse(
+                code="empty_batch",
+                message="Пакет не містить жодного кроку.",
+                hint="Передайте хоча б один крок у полі steps.",
+            ).dict(),
+        )
+
+    # Розбираємо всі кроки до початку виконання, щоб не зупинитися посередині.
+    # Текст кроку з кількома діями розгортається у кілька кроків плану.
+    plan: Plan = []
+    for index, step in enumerate(request.steps):
+        try:
+            plan.extend(_parse_step(step.text, step.args, step.action))
+        except NLPError as exc:
+            LOGGER.error("Помилка NLP у кроці %s: %s", index, exc)
+            raise HTTPException(
+                status_code=400,
+                detail=ErrorResponse(
+                    code="invalid_instruction",
+                    message=f"Крок {index}: {exc}",
+                    hint="Використайте ключові слова відкрий/зібрати/симуляція/скріншот/запакуй.",
+                ).dict(),
+            )
+
+    job = DISPATCHER.submit(
+        "batch",
+        {"plan": plan, "stop_on_error": request.stop_on_error},
+        runner=_run_batch,
+        **_scheduling("batch", request.priority, request.timeout, request.session),
+    )
+    try:
+        result = await asyncio.wrap_future(job.future)
+    except Exception as exc:  # помилки кроків перехоплює _run_batch, сюди доходить скасування
+        raise _action_http_error(exc) from exc
+    return BatchResponse(job_id=job.id, **result)
+
+
+def _submit_screenshot(params: Dict[str, Any], **scheduling: Any) -> Any:
+    """Ставить знімок у пам'ять; ``artifact["image"]`` після завершення — ``ScreenshotData``.
+
+    Панелі й агенти, що просять знімок з однаковими параметрами одночасно,
+    отримують один і той самий кадр.
+    """
+
+    captured: Dict[str, Any] = {}
+
+    def _capture(_: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        options = dict(options)
+        # Воркер-агент передає вже знятий на своїй станції кадр.
+        image = options.pop("image", None)
+        if image is None:
+            with metrics.bind_action("take_screenshot"):
+                image = capture_screenshot(fmt=options.pop("format", None), **options)
+        captured["image"] = image
+        summary = {"media_type": image.media_type, "bytes": len(image.content), "width": image.width, "height": image.height}
+        if image.diff is not None:
+            summary["diff"] = image.diff.to_dict()
+        return summary
+
+    return _coalesce(
+        "take_screenshot",
+        params,
+        DISPATCHER,
+        runner=_capture,
+        artifact=captured,
+        **(scheduling or _scheduling("take_screenshot")),
+    )
+
+
+def _captured_image(shared: Any) -> Any:
+    """Кадр, знятий runner'ом ``_submit_screenshot``; бекенд без runner'а кадру не дає."""
+
+    image = shared.artifact.get("image")
+    if image is None:
+        raise FriendlyError(
+            "Воркер завершив знімок, але не повернув зображення.",
+            "Перевірте тип воркера у WORKERS: знімок у пам'ять підтримують local, agent і fake.",
+        )
+    return image
+
+
+@app.post("/screenshot")
+async def screenshot(request: ScreenshotRequest) -> Response:
+    """Повертає байти знімка вікна симулятора без проміжного файлу."""
+
+    _ensure_token(request.token)
+    shared = _submit_screenshot(request.dict(exclude={"token"}))
+    try:
+        await asyncio.wrap_future(shared.job.future)
+        image = _captured_image(shared)
+    except Exception as exc:
+        raise _action_http_error(exc) from exc
+
+    headers = {"X-Image-Width": str(image.width), "X-Image-Height": str(image.height)}
+    if image.diff is not None:
+        headers.update(
+            {
+                "X-Diff-Passed": "true" if image.diff.passed else "false",
+                "X-Diff-Ratio": f"{image.diff.changed_ratio:.6f}",
+                "X-Diff-Boxes": json.dumps(image.diff.boxes, separators=(",", ":")),
+                "X-Diff": json.dumps(image.diff.to_dict(), separators=(",", ":")),
+            }
+        )
+    return Response(content=image.content, media_type=image.media_type, headers=headers)
+
+
+@app.post("/screenshot/compare")
+async def compare_screenshots(request: CompareRequest) -> Dict[str, Any]:
+    """Порівнює каталог знімків з еталонами паралельно в кількох процесах.
+
+    Не займає GUI-чергу: працює лише з файлами. Відносний ``baselines``
+    (або порожній) береться від BASELINE_DIR.
+    """
+
+    _ensure_token(request.token)
+    try:
+        options = diff_options(request.mask, request.tolerance, request.max_diff_ratio)
+        return await asyncio.to_thread(
+            compare_directory,
+            Path(request.captures),
+            baseline_path(request.baselines),
+            options,
+            request.pattern,
+            request.workers or load_config().DIFF_WORKERS or None,
+        )
+    except Exception as exc:
+        raise _action_http_error(exc) from exc
+
+
+async def _forward_progress(channel: Optional[ProgressChannel], progress: Optional[Progress]) -> None:
+    if channel is None or progress is None:
+        return
+    queue = channel.subscribe()
+    try:
+        while (event := await queue.get()) is not None:
+            progress(event)
+    finally:
+        channel.unsubscribe(queue)
+
+
+# Mcp-Session-Id поточного запиту /mcp: інструменти однієї сесії виконуються на одному воркері пулу.
+_MCP_SESSION: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("ebpro_mcp_session", default=None)
+
+
+async def _mcp_execute(action: str, arguments: Dict[str, Any], progress: Optional[Progress]) -> ToolOutput:
+    """Виконує інструмент MCP через чергу, як /run, але без NLP і HTTP-моделей.
+
+    Знімок без ``out`` береться в пам'яті, з ``out`` — зберігається у файл і
+    читається назад, щоб повернути зображення прямо в результаті.
+    """
+
+    started = time.perf_counter()
+    scheduling = _scheduling(
+        action, arguments.pop("priority", None), arguments.pop("timeout", None), _MCP_SESSION.get()
+    )
+    with request_scope(None):
+        set_request_action(action)
+        if action == "take_screenshot" and not arguments.get("out"):
+            shared = _submit_screenshot(arguments, **scheduling)
+        else:
+            if action in WAITABLE_ACTIONS:
+                arguments.setdefault("wait", True)
+            shared = _submit_with_progress(action, arguments, None, **scheduling)
+    channel = shared.artifact if isinstance(shared.artifact, ProgressChannel) else None
+    try:
+        await _forward_progress(channel, progress)
+        result = await asyncio.wrap_future(shared.job.future)
+    except asyncio.CancelledError:
+        # notifications/cancelled: зупиняємо лише власне завдання, не чуже спільне.
+        if shared.outcome == OUTCOME_NEW:
+            DISPATCHER.cancel(shared.job.id)
+        raise
+    except Exception as exc:
+        _log_action_error(exc)
+        metrics.observe_request(action, time.perf_counter() - started, _failure_reason(exc))
+        raise
+    metrics.observe_request(action, time.perf_counter() - started)
+
+    if action != "take_screenshot":
+        return ToolOutput(dict(result))
+    if channel is None:
+        image = _captured_image(shared)
+        data = {"file": None, "notes": "Знімок повернуто у відповіді.", "width": image.width, "height": image.height}
+        if image.diff is not None:
+            data.update(notes=_diff_notes(image.diff), diff=image.diff.to_dict())
+        return ToolOutput(data, image.content, image.media_type)
+    content = await asyncio.to_thread(Path(result["file"]).read_bytes)
+    media_type = mimetypes.guess_type(result["file"])[0] or "image/png"
+    return ToolOutput(dict(result), content, media_type)
+
+
+MCP = MCPServer(
+    _mcp_execute,
+    _job_error,
+    build_tools(SUPPORTED_ACTIONS),
+    version=APP_VERSION,
+    instructions="Керування EasyBuilder Pro: відкриття проєкту, збірка, симуляція, знімки та пакування.",
+)
+
+
+@app.post("/mcp")
+async def mcp_endpoint(
+    request: Request,
+    token: Optional[str] = None,
+    authorization: Optional[str] = Header(None),
+) -> Response:
+    """MCP через streamable HTTP: одне повідомлення JSON-RPC або масив.
+
+    Запити масиву виконуються конкурентно. Якщо клієнт просить прогрес
+    (``_meta.progressToken``) і приймає ``text/event-stream``, відповідь іде
+    потоком SSE зі сповіщеннями ``notifications/progress``, інакше — JSON.
+    """
+
+    if authorization and authorization.lower().startswith("bearer "):
+        token = token or authorization[7:].strip()
+    _ensure_token(token)
+    body = await request.body()
+    session = request.headers.get("mcp-session-id")
+    _MCP_SESSION.set(session)
+    # Без сесії скасування з іншого запиту не знайде цей: id клієнтів можуть збігатися.
+    owner = session or new_request_id()
+    wants_progress = b"progressToken" in body and "text/event-stream" in request.headers.get("accept", "")
+    if not wants_progress:
+        response = await MCP.handle_payload(body, lambda _message: None, owner)
+        if response is None:
+            return Response(status_code=202)
+        return JSONResponse(response, headers=_mcp_session_headers(response))
+
+    queue: "asyncio.Queue[Optional[Any]]" = asyncio.Queue()
+
+    async def _run() -> None:
+        _MCP_SESSION.set(session)
+        try:
+            response = await MCP.handle_payload(body, queue.put_nowait, owner)
+            if response is not None:
+                queue.put_nowait(response)
+        finally:
+            queue.put_nowait(None)
+
+    async def _events() -> Any:
+        task = asyncio.ensure_future(_run())
+        try:
+            while (message := await queue.get()) is not None:
+                yield f"event: message\ndata: {json.dumps(message, ensure_ascii=False, default=str)}\n\n"
+        finally:
+            task.cancel()
+
+    return StreamingResponse(_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _mcp_session_headers(response: Any) -> Dict[str, str]:
+    """Mcp-Session-Id у відповіді на initialize (сервер не прив'язує стан до сесії)."""
+
+    messages = response if isinstance(response, list) else [response]
+    if any("protocolVersion" in (message.get("result") or {}) for message in messages):
+        return {"Mcp-Session-Id": new_request_id()}
+    return {}
+
+
+async def _stream_frame(scale: Optional[float]) -> Any:
+    """Кадр трансляції з GUI-потоку черги: UIA та сесія EBPro не виходять за його межі.
+
+    Кадр стає в чергу як службове інтерактивне завдання — без запису в /jobs.
+    """
+
+    job = JOB_QUEUE.submit(
+        "stream_frame",
+        {"scale": scale},
+        runner=lambda _action, params: {"image": grab_frame(params["scale"])},
+        priority=PRIORITY_INTERACTIVE,
+        internal=True,
+    )
+    result = await asyncio.wrap_future(job.future)
+    return result["image"]
+
+
+@app.get("/stream/simulator")
+async def stream_simulator(
+    fps: float = Query(5.0, gt=0, le=30),
+    quality: int = Query(70, ge=1, le=100),
+    scale: Optional[float] = Query(None, gt=0, le=1),
+    keyframe: float = Query(5.0, gt=0),
+    token: Optional[str] = None,
+) -> StreamingResponse:
+    """MJPEG-трансляція вікна EasySimulator; незмінні кадри не надсилаються."""
+
+    _ensure_token(token)
+    return StreamingResponse(
+        mjpeg_stream(_stream_frame, max_fps=fps, quality=quality, scale=scale, keyframe_interval=keyframe),
+        media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY}",
+    )
+
+
+@app.get("/cache/build")
+async def build_cache_stats(token: Optional[str] = None) -> Dict[str, Any]:
+    """Статистика кешу збірки: влучання, промахи, розмір."""
+
+    _ensure_token(token)
+    cache = get_build_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/macros")
+async def list_macros(all_profiles: bool = False, token: Optional[str] = None) -> Dict[str, Any]:
+    """Записані макроси дій для поточного профілю EBPro (або всіх профілів)."""
+
+    _ensure_token(token)
+    store = get_macro_store()
+    if store is None:
+        return {"enabled": False}
+    profile = macro_profile()
+    return {
+        "enabled": True,
+        "profile": profile,
+        "macros": store.snapshot(None if all_profiles else profile),
+        **store.stats(),
+    }
+
+
+@app.post("/macros/forget")
+async def forget_macros(
+    action: Optional[str] = None, all_profiles: bool = False, token: Optional[str] = None
+) -> Dict[str, Any]:
+    """Забуває макроси (наприклад, після зміни інтерфейсу EBPro); наступний запуск запише їх заново."""
+
+    _ensure_token(token)
+    store = get_macro_store()
+    if store is None:
+        return {"enabled": False, "removed": 0}
+    removed = store.forget(None if all_profiles else macro_profile(), action)
+    return {"enabled": True, "removed": removed}
+
+
+@app.get("/projects")
+async def search_projects(q: str = "", limit: int = Query(10, ge=1, le=100), token: Optional[str] = None) -> Dict[str, Any]:
+    """Пошук проєктів у PROJECT_ROOTS за назвою (точна, префікс, схожі)."""
+
+    _ensure_token(token)
+    index = get_project_index()
+    if index is None:
+        return {"enabled": False, "projects": []}
+    projects = [entry.to_dict() for entry in index.search(q, limit=limit)] if q else []
+    return {"enabled": True, "projects": projects, **index.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(token: Optional[str] = None) -> PlainTextResponse:
+    """Гістограми етапів і лічильники запитів у форматі Prometheus."""
+
+    _ensure_token(token)
+    metrics.QUEUE_PENDING.set(DISPATCHER.pending())
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/jobs")
+async def list_jobs(status: Optional[str] = None, token: Optional[str] = None) -> Dict[str, Any]:
+    """Перелік завдань черги з їхнім станом і таймінгами."""
+
+    _ensure_token(token)
+    return {
+        "pending": DISPATCHER.pending(),
+        "jobs": [job.to_dict() for job in DISPATCHER.list(status)],
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, token: Optional[str] = None) -> Dict[str, Any]:
+    """Стан, таймінги та результат окремого завдання."""
+
+    _ensure_token(token)
+    job = DISPATCHER.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                code="job_not_found",
+                message=f"Завдання {job_id} не знайдено.",
+                hint="Перевірте job_id; завершені завдання зберігаються обмежений час.",
+            ).dict(),
+        )
+    return job.to_dict()
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, token: Optional[str] = None) -> Dict[str, Any]:
+    """Скасовує завдання: з черги — одразу, під час виконання — у безпечній точці."""
+
+    _ensure_token(token)
+    job = DISPATCHER.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                code="job_not_found",
+                message=f"Завдання {job_id} не знайдено.",
+                hint="Перевірте job_id; завершені завдання зберігаються обмежений час.",
             ).dict(),
         )
-    except Exception as exc:  # pragma: no cover - непередбачувані помилки
-        LOGGER.exception("Непередбачена помилка виконання дії")
+    if job.status in FINISHED_STATES:
         raise HTTPException(
-            status_code=500,
+            status_code=409,
             detail=ErrorResponse(
-                code="internal_error",
-                message="Сталася непередбачена помилка.",
-                hint="Перевірте логи ebpro_mcp.log для детальної інформації.",
+                code="job_finished",
+                message=f"Завдання {job_id} вже завершено зі статусом {job.status}.",
+                hint="Скасувати можна лише завдання у стані queued або running.",
             ).dict(),
-        ) from exc
+        )
+    # Спільне завдання (coalescing) скасовується для всіх запитів, що його чекають.
+    DISPATCHER.cancel(job_id)
+    return job.to_dict()
+
+
+@app.get("/workers")
+async def list_workers(token: Optional[str] = None) -> Dict[str, Any]:
+    """Стан воркерів пулу (порожньо, якщо працює одна локальна сесія)."""
+
+    _ensure_token(token)
+    if not isinstance(DISPATCHER, WorkerPool):
+        return {"pool": False, "workers": []}
+    return {"pool": True, "workers": DISPATCHER.workers()}
+
+
+@app.post("/workers/{worker_id}/drain")
+async def drain_worker(worker_id: str, token: Optional[str] = None) -> Dict[str, Any]:
+    """Виводить воркер з роботи після поточного завдання та перезапускає його."""
+
+    _ensure_token(token)
+    if not isinstance(DISPATCHER, WorkerPool):
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                code="pool_disabled",
+                message="Пул воркерів не налаштовано.",
+                hint="Додайте записи у WORKERS у config.json.",
+            ).dict(),
+        )
+    try:
+        DISPATCHER.drain(worker_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                code="worker_not_found",
+                message=f"Воркер {worker_id} не знайдено.",
+                hint="Перелік воркерів доступний у GET /workers.",
+            ).dict(),
+        )
+    return {"ok": True, "worker": worker_id}
+
+
+@app.on_event("shutdown")
+async def _stop_job_queue() -> None:
+    if DISPATCHER is not JOB_QUEUE:
+        DISPATCHER.stop(timeout=5.0)
+    JOB_QUEUE.stop(timeout=5.0)
+    stop_ahk_worker()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Запуск сервера: HTTP (uvicorn) або MCP через stdio (``--stdio``) для локального агента."""
+
+    parser = argparse.ArgumentParser(description="EBPro Mini-MCP")
+    parser.add_argument("--stdio", action="store_true", help="MCP JSON-RPC через stdin/stdout")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    if not args.stdio:
+        import uvicorn
+
+        uvicorn.run(app, host=args.host, port=args.port)
+        return 0
+
+    async def _serve() -> None:
+        # Журнал пишеться у stderr і файл; stdout належить протоколу.
+        await _start_logging()
+        await _start_warm_up()
+        await _start_project_index()
+        try:
+            await serve_stdio(MCP, sys.stdin.buffer, sys.stdout.buffer)
+        finally:
+            await _stop_job_queue()
+
+    asyncio.run(_serve())
+    return 0
 
-    notes = "Дію виконано успішно."
-    if action == "run_offline_sim":
-        notes = "Симуляцію запущено. Перевірте вікно EasySimulator."
 
-    return RunResponse(ok=True, action=action, file=file_path, notes=notes)
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
 
 
-__all__ = ["app"]
+__all__ = ["app", "main"]
@@ -0,0 +1,344 @@
+"""Метрики Mini-MCP у текстовому форматі Prometheus (без сторонніх залежностей).
+
+Кожен етап запиту (розбір, авторизація, запуск EBPro, пошук вікна, меню,
+діалоги, запис файлу, AHK) потрапляє у гістограму
+``ebpro_stage_duration_seconds`` з мітками ``stage``, ``action``, ``outcome``
+та ``error`` — назвою класу винятку (``FriendlyError``, ``WaitTimeoutError``...).
+Поточна дія береться з контексту, який встановлює ``bind_action``.
+"""
+from __future__ import annotations
+
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger("ebpro.metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Від швидких кроків розбору (мс) до довгих збірок (хвилини).
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+_CURRENT_ACTION: contextvars.ContextVar[str] = contextvars.ContextVar("ebpro_action", default="")
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Метрика {self.name} очікує мітки {self.labelnames}, отримано {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Монотонний лічильник з мітками."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Поточне значення (довжина черги, кількість воркерів)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Гістограма тривалостей з кумулятивними кошиками Prometheus."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Для кожного набору міток: лічильники по кошиках (+Inf останній), сума.
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._series.items())
+        lines = self._header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Набір метрик процесу, що рендериться одним текстом для /metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Метрику {metric.name} вже зареєстровано.")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION: Histogram = REGISTRY.register(  # type: ignore[assignment]
+    Histogram(
+        "ebpro_stage_duration_seconds",
+        "Тривалість етапів обробки запиту та GUI-кроків EBPro.",
+        ("stage", "action", "outcome", "error"),
+    )
+)
+REQUEST_DURATION: Histogram = REGISTRY.register(  # type: ignore[assignment]
+    Histogram(
+        "ebpro_request_duration_seconds",
+        "Повна тривалість запиту /run від авторизації до відповіді.",
+        ("action", "outcome", "reason"),
+    )
+)
+REQUESTS_TOTAL: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter(
+        "ebpro_requests_total",
+        "Кількість запитів /run за дією та результатом.",
+        ("action", "outcome", "reason"),
+    )
+)
+COALESCED_TOTAL: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter(
+        "ebpro_coalesced_total",
+        "Запити, що отримали результат спільного або вже завершеного завдання.",
+        ("action", "outcome"),
+    )
+)
+QUEUE_PENDING: Gauge = REGISTRY.register(  # type: ignore[assignment]
+    Gauge("ebpro_queue_pending", "Кількість завдань, що очікують у черзі GUI.")
+)
+
+
+# Причини невдалого запиту (мітка ``reason``): фіксований набір замість класу винятку.
+REASON_AUTH = "auth"
+REASON_PARSE = "parse"
+REASON_ACTION = "action"
+REASON_TIMEOUT = "timeout"
+REQUEST_REASONS = (REASON_AUTH, REASON_PARSE, REASON_ACTION, REASON_TIMEOUT)
+
+# Стан поточного HTTP-запиту: чи вже записано його підсумок (див. ``request_outcome``).
+_REQUEST_OUTCOME: "contextvars.ContextVar[Optional[Dict[str, bool]]]" = contextvars.ContextVar(
+    "ebpro_request_outcome", default=None
+)
+
+
+def error_label(exc: Optional[BaseException]) -> str:
+    """Мітка помилки: назва класу винятку (порожньо для успіху)."""
+
+    return "" if exc is None else type(exc).__name__
+
+
+def current_action() -> str:
+    """Дія, в межах якої виконується поточний код (порожньо поза дією)."""
+
+    return _CURRENT_ACTION.get()
+
+
+@contextmanager
+def bind_action(action: str) -> Iterator[None]:
+    """Позначає етапи всередині блоку міткою ``action``."""
+
+    token = _CURRENT_ACTION.set(action)
+    try:
+        yield
+    finally:
+        _CURRENT_ACTION.reset(token)
+
+
+def observe_stage(stage_name: str, seconds: float, action: Optional[str] = None, exc: Optional[BaseException] = None) -> None:
+    """Записує тривалість етапу, виміряну деінде."""
+
+    STAGE_DURATION.observe(
+        seconds,
+        stage=stage_name,
+        action=current_action() if action is None else action,
+        outcome="ok" if exc is None else "error",
+        error=error_label(exc),
+    )
+
+
+@contextmanager
+def stage(stage_name: str) -> Iterator[None]:
+    """Вимірює блок або функцію (працює і як декоратор) як етап ``stage_name``."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as exc:
+        observe_stage(stage_name, time.perf_counter() - started, exc=exc)
+        raise
+    observe_stage(stage_name, time.perf_counter() - started)
+
+
+def observe_request(action: str, seconds: float, reason: str = "") -> None:
+    """Записує підсумок запиту /run у гістограму та лічильник.
+
+    ``reason`` — одна з ``REQUEST_REASONS`` для невдалого запиту, порожня для успіху.
+    """
+
+    if reason and reason not in REQUEST_REASONS:
+        raise ValueError(f"Невідома причина помилки запиту: {reason}")
+    labels = {"action": action, "outcome": "error" if reason else "ok", "reason": reason}
+    REQUEST_DURATION.observe(seconds, **labels)
+    REQUESTS_TOTAL.inc(**labels)
+    outcome = _REQUEST_OUTCOME.get()
+    if outcome is not None:
+        outcome["observed"] = True
+
+
+@contextmanager
+def request_outcome() -> Iterator[Dict[str, bool]]:
+    """Стежить, чи обробник запиту сам записав підсумок (``observed``).
+
+    Middleware записує відмови до виконання дії (auth, parse) лише для
+    запитів, які обробник не врахував.
+    """
+
+    outcome = {"observed": False}
+    token = _REQUEST_OUTCOME.set(outcome)
+    try:
+        yield outcome
+    finally:
+        _REQUEST_OUTCOME.reset(token)
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "STAGE_DURATION",
+    "REQUEST_DURATION",
+    "REQUESTS_TOTAL",
+    "REQUEST_REASONS",
+    "REASON_ACTION",
+    "REASON_AUTH",
+    "REASON_PARSE",
+    "REASON_TIMEOUT",
+    "COALESCED_TOTAL",
+    "QUEUE_PENDING",
+    "bind_action",
+    "current_action",
+    "error_label",
+    "observe_request",
+    "observe_stage",
+    "request_outcome",
+    "stage",
+]
@@ -1,29 +1,190 @@
-"""Простий парсер україномовних завдань для EBPro Mini-MCP."""
+"""Парсер україномовних завдань для EBPro Mini-MCP.
+
+Текст розбирається одним проходом скомпільованого автомата: шляхи в лапках,
+роздільники (кома, "і", "потім") та ключові слова дій. Кожне ключове слово
+починає новий крок, тож "відкрий проєкт "X", збери і запусти офлайн
+симуляцію" дає впорядкований план з трьох дій. Результат сканування тексту
+кешується (LRU), бо клієнти часто надсилають однакові шаблонні команди.
+"""
 from __future__ import annotations
 
+import functools
 import re
-from typing import Any, Dict, Tuple
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 class NLPError(Exception):
     """Помилка розбору інструкції користувача."""
 
 
-# Регексп для шляху у лапках (подвійні або одинарні лапки).
-PATH_REGEX = re.compile(r"['\"]([^'\"]+)['\"]")
+# Назва проєкту без лапок одразу після слова "проєкт": "відкрий проєкт pump".
+PROJECT_NAME_REGEX = re.compile(r"(?:проєкт|проект|project)\s+([^\s'\",]+)", re.IGNORECASE)
+
+# Ключові слова дій. Порядок важливий лише для слів, що збігаються в одній позиції.
+# Фіксовані слова закінчуються межею слова ("compressed", "buildings" — не дії), основи з \w* — ні.
+INTENT_PATTERNS: Dict[str, str] = {
+    "open_project": r"(?:відкри(?:й|йте|ти)|open)(?!\w)(?=[^,;]*?(?:проєкт|проект|project))",
+    "build_exob": r"(?:(?:зібра(?:ти|й)|збер(?:и|іть)|build|експортуй)(?!\w)|с?компілю\w*)",
+    "run_offline_sim": r"(?:офлайн|offline)(?!\w)(?=[^,;]*?(?:симуляц|simulation))",
+    "take_screenshot": r"(?:скрін\w*|screenshot(?!\w))",
+    "pack_ecmp": r"(?:(?:за|у)паку\w*|(?:compress|ecmp)(?!\w))",
+}
+# Голе "ecmp" одразу після іншої дії без роздільника — формат цієї дії ("експортуй проєкт у ecmp"), а не пакування.
+_FORMAT_WORDS = ("ecmp",)
+_SEPARATOR = r"[,;]|(?<![\w.])(?:і|й|та|потім|після\s+цього|далі|then|and)(?!\w)"
+# Один автомат на весь текст: лапки поглинаються цілком, тож слова "build" чи
+# "ecmp" усередині шляху не стають діями.
+_AUTOMATON = re.compile(
+    r"(?P<quoted>[\"'][^\"']+[\"'])|(?P<sep>{sep})|(?<![\w.])(?:{intents})".format(
+        sep=_SEPARATOR,
+        intents="|".join(f"(?P<{name}>{pattern})" for name, pattern in INTENT_PATTERNS.items()),
+    ),
+    re.IGNORECASE,
+)
+PARSE_CACHE_SIZE = 1024
+
+ProjectResolver = Callable[[str], str]
+Plan = List[Tuple[str, Dict[str, Any]]]
+# Крок після сканування: (дія, шлях у лапках, назва проєкту без лапок).
+_ScannedStep = Tuple[str, Optional[str], Optional[str]]
+
+
+def _is_bare_name(value: str) -> bool:
+    """Чи є значення назвою проєкту, а не шляхом: без тек, диска й розширення, і такого файлу немає.
+
+    "demo.emtp" лишається шляхом (відносним); назви з розширенням розв'язує вже ``open_project``,
+    якщо такого файлу немає.
+    """
 
+    return not re.search(r"[\\/:]", value) and not Path(value).suffix and not Path(value).exists()
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _scan(text: str) -> Tuple[_ScannedStep, ...]:
+    """Розбиває текст на кроки; не залежить від args, тож безпечно кешується."""
+
+    steps: List[List[Any]] = []  # [дія, початок, шлях у лапках]
+    pending_quote: Optional[str] = None
+    separated = True
+    for match in _AUTOMATON.finditer(text):
+        kind = match.lastgroup
+        if kind == "quoted":
+            quoted = match.group()[1:-1]
+            if steps and steps[-1][2] is None:
+                steps[-1][2] = quoted
+            else:
+                pending_quote = quoted
+        elif kind == "sep":
+            separated = True
+        elif steps and not separated and (steps[-1][0] == kind or match.group().lower() in _FORMAT_WORDS):
+            continue  # "запакуй проєкт у ecmp" — одна дія, а не дві
+        else:
+            steps.append([kind, match.start(), pending_quote])
+            pending_quote = None
+            separated = False
+
+    scanned: List[_ScannedStep] = []
+    for index, (action, start, quoted) in enumerate(steps):
+        name = None
+        if action == "open_project" and quoted is None:
+            end = steps[index + 1][1] if index + 1 < len(steps) else len(text)
+            match = PROJECT_NAME_REGEX.search(text, start, end)
+            name = match.group(1) if match else None
+        scanned.append((action, quoted, name))
+    return tuple(scanned)
+
+
+def cache_info() -> Dict[str, int]:
+    """Статистика кешу розбору: влучання, промахи, розмір."""
+
+    info = _scan.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize or 0}
+
+
+def clear_cache() -> None:
+    _scan.cache_clear()
+
+
+def _project_path(
+    args: Dict[str, Any], quoted: Optional[str], name: Optional[str], resolve_project: Optional[ProjectResolver]
+) -> str:
+    """Шлях до проєкту з args.path, лапок або назви, знайденої через ``resolve_project``."""
+
+    path = args.get("path") or quoted or (name if resolve_project is not None else None)
+    if not path:
+        raise NLPError(
+            "Не вдалося знайти шлях до проєкту. Додайте його у лапках або в полі args.path."
+        )
+    if resolve_project is not None and _is_bare_name(path):
+        try:
+            return resolve_project(path)
+        except LookupError as exc:
+            raise NLPError(str(exc)) from exc
+    return path
+
+
+def _step_params(
+    action: str,
+    quoted: Optional[str],
+    name: Optional[str],
+    args: Dict[str, Any],
+    resolve_project: Optional[ProjectResolver],
+) -> Dict[str, Any]:
+    params = dict(args)
+    if action == "open_project":
+        params["path"] = _project_path(params, quoted, name, resolve_project)
+    elif action == "take_screenshot":
+        params["out"] = params.get("out") or quoted
+        if not params["out"]:
+            raise NLPError(
+                "Для скріншота вкажіть шлях збереження у лапках або у полі args.out."
+            )
+    elif action == "pack_ecmp":
+        params["out"] = params.get("out") or quoted
+        if not params["out"]:
+            raise NLPError(
+                "Для пакування в ECMP вкажіть шлях збереження у лапках або у полі args.out."
+            )
+    return params
 
-def _extract_path(text: str) -> str | None:
-    """Повертає шлях до файлу/теки, знайдений у лапках, якщо він існує."""
 
-    match = PATH_REGEX.search(text)
-    if match:
-        return match.group(1)
-    return None
+def parse_plan(
+    text: str,
+    args: Dict[str, Any] | None = None,
+    resolve_project: Optional[ProjectResolver] = None,
+) -> Plan:
+    """Розпізнає впорядкований план дій з україномовного тексту.
 
+    ``args`` з HTTP-запиту мають пріоритет над текстом і додаються до кожного
+    кроку; різні шляхи для кроків передавайте у лапках у самому тексті.
+    ``resolve_project`` знаходить шлях за назвою проєкту ("відкрий проєкт
+    pump") і піднімає LookupError, якщо проєкт не знайдено; без нього
+    значення з лапок завжди вважається шляхом.
 
-def parse_instruction(text: str, args: Dict[str, Any] | None = None) -> Tuple[str, Dict[str, Any]]:
-    """Розпізнає дію та аргументи з україномовного тексту.
+    Raises
+    ------
+    NLPError
+        Якщо інструкцію не вдалося розпізнати.
+    """
+
+    if not text or not text.strip():
+        raise NLPError("Надайте текст інструкції українською мовою.")
+    steps = _scan(text)
+    if not steps:
+        raise NLPError(
+            "Не вдалося визначити дію. Використайте ключові слова: відкрий, зібрати, офлайн симуляція, скріншот, запакуй."
+        )
+    args = dict(args or {})
+    return [(action, _step_params(action, quoted, name, args, resolve_project)) for action, quoted, name in steps]
+
+
+def parse_instruction(
+    text: str,
+    args: Dict[str, Any] | None = None,
+    resolve_project: Optional[ProjectResolver] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """Розпізнає одну дію та аргументи з україномовного тексту.
 
     Parameters
     ----------
@@ -31,6 +192,9 @@ def parse_instruction(text: str, args: Dict[str, Any] | None = None) -> Tuple[st
         Сирий текст від користувача (українською/змішаною мовою).
     args: Dict[str, Any] | None
         Додаткові аргументи з HTTP-запиту, мають пріоритет над текстом.
+    resolve_project: Callable[[str], str] | None
+        Пошук шляху за назвою проєкту ("відкрий проєкт pump"); піднімає
+        LookupError, якщо проєкт не знайдено.
 
     Returns
     -------
@@ -40,56 +204,16 @@ def parse_instruction(text: str, args: Dict[str, Any] | None = None) -> Tuple[st
     Raises
     ------
     NLPError
-        Якщо інструкцію не вдалося розпізнати.
+        Якщо інструкцію не вдалося розпізнати або вона містить кілька дій
+        (для таких використовуйте ``parse_plan``).
     """
 
-    if not text or not text.strip():
-        raise NLPError("Надайте текст інструкції українською мовою.")
-
-    lowered = text.lower()
-    args = dict(args or {})
-
-    # Визначення дії "відкрити проєкт".
-    if re.search(r"(відкри(й|ти)|open).*(проєкт|проект)", lowered):
-        path = args.get("path") or _extract_path(text)
-        if not path:
-            raise NLPError(
-                "Не вдалося знайти шлях до проєкту. Додайте його у лапках або в полі args.path."
-            )
-        args["path"] = path
-        return "open_project", args
-
-    # Дія "збірка EXOB".
-    if re.search(r"(зібра(ти|й)|компілювати|build|експортуй).*", lowered):
-        return "build_exob", args
-
-    # Дія "офлайн симуляція".
-    if re.search(r"(офлайн|offline).*(симуляц(ію|ія)|simulation)", lowered):
-        return "run_offline_sim", args
-
-    # Дія "зробити скріншот".
-    if re.search(r"(скрін|скріншот|screenshot)", lowered):
-        out_path = args.get("out") or _extract_path(text)
-        if not out_path:
-            raise NLPError(
-                "Для скріншота вкажіть шлях збереження у лапках або у полі args.out."
-            )
-        args["out"] = out_path
-        return "take_screenshot", args
-
-    # Дія "запакувати у ECMP".
-    if re.search(r"(запакуй|упакуй|compress|ecmp)", lowered):
-        out_path = args.get("out") or _extract_path(text)
-        if not out_path:
-            raise NLPError(
-                "Для пакування в ECMP вкажіть шлях збереження у лапках або у полі args.out."
-            )
-        args["out"] = out_path
-        return "pack_ecmp", args
-
-    raise NLPError(
-        "Не вдалося визначити дію. Використайте ключові слова: відкрий, зібрати, офлайн симуляція, скріншот, запакуй."
-    )
+    plan = parse_plan(text, args, resolve_project)
+    if len(plan) > 1:
+        raise NLPError(
+            f"Інструкція містить кілька дій ({', '.join(action for action, _ in plan)}); розберіть її як план."
+        )
+    return plan[0]
 
 
-__all__ = ["parse_instruction", "NLPError"]
+__all__ = ["parse_instruction", "parse_plan", "cache_info", "clear_cache", "NLPError", "INTENT_PATTERNS", "Plan"]
@@ -0,0 +1,99 @@
+"""Події прогресу дій EBPro для потокових відповідей (SSE).
+
+Дія виконується в GUI-потоці, а слухачі живуть в event loop FastAPI, тому
+``ProgressChannel`` зберігає історію подій і передає нові події підписникам
+через ``call_soon_threadsafe``. Канал поточного завдання береться з
+контексту (``bind_channel``), тож код дій просто викликає ``report``.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+LOGGER = logging.getLogger("ebpro.progress")
+
+_CHANNEL: contextvars.ContextVar[Optional["ProgressChannel"]] = contextvars.ContextVar("ebpro_progress", default=None)
+
+Event = Dict[str, Any]
+
+
+class ProgressChannel:
+    """Історія подій одного завдання та черги підписників."""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.events: List[Event] = []
+        self.closed = False
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Queue[Optional[Event]]"]] = []
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return round((time.monotonic() - self.started) * 1000.0, 1)
+
+    def emit(self, event: str, **data: Any) -> Event:
+        """Додає подію та розсилає її підписникам (з будь-якого потоку)."""
+
+        record: Event = {"event": event, "elapsed_ms": self.elapsed_ms(), **data}
+        with self._lock:
+            if self.closed:
+                return record
+            self.events.append(record)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, record)
+        return record
+
+    def close(self) -> None:
+        """Позначає кінець потоку подій (підписники отримують None)."""
+
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    def subscribe(self) -> "asyncio.Queue[Optional[Event]]":
+        """Черга з уже накопиченими подіями та всіма наступними. Викликати в event loop."""
+
+        queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue()
+        with self._lock:
+            for record in self.events:
+                queue.put_nowait(record)
+            if self.closed:
+                queue.put_nowait(None)
+            else:
+                self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: "asyncio.Queue[Optional[Event]]") -> None:
+        with self._lock:
+            self._subscribers = [item for item in self._subscribers if item[1] is not queue]
+
+
+@contextmanager
+def bind_channel(channel: Optional[ProgressChannel]) -> Iterator[None]:
+    """Спрямовує ``report`` всередині блоку (і завдань, поставлених з нього) у канал."""
+
+    token = _CHANNEL.set(channel)
+    try:
+        yield
+    finally:
+        _CHANNEL.reset(token)
+
+
+def report(event: str, **data: Any) -> None:
+    """Повідомляє подію прогресу поточного завдання (нічого не робить без каналу)."""
+
+    channel = _CHANNEL.get()
+    if channel is not None:
+        channel.emit(event, **data)
+
+
+__all__ = ["ProgressChannel", "bind_channel", "report"]
@@ -0,0 +1,295 @@
+"""Індекс файлів проєктів EBPro (*.emtp, *.ecmp) для пошуку за назвою.
+
+Кореневі каталоги (PROJECT_ROOTS) обходяться один раз, а стан зберігається у
+компактному JSON: для кожної теки — mtime, підтеки та проєкти (назва, розмір,
+mtime). Повторне сканування читає вміст лише тих тек, чий mtime змінився
+(файл додано, видалено чи перейменовано); для решти достатньо одного stat.
+"""
+from __future__ import annotations
+
+import bisect
+import difflib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger("ebpro.project_index")
+
+PROJECT_SUFFIXES = (".emtp", ".ecmp")
+STORE_VERSION = 1
+
+# Запис теки у сховищі: [mtime_ns, [підтеки], [[файл, розмір, mtime_ns], ...]].
+DirRecord = List[Any]
+
+
+@dataclass(frozen=True)
+class ProjectEntry:
+    """Знайдений файл проєкту."""
+
+    name: str
+    path: str
+    size: int
+    mtime: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "path": self.path, "size": self.size, "mtime": self.mtime}
+
+
+class ProjectLookupError(LookupError):
+    """Назва не відповідає жодному або відповідає кільком проєктам."""
+
+    def __init__(self, message: str, candidates: Sequence[ProjectEntry] = ()):
+        super().__init__(message)
+        self.candidates = list(candidates)
+
+
+def _key(name: str) -> str:
+    """Ключ пошуку: назва без розширення проєкту, у нижньому регістрі."""
+
+    lowered = name.strip().lower()
+    for suffix in PROJECT_SUFFIXES:
+        if lowered.endswith(suffix):
+            return lowered[: -len(suffix)]
+    return lowered
+
+
+class ProjectIndex:
+    """Інкрементний індекс проєктів з пошуком за точною назвою, префіксом і схожістю.
+
+    Пошук не сканує диск, поки індекс свіжий; застарілий (``max_age`` секунд)
+    оновлюється у фоні, а промах оновлює його синхронно один раз.
+    """
+
+    def __init__(
+        self,
+        roots: Sequence[Any],
+        store_path: Optional[Path] = None,
+        max_age: float = 300.0,
+        suffixes: Sequence[str] = PROJECT_SUFFIXES,
+    ):
+        self.roots = [os.path.abspath(str(root)) for root in roots]
+        self.store_path = Path(store_path) if store_path else None
+        self.max_age = max_age
+        self.suffixes = tuple(suffix.lower() for suffix in suffixes)
+        self.scanned_at: Optional[float] = None
+        self.last_scan: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._refreshing = False
+        self._dirs: Dict[str, DirRecord] = self._load()
+        self._by_name: Dict[str, List[ProjectEntry]] = {}
+        self._keys: List[str] = []
+        self._rebuild()
+
+    # --- сховище ---------------------------------------------------------
+
+    def _load(self) -> Dict[str, DirRecord]:
+        if self.store_path is None:
+            return {}
+        try:
+            with self.store_path.open("r", encoding="utf-8") as fp:
+                data = json.load(fp)
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            LOGGER.warning("Індекс проєктів %s пошкоджено, скануємо заново.", self.store_path)
+            return {}
+        if data.get("version") != STORE_VERSION or data.get("roots") != self.roots:
+            return {}
+        return data.get("dirs", {})
+
+    def _save(self) -> None:
+        if self.store_path is None:
+            return
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.store_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fp:
+            json.dump({"version": STORE_VERSION, "roots": self.roots, "dirs": self._dirs}, fp, ensure_ascii=False, separators=(",", ":"))
+        tmp_path.replace(self.store_path)
+
+    # --- сканування ------------------------------------------------------
+
+    def _list_dir(self, directory: str, mtime_ns: int) -> DirRecord:
+        subdirs: List[str] = []
+        files: List[List[Any]] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif os.path.splitext(entry.name)[1].lower() in self.suffixes:
+                            stat = entry.stat()
+                            files.append([entry.name, stat.st_size, stat.st_mtime_ns])
+                    except OSError:
+                        continue
+        except OSError as exc:
+            LOGGER.warning("Не вдалося прочитати теку %s: %s", directory, exc)
+        return [mtime_ns, sorted(subdirs), sorted(files)]
+
+    def refresh(self) -> Dict[str, Any]:
+        """Оновлює індекс, перечитуючи лише теки зі зміненим mtime."""
+
+        with self._scan_lock:
+            started = time.perf_counter()
+            with self._lock:
+                previous = self._dirs
+            current: Dict[str, DirRecord] = {}
+            listed = reused = 0
+            stack = list(self.roots)
+            while stack:
+                directory = stack.pop()
+                try:
+                    mtime_ns = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                record = previous.get(directory)
+                if record is not None and record[0] == mtime_ns:
+                    reused += 1
+                else:
+                    record = self._list_dir(directory, mtime_ns)
+                    listed += 1
+                current[directory] = record
+                stack.extend(os.path.join(directory, name) for name in record[1])
+            changed = current != previous
+            with self._lock:
+                self._dirs = current
+                self._rebuild()
+                if changed:
+                    self._save()
+                projects = sum(len(entries) for entries in self._by_name.values())
+            self.scanned_at = time.monotonic()
+            self.last_scan = {
+                "dirs_listed": listed,
+                "dirs_reused": reused,
+                "projects": projects,
+                "duration_ms": round((time.perf_counter() - started) * 1000.0, 1),
+            }
+        LOGGER.info(
+            "Індекс проєктів оновлено: %s проєктів, перечитано тек %s, без змін %s (%.1f мс).",
+            projects,
+            listed,
+            reused,
+            self.last_scan["duration_ms"],
+        )
+        return dict(self.last_scan)
+
+    def refresh_async(self) -> None:
+        """Запускає оновлення у фоновому потоці (не більше одного одночасно)."""
+
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run() -> None:
+            try:
+                self.refresh()
+            except Exception:
+                LOGGER.exception("Фонове оновлення індексу проєктів не вдалося.")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="ebpro-project-index", daemon=True).start()
+
+    def _rebuild(self) -> None:
+        by_name: Dict[str, List[ProjectEntry]] = {}
+        for directory, (_, _, files) in self._dirs.items():
+            for name, size, mtime_ns in files:
+                entry = ProjectEntry(name=name, path=os.path.join(directory, name), size=size, mtime=mtime_ns / 1e9)
+                by_name.setdefault(_key(name), []).append(entry)
+        self._by_name = by_name
+        self._keys = sorted(by_name)
+
+    def _ensure_fresh(self) -> None:
+        if self.scanned_at is None and not self._dirs:
+            self.refresh()
+        elif self.scanned_at is None or time.monotonic() - self.scanned_at > self.max_age:
+            self.refresh_async()
+
+    # --- пошук -----------------------------------------------------------
+
+    def _prefixed(self, key: str) -> List[str]:
+        index = bisect.bisect_left(self._keys, key)
+        keys: List[str] = []
+        while index < len(self._keys) and self._keys[index].startswith(key):
+            keys.append(self._keys[index])
+            index += 1
+        return keys
+
+    def _matches(self, key: str) -> Tuple[str, List[ProjectEntry]]:
+        """Найкращий рівень збігу (exact/prefix/fuzzy) і його проєкти."""
+
+        with self._lock:
+            if key in self._by_name:
+                return "exact", list(self._by_name[key])
+            prefixed = self._prefixed(key)
+            if prefixed:
+                return "prefix", [entry for name in prefixed for entry in self._by_name[name]]
+            close = difflib.get_close_matches(key, self._keys, n=1, cutoff=0.75)
+            if close:
+                return "fuzzy", list(self._by_name[close[0]])
+        return "none", []
+
+    def search(self, query: str, limit: int = 10) -> List[ProjectEntry]:
+        """Проєкти за точною назвою, потім за префіксом, потім схожі."""
+
+        self._ensure_fresh()
+        key = _key(query)
+        with self._lock:
+            names = [key] if key in self._by_name else []
+            names += [name for name in self._prefixed(key) if name != key]
+            if len(names) < limit:
+                names += [
+                    name
+                    for name in difflib.get_close_matches(key, self._keys, n=limit, cutoff=0.6)
+                    if name not in names
+                ]
+            found = [entry for name in names for entry in self._by_name[name]]
+        return found[:limit]
+
+    def resolve(self, name: str) -> ProjectEntry:
+        """Єдиний проєкт для назви; промах один раз оновлює індекс."""
+
+        self._ensure_fresh()
+        key = _key(name)
+        kind, entries = self._matches(key)
+        if kind == "none":
+            self.refresh()
+            kind, entries = self._matches(key)
+        if len(entries) == 1:
+            if kind != "exact":
+                LOGGER.info("Назву '%s' зіставлено з проєктом %s (%s).", name, entries[0].path, kind)
+            return entries[0]
+        if not entries:
+            suggestions = self.search(name, limit=3)
+            hint = f" Схожі: {', '.join(entry.name for entry in suggestions)}." if suggestions else ""
+            raise ProjectLookupError(f"Проєкт '{name}' не знайдено у PROJECT_ROOTS.{hint}", suggestions)
+        shown = ", ".join(entry.path for entry in entries[:5])
+        raise ProjectLookupError(
+            f"Назві '{name}' відповідає кілька проєктів: {shown}. Уточніть назву або вкажіть шлях у лапках.",
+            entries,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "roots": list(self.roots),
+                "dirs": len(self._dirs),
+                "projects": sum(len(entries) for entries in self._by_name.values()),
+                "last_scan": dict(self.last_scan),
+            }
+
+
+__all__ = [
+    "PROJECT_SUFFIXES",
+    "ProjectEntry",
+    "ProjectIndex",
+    "ProjectLookupError",
+]
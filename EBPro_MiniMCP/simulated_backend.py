@@ -0,0 +1,232 @@
+"""Імітація GUI EasyBuilder Pro у пам'яті для Linux CI та бенчмарків."""
+from __future__ import annotations
+
+import logging
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .ebpro_actions import (
+    OPEN_DIALOG,
+    SAVE_DIALOG,
+    AutomationBackend,
+    DialogSpec,
+    FriendlyError,
+    Rect,
+    WaitResult,
+    WaitTimeoutError,
+    _optional_module,
+    load_config,
+)
+from .locators import SCOPE_POPUP, SCOPE_WINDOW, ElementLocator
+from .macros import STEP_DIALOG, STEP_MENU, current_run
+
+LOGGER = logging.getLogger("ebpro.simulated")
+
+_MENU_DIALOGS: Dict[Tuple[str, ...], DialogSpec] = {
+    ("File", "Open..."): OPEN_DIALOG,
+    ("File", "Compress"): SAVE_DIALOG,
+}
+
+
+class SimulatedBackend(AutomationBackend):
+    """Детермінована модель EBPro: вікна, меню, діалоги та файли-артефакти.
+
+    Кожна операція триває ``latency`` секунд і з імовірністю ``fail_rate``
+    завершується ``FriendlyError`` — так можна міряти накладні витрати
+    сервера, черги й конкурентності без Windows. ``calls`` містить журнал операцій.
+
+    Пошук пунктів меню й елементів діалогу коштує ``lookup_latency`` секунд
+    (``lookups`` рахує такі пошуки); крок макросу з актуальними
+    ідентифікаторами (``control_ids``, ``dialog_titles``) його пропускає.
+    """
+
+    name = "simulated"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+        seed: Optional[int] = None,
+        window_size: Tuple[int, int] = (1280, 800),
+        lookup_latency: float = 0.0,
+    ):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.lookup_latency = lookup_latency
+        self.window_size = window_size
+        self.calls: List[str] = []
+        self.running = False
+        self.windows: Dict[str, Rect] = {}
+        # Профіль макросів та ідентифікатори елементів; їх зміна імітує оновлення EBPro.
+        self.version = "simulated"
+        self.locale = "en_US"
+        self.control_ids: Dict[str, str] = {}
+        self.dialog_titles: Dict[str, str] = {"open": "Open", "save": "Save As"}
+        self.lookups = 0
+        self.project: Optional[Path] = None
+        # Діагностика, яку "компілятор" виведе у вікно збірки; помилки не дають артефакту.
+        self.build_errors: List[str] = []
+        self.build_warnings: List[str] = []
+        self.builds = 0
+        self._build_output: Optional[str] = None
+        self._dialog: Optional[DialogSpec] = None
+        self._frame = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _step(self, operation: str) -> None:
+        with self._lock:
+            self.calls.append(operation)
+            failed = bool(self.fail_rate) and self._random.random() < self.fail_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise FriendlyError(
+                f"Імітована помилка операції {operation}.",
+                "Зменште SIMULATED_FAIL_RATE у config.json.",
+            )
+
+    def _lookup(self, target: str) -> None:
+        with self._lock:
+            self.calls.append(f"lookup:{target}")
+            self.lookups += 1
+        if self.lookup_latency:
+            time.sleep(self.lookup_latency)
+
+    def _control_id(self, name: str) -> str:
+        return self.control_ids.get(name, "id_" + re.sub(r"\W+", "", name).lower())
+
+    def _open_window(self, title: str) -> None:
+        width, height = self.window_size
+        offset = 40 * len(self.windows)
+        self.windows[title] = (offset, offset, offset + width, offset + height)
+
+    def _find(self, title: str) -> str:
+        for name in self.windows:
+            if title in name:
+                return name
+        raise FriendlyError(
+            f"Не знайдено вікно з назвою, що містить '{title}'.",
+            "Змініть SIMULATOR_WINDOW_TITLE/EBPRO_WINDOW_TITLE у config.json під свою локалізацію.",
+        )
+
+    def ensure_running(self, timeout: Optional[float] = None) -> None:
+        if self.running:
+            return
+        self._step("start")
+        self.running = True
+        self._open_window(load_config().EBPRO_WINDOW_TITLE)
+
+    def focus_window(self, title: str) -> str:
+        self._step(f"focus:{title}")
+        return self._find(title)
+
+    def window_rect(self, title: str, focus: bool = True) -> Rect:
+        name = self.focus_window(title) if focus else self._find(title)
+        return self.windows[name]
+
+    def menu_select(self, path: Sequence[str]) -> None:
+        key = tuple(path)
+        target = "->".join(key)
+        title = load_config().EBPRO_WINDOW_TITLE
+        locators = [
+            ElementLocator(
+                title=item,
+                control_type="MenuItem",
+                auto_id=self._control_id(item),
+                scope=SCOPE_POPUP if index else SCOPE_WINDOW,
+            ).to_dict()
+            for index, item in enumerate(key)
+        ]
+        run = current_run()
+        recorded = run.next_step(STEP_MENU, target) if run is not None else None
+        if recorded is not None and recorded.data.get("locators") != locators:
+            run.miss(recorded, "ідентифікатори пунктів меню змінились")
+            recorded = None
+        if recorded is None:
+            self._lookup(target)
+        self._step("menu:" + target)
+        self._find(title)
+        if key in _MENU_DIALOGS:
+            self._dialog = _MENU_DIALOGS[key]
+        elif key == ("Build", "Build"):
+            self.builds += 1
+            lines = [f"Build #{self.builds}: compiling {self.project}"]
+            lines += [f"Error: {text}" for text in self.build_errors]
+            lines += [f"Warning: {text}" for text in self.build_warnings]
+            if self.project is not None and not self.build_errors:
+                artifact = self.project.with_suffix(".exob")
+                artifact.write_bytes(b"EXOB" + self.project.read_bytes())
+            lines.append(f"Compile finished: {len(self.build_errors)} error(s), {len(self.build_warnings)} warning(s)")
+            self._build_output = "\n".join(lines)
+        elif key == ("Tools", "Offline Simulation"):
+            self._open_window(load_config().SIMULATOR_WINDOW_TITLE)
+        else:
+            raise FriendlyError(
+                "Не вдалося натиснути пункт меню.",
+                f"Пункт {target} відсутній у симульованому меню.",
+            )
+        if run is not None:
+            run.record(STEP_MENU, target, expect=title, replayed=recorded is not None, locators=locators)
+
+    def fill_file_dialog(self, dialog: DialogSpec, path: Path) -> float:
+        self._step(f"dialog:{dialog.description}")
+        if self._dialog is not dialog:
+            raise WaitTimeoutError(f"Не дочекалися: {dialog.description}.", dialog.hint)
+        title = self.dialog_titles.get(dialog.key, dialog.key)
+        data = {"button": self._control_id(f"{dialog.key}:button"), "edit_auto_id": self._control_id("File name")}
+        run = current_run()
+        recorded = run.next_step(STEP_DIALOG, dialog.key) if run is not None else None
+        if recorded is not None and (recorded.expect != title or recorded.data != data):
+            run.miss(recorded, "заголовок або елементи діалогу змінились")
+            recorded = None
+        if recorded is None:
+            self._lookup(dialog.key)
+        self._dialog = None
+        if dialog is OPEN_DIALOG:
+            self.project = Path(path)
+        elif dialog is SAVE_DIALOG:
+            Path(path).write_bytes(b"ECMP" + (self.project.read_bytes() if self.project else b""))
+        if run is not None:
+            run.record(STEP_DIALOG, dialog.key, expect=title, replayed=recorded is not None, **data)
+        return self.latency
+
+    def wait_window(self, title: str, timeout: float, hint: Optional[str] = None) -> WaitResult:
+        self._step(f"wait:{title}")
+        try:
+            return WaitResult(value=self._find(title), elapsed=self.latency, attempts=1)
+        except FriendlyError as exc:
+            raise WaitTimeoutError(f"Не дочекалися: вікно '{title}'.", hint) from exc
+
+    def capture(self, bbox: Rect):
+        self._step("capture")
+        Image = _optional_module("PIL.Image")  # noqa: N806
+        if Image is None:
+            raise FriendlyError("Pillow недоступна.", "Встановіть Pillow для симульованих знімків.")
+        self._frame += 1
+        width, height = max(1, bbox[2] - bbox[0]), max(1, bbox[3] - bbox[1])
+        shade = (self._frame * 16) % 256
+        return Image.new("RGB", (width, height), (shade, 96, 160))
+
+    def run_ahk(self, command: str, script_path: Path, timeout: float) -> None:
+        self._step(f"ahk:{command}")
+        self._open_window(load_config().SIMULATOR_WINDOW_TITLE)
+
+    def build_output(self) -> Optional[str]:
+        return self._build_output
+
+    def ui_profile(self) -> Tuple[str, str]:
+        return (self.version, self.locale)
+
+    def invalidate(self) -> None:
+        self.running = False
+        self.windows.clear()
+        self.project = None
+        self._dialog = None
+
+
+__all__ = ["SimulatedBackend"]
@@ -0,0 +1,54 @@
+"""Спільні фікстури тестів."""
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from .. import ebpro_actions
+from ..ebpro_actions import set_backend
+from ..simulated_backend import SimulatedBackend
+
+SIMULATED = "simulated"
+
+
+@pytest.fixture(autouse=True)
+def _isolated_macro_store(monkeypatch, tmp_path):
+    """Макроси дій записуються у тимчасовий каталог тесту, а не в профіль користувача."""
+
+    monkeypatch.setenv("EBPRO_MCP_MACRO_STORE_PATH", str(tmp_path / "macros.json"))
+    monkeypatch.setattr(ebpro_actions, "_MACRO_STORE", None)
+    monkeypatch.setattr(ebpro_actions, "_CONFIG_CACHE", None)
+
+
+@pytest.fixture
+def use_backend(monkeypatch, tmp_path):
+    """Фабрика: підставляє бекенд і параметри config.json на час тесту, а потім скидає сесію.
+
+    ``use_backend(**settings)`` — новий ``SimulatedBackend(seed=1)``; ``use_backend(None)`` —
+    бекенд за AUTOMATION_BACKEND. Параметри передаються як ``EBPRO_MCP_<KEY>``; кеш збірки
+    за замовчуванням у тимчасовому каталозі.
+    """
+
+    def _use(backend: Any = SIMULATED, **settings: Any) -> Any:
+        settings.setdefault("BUILD_CACHE_DIR", tmp_path / "builds")
+        for key, value in settings.items():
+            monkeypatch.setenv(f"EBPRO_MCP_{key}", str(value))
+        monkeypatch.setattr(ebpro_actions, "_CONFIG_CACHE", None)
+        monkeypatch.setattr(ebpro_actions, "_BUILD_CACHE", None)
+        if backend == SIMULATED:
+            backend = SimulatedBackend(seed=1)
+        set_backend(backend)
+        return backend
+
+    yield _use
+    set_backend(None)
+    ebpro_actions.get_session().invalidate()
+    ebpro_actions._CONFIG_CACHE = None
+
+
+@pytest.fixture
+def backend(use_backend):
+    """Симульований бекенд з типовими налаштуваннями."""
+
+    return use_backend()
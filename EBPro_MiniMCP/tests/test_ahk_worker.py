@@ -0,0 +1,87 @@
+"""Тести постійного помічника AutoHotkey на замінникові з Python."""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+
+from .. import ahk_worker as ahk_worker_module
+from .. import ebpro_actions
+from ..ahk_worker import AhkTimeoutError, AhkWorker, AhkWorkerError, stand_in_command
+from ..ebpro_actions import FriendlyError, PywinautoBackend, get_ahk_worker, stop_ahk_worker
+
+
+@pytest.fixture
+def worker():
+    helper = AhkWorker(stand_in_command(), start_timeout=10.0, command_timeout=5.0)
+    yield helper
+    helper.close()
+
+
+def test_one_process_serves_many_commands(worker):
+    assert worker.call("ping") == "pong"
+    pid = worker.pid
+
+    started = time.perf_counter()
+    for _ in range(20):
+        assert worker.call("simulate_offline", "EasyBuilder Pro\tv6") == "sent to EasyBuilder Pro v6"
+    elapsed = time.perf_counter() - started
+
+    assert worker.pid == pid and worker.stats()["calls"] == 21 and worker.restarts == 0
+    # Без старту процесу на кожну команду 20 викликів укладаються в частки секунди.
+    assert elapsed < 1.0
+    with pytest.raises(AhkWorkerError, match="Невідома команда"):
+        worker.call("reboot")
+    assert worker.pid == pid
+
+
+def test_timeout_kills_helper_and_next_call_respawns(worker):
+    pid = worker.start()
+
+    with pytest.raises(AhkTimeoutError):
+        worker.call("sleep", 5, timeout=0.2)
+
+    assert worker.pid is None and worker.timeouts == 1
+    assert worker.call("ping") == "pong"
+    assert worker.pid != pid and worker.restarts == 1
+
+
+def test_helper_that_dies_is_restarted(worker):
+    pid = worker.start()
+
+    with pytest.raises(AhkWorkerError, match="завершився"):
+        worker.call("exit", 3)
+    assert worker.call("ping") == "pong"
+
+    worker._process.kill()
+    worker._process.wait()
+    assert worker.call("ping") == "pong"
+    assert worker.restarts == 2 and worker.pid not in (None, pid)
+
+
+def test_missing_helper_executable_is_reported(tmp_path):
+    helper = AhkWorker([str(tmp_path / "AutoHotkey.exe"), "ahk_worker.ahk"])
+    with pytest.raises(AhkWorkerError, match="Не вдалося запустити"):
+        helper.call("ping")
+
+
+def test_backend_fallback_uses_persistent_helper(monkeypatch):
+    monkeypatch.setenv("EBPRO_MCP_AHK_WORKER_SCRIPT", ahk_worker_module.__file__)
+    monkeypatch.setenv("EBPRO_MCP_AHK_COMMAND_TIMEOUT", "0.3")
+    monkeypatch.setattr(ebpro_actions, "_CONFIG_CACHE", None)
+    monkeypatch.setattr(ebpro_actions, "_AHK_WORKER", None)
+    backend = PywinautoBackend()
+    try:
+        backend.run_ahk("simulate_offline", Path("simulate_offline.ahk"), timeout=5.0)
+        backend.run_ahk("simulate_offline", Path("simulate_offline.ahk"), timeout=5.0)
+        worker = get_ahk_worker()
+        assert worker.stats()["calls"] == 2 and worker.restarts == 0
+
+        with pytest.raises(FriendlyError) as error:
+            backend.run_ahk("sleep", Path("sleep.ahk"), timeout=0.2)
+        assert "AHK_COMMAND_TIMEOUT" in error.value.hint
+    finally:
+        stop_ahk_worker()
+        ebpro_actions._CONFIG_CACHE = None
+    assert ebpro_actions._AHK_WORKER is None
@@ -0,0 +1,41 @@
+"""Тести допоміжних функцій бенчмарку та короткий прогін у процесі."""
+from __future__ import annotations
+
+import pytest
+
+from ..bench import nlp_bench
+from ..bench.run_bench import compare, main, percentile
+
+
+def test_percentile_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_compare_flags_latency_and_throughput_regressions():
+    baseline = {"inprocess:mixed:c8": {"p95": 10.0, "p99": 20.0, "rps": 100.0, "errors": 0}}
+    fine = {"inprocess:mixed:c8": {"p95": 11.0, "p99": 21.0, "rps": 95.0, "errors": 0}}
+    slow = {"inprocess:mixed:c8": {"p95": 15.0, "p99": 21.0, "rps": 60.0, "errors": 0}}
+
+    assert compare(fine, baseline, tolerance=0.25) == []
+    assert len(compare(slow, baseline, tolerance=0.25)) == 2
+
+
+def test_short_inprocess_run(tmp_path):
+    pytest.importorskip("httpx")
+    pytest.importorskip("PIL")
+    baseline = tmp_path / "baseline.json"
+
+    assert main(["--requests", "20", "--clients", "2", "--save-baseline", str(baseline)]) == 0
+    assert main(["--requests", "20", "--clients", "2", "--baseline", str(baseline), "--tolerance", "100"]) == 0
+
+
+def test_nlp_micro_benchmark_reports_cache_hits():
+    results = nlp_bench.run(texts=20, iterations=200, repeat_share=0.8)
+
+    assert results["cache"]["hits"] + results["cache"]["misses"] == 200
+    assert results["cache"]["misses"] <= 20
+    assert results["steps_per_text"] >= 1
+    assert nlp_bench.main(["--texts", "5", "--iterations", "50"]) == 0
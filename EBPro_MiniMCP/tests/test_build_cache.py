@@ -0,0 +1,39 @@
+"""Юніт-тести для кешу збірки."""
+from __future__ import annotations
+
+from ..build_cache import BuildCache
+
+
+def _artifact(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_same_project_and_settings_hit_the_cache(tmp_path):
+    project = tmp_path / "pump.emtp"
+    project.write_bytes(b"project-v1")
+    cache = BuildCache(tmp_path / "store", max_bytes=1024)
+
+    key = cache.key(project, {"ebpro": "6.09"})
+    assert cache.lookup(key) is None
+    stored = cache.store(key, _artifact(tmp_path, "pump.exob", 10))
+
+    assert cache.lookup(cache.key(project, {"ebpro": "6.09"})) == stored
+    assert cache.key(project, {"ebpro": "6.10"}) != key
+    project.write_bytes(b"project-v2")
+    assert cache.key(project, {"ebpro": "6.09"}) != key
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_total_size(tmp_path):
+    cache = BuildCache(tmp_path / "store", max_bytes=250)
+    cache.store("a" * 64, _artifact(tmp_path, "a.exob", 100))
+    cache.store("b" * 64, _artifact(tmp_path, "b.exob", 100))
+    cache.lookup("a" * 64)  # "a" стає найсвіжішим
+    cache.store("c" * 64, _artifact(tmp_path, "c.exob", 100))
+
+    assert cache.lookup("b" * 64) is None
+    assert cache.lookup("a" * 64) is not None
+    reopened = BuildCache(tmp_path / "store", max_bytes=250)
+    assert reopened.stats()["entries"] == 2
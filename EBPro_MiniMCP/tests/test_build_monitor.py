@@ -0,0 +1,120 @@
+"""Тести моніторингу збірки: інкрементне читання виводу та підсумок збірки."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from ..build_monitor import BuildMonitor, IncrementalLogReader, OutputTextTracker, classify_line
+from ..ebpro_actions import BuildFailedError, build_project, open_project
+
+
+@pytest.fixture
+def backend(use_backend):
+    return use_backend(BUILD_CACHE_ENABLED=0)
+
+
+def test_classify_compiler_lines():
+    assert classify_line("Error: Address LW-9999 out of range") == "error"
+    assert classify_line("[Window 10] error E102: object overlaps") == "error"
+    assert classify_line("Попередження: тег не використовується") == "warning"
+    assert classify_line("Compile finished: 1 error(s), 2 warning(s)") is None
+    assert classify_line("Compiling window 10 (no errors so far)") is None
+
+
+def test_log_reader_returns_only_appended_lines(tmp_path):
+    log = tmp_path / "compile.log"
+    log.write_text("old build\n", encoding="utf-8")
+    reader = IncrementalLogReader(log)
+
+    with log.open("a", encoding="utf-8") as fp:
+        fp.write("Warning: one\nError: tw")
+    assert reader.read_lines() == ["Warning: one"]
+    with log.open("a", encoding="utf-8") as fp:
+        fp.write("o\n0 error(s)")
+    assert reader.read_lines() == ["Error: two"]
+    assert reader.read_lines() == ["0 error(s)"]
+
+    log.write_text("fresh\n", encoding="utf-8")
+    assert reader.read_lines() == ["fresh"]
+
+
+def test_output_tracker_detects_recreated_window():
+    tracker = OutputTextTracker()
+    assert tracker.feed("Build #1\nCompile finished: 0 error(s), 0 warning(s)") == [
+        "Build #1",
+        "Compile finished: 0 error(s), 0 warning(s)",
+    ]
+    assert tracker.feed("Build #1\nCompile finished: 0 error(s), 0 warning(s)") == []
+    assert tracker.feed("Build #2\nCompile finished: 0 error(s), 0 warning(s)")[0] == "Build #2"
+
+
+def test_monitor_reports_errors_from_log_without_artifact(tmp_path):
+    log = tmp_path / "compile.log"
+    log.write_text("", encoding="utf-8")
+    monitor = BuildMonitor([tmp_path / "pump.exob"], started=time.time(), log=IncrementalLogReader(log))
+    assert monitor.poll() is None
+
+    log.write_text("Error: missing font\nWarning: unused tag\n1 error(s), 1 warning(s)\n", encoding="utf-8")
+    result = monitor.poll()
+
+    assert result is not None and not result.ok
+    assert result.errors == ["Error: missing font"] and result.warnings == ["Warning: unused tag"]
+    assert result.artifact is None
+
+
+def test_clean_summary_without_artifact_finishes_after_grace(tmp_path):
+    log = tmp_path / "compile.log"
+    log.write_text("", encoding="utf-8")
+    monitor = BuildMonitor(
+        [tmp_path / "pump.exob"], started=time.time(), log=IncrementalLogReader(log), summary_grace=0.1
+    )
+    log.write_text("0 error(s), 0 warning(s)\n", encoding="utf-8")
+    assert monitor.poll() is None
+
+    time.sleep(0.15)
+    result = monitor.poll()
+
+    assert result is not None and result.ok and result.artifact is None
+    assert not result.confirmed and "BUILD_ARTIFACT_DIR" in result.hint
+
+
+def test_artifact_is_looked_up_in_configured_directory(use_backend, tmp_path):
+    use_backend(BUILD_CACHE_ENABLED=0, BUILD_ARTIFACT_DIR=tmp_path / "out", BUILD_SUMMARY_GRACE=0.1)
+    project = tmp_path / "pump.emtp"
+    project.write_bytes(b"project")
+    open_project(str(project))
+
+    # Симулятор кладе артефакт поруч із проєктом, а не в BUILD_ARTIFACT_DIR.
+    result = build_project(use_cache=False)
+
+    assert result.ok and result.artifact is None and not result.confirmed
+    assert str(tmp_path / "out" / "pump.exob") in result.hint
+
+
+def test_build_project_returns_structured_result(backend, tmp_path):
+    project = tmp_path / "pump.emtp"
+    project.write_bytes(b"project")
+    open_project(str(project))
+    backend.build_warnings = ["Address LW-100 is not used"]
+
+    result = build_project(use_cache=False)
+
+    assert result.ok and result.confirmed and not result.cached
+    assert result.artifact == str(project.with_suffix(".exob"))
+    assert result.warnings == ["Warning: Address LW-100 is not used"]
+    assert result.duration < 1.0
+
+
+def test_build_errors_raise_with_result(backend, tmp_path):
+    project = tmp_path / "pump.emtp"
+    project.write_bytes(b"project")
+    open_project(str(project))
+    backend.build_errors = ["Window 10: object out of screen"]
+
+    with pytest.raises(BuildFailedError) as excinfo:
+        build_project(use_cache=False)
+
+    assert excinfo.value.result.errors == ["Error: Window 10: object out of screen"]
+    assert "object out of screen" in str(excinfo.value)
+    assert not project.with_suffix(".exob").exists()
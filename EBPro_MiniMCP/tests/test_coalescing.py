@@ -0,0 +1,82 @@
+"""Тести об'єднання однакових запитів і ключів ідемпотентності."""
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from ..coalescing import (
+    OUTCOME_COALESCED,
+    OUTCOME_NEW,
+    OUTCOME_REPLAYED,
+    IdempotencyConflict,
+    RequestCoalescer,
+)
+from ..ebpro_actions import FriendlyError
+from ..jobs import JobQueue
+
+
+@pytest.fixture
+def gated_queue():
+    gate = threading.Event()
+    calls = []
+
+    def _runner(action, params):
+        calls.append((action, params))
+        gate.wait(5)
+        if params.get("fail"):
+            raise FriendlyError("Збірка впала.")
+        return {"file": params.get("out"), "notes": "ok"}
+
+    queue = JobQueue(_runner)
+    yield queue, gate, calls
+    gate.set()
+    queue.stop(timeout=5)
+
+
+def test_identical_inflight_requests_share_one_job(gated_queue):
+    queue, gate, calls = gated_queue
+    coalescer = RequestCoalescer()
+
+    first = coalescer.submit(queue, "build_exob", {"use_cache": True})
+    second = coalescer.submit(queue, "build_exob", {"use_cache": True})
+    other = coalescer.submit(queue, "build_exob", {"use_cache": False})
+    gate.set()
+    first.job.future.result(timeout=5)
+    other.job.future.result(timeout=5)
+
+    assert (first.outcome, second.outcome) == (OUTCOME_NEW, OUTCOME_COALESCED)
+    assert second.job is first.job and other.job is not first.job
+    assert len(calls) == 2
+    assert coalescer.submit(queue, "build_exob", {"use_cache": True}).outcome == OUTCOME_NEW
+
+
+def test_idempotency_key_replays_completed_result(gated_queue):
+    queue, gate, calls = gated_queue
+    coalescer = RequestCoalescer(ttl=60)
+    gate.set()
+
+    first = coalescer.submit(queue, "pack_ecmp", {"out": "a.ecmp"}, idempotency_key="k1")
+    first.job.future.result(timeout=5)
+    retry = coalescer.submit(queue, "pack_ecmp", {"out": "a.ecmp"}, idempotency_key="k1")
+
+    assert retry.outcome == OUTCOME_REPLAYED
+    assert retry.job.future.result() == {"file": "a.ecmp", "notes": "ok"}
+    assert len(calls) == 1
+    with pytest.raises(IdempotencyConflict):
+        coalescer.submit(queue, "pack_ecmp", {"out": "b.ecmp"}, idempotency_key="k1")
+
+
+def test_failed_job_and_expired_ttl_release_the_key(gated_queue):
+    queue, gate, calls = gated_queue
+    gate.set()
+    coalescer = RequestCoalescer(ttl=0)
+
+    failed = coalescer.submit(queue, "build_exob", {"fail": True}, idempotency_key="k2")
+    with pytest.raises(FriendlyError):
+        failed.job.future.result(timeout=5)
+    assert coalescer.submit(queue, "build_exob", {"fail": True}, idempotency_key="k2").outcome == OUTCOME_NEW
+
+    done = coalescer.submit(queue, "pack_ecmp", {"out": "c.ecmp"}, idempotency_key="k3")
+    done.job.future.result(timeout=5)
+    assert coalescer.submit(queue, "pack_ecmp", {"out": "c.ecmp"}, idempotency_key="k3").outcome == OUTCOME_NEW
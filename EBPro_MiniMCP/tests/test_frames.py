@@ -0,0 +1,58 @@
+"""Юніт-тести для придушення незмінних кадрів."""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from ..ebpro_actions import run_offline_sim
+from ..frames import FrameDiffer, mjpeg_stream
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def test_unchanged_frames_are_skipped_until_keyframe():
+    differ = FrameDiffer(keyframe_interval=10.0)
+    frame = Image.new("RGB", (64, 64), (0, 0, 0))
+
+    assert differ.changed_region(frame, now=0.0) == (0, 0, 64, 64)
+    assert differ.changed_region(frame.copy(), now=1.0) is None
+    assert differ.changed_region(frame.copy(), now=11.0) == (0, 0, 64, 64)
+    assert (differ.sent, differ.skipped) == (2, 1)
+
+
+def test_changed_region_covers_modified_pixels():
+    differ = FrameDiffer(keyframe_interval=10.0, sample=4)
+    frame = Image.new("RGB", (64, 64), (0, 0, 0))
+    differ.changed_region(frame, now=0.0)
+
+    changed = frame.copy()
+    changed.paste((255, 255, 255), (16, 20, 32, 28))
+    left, top, right, bottom = differ.changed_region(changed, now=1.0)
+
+    assert left <= 16 and top <= 20 and right >= 32 and bottom >= 28
+    assert right - left < 64
+
+
+def test_stream_captures_frames_on_gui_worker_thread(backend):
+    pytest.importorskip("fastapi")
+    from .. import mcp_server
+
+    run_offline_sim()
+    threads = []
+    capture = backend.capture
+    backend.capture = lambda bbox: threads.append(threading.current_thread().name) or capture(bbox)
+
+    async def _first_part():
+        stream = mjpeg_stream(mcp_server._stream_frame, max_fps=30)
+        try:
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+
+    part = asyncio.run(_first_part())
+
+    assert part.startswith(b"--frame\r\nContent-Type: image/jpeg")
+    assert threads == ["ebpro-gui-worker"]
+    assert all(job.action != "stream_frame" for job in mcp_server.JOB_QUEUE.list())
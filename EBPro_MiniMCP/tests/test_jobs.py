@@ -0,0 +1,53 @@
+"""Юніт-тести для черги завдань."""
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from ..ebpro_actions import FriendlyError
+from ..jobs import JOB_DONE, JOB_FAILED, JobQueue
+
+
+def test_jobs_run_in_order_on_single_thread():
+    seen = []
+
+    def runner(action, params):
+        seen.append((action, threading.current_thread().name))
+        return {"file": params.get("out")}
+
+    jobs = JobQueue(runner)
+    first = jobs.submit("open_project", {"path": "a.emtp"})
+    second = jobs.submit("take_screenshot", {"out": "shot.png"})
+
+    assert second.future.result(timeout=5) == {"file": "shot.png"}
+    assert first.status == JOB_DONE
+    assert [action for action, _ in seen] == ["open_project", "take_screenshot"]
+    assert {name for _, name in seen} == {"ebpro-gui-worker"}
+    info = second.to_dict()
+    assert info["run_ms"] is not None and info["queue_ms"] is not None
+    jobs.stop(timeout=5)
+
+
+def test_failed_job_keeps_error_details():
+    def runner(action, params):
+        raise FriendlyError("Вікно не знайдено.", "Змініть заголовок вікна.")
+
+    jobs = JobQueue(runner)
+    job = jobs.submit("build_exob", {})
+    with pytest.raises(FriendlyError):
+        job.future.result(timeout=5)
+
+    assert job.status == JOB_FAILED
+    assert job.error["hint"] == "Змініть заголовок вікна."
+    assert jobs.get(job.id) is job
+    assert jobs.list(status=JOB_FAILED) == [job]
+    jobs.stop(timeout=5)
+
+
+def test_submit_with_custom_runner_uses_same_worker():
+    jobs = JobQueue(lambda action, params: {"via": "default"})
+    job = jobs.submit("batch", {"plan": []}, runner=lambda action, params: {"via": action})
+
+    assert job.future.result(timeout=5) == {"via": "batch"}
+    jobs.stop(timeout=5)
@@ -0,0 +1,92 @@
+"""Тести конвеєра логування: ротація, JSON-формат, контекст запиту, проріджування."""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+
+from ..jobs import JobQueue
+from ..logging_setup import (
+    VERBOSE,
+    CompressingRotatingFileHandler,
+    ContextFilter,
+    JsonFormatter,
+    SamplingFilter,
+    request_scope,
+    set_request_action,
+)
+
+
+def _record(msg: str = "подія", level: int = logging.INFO, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("ebpro.test", level, __file__, 10, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_size_rotation_compresses_and_prunes_segments(tmp_path):
+    handler = CompressingRotatingFileHandler(tmp_path / "ebpro.log", max_bytes=200, backup_count=2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for index in range(40):
+        handler.emit(_record(f"рядок {index:03d} " + "x" * 40))
+    handler.close()
+
+    segments = handler.segments()
+    assert len(segments) == 2
+    assert all(path.suffix == ".gz" for path in segments)
+    assert "рядок" in gzip.decompress(segments[-1].read_bytes()).decode("utf-8")
+    assert (tmp_path / "ebpro.log").stat().st_size < 400
+
+
+def test_log_directory_is_created_on_first_record(tmp_path):
+    handler = CompressingRotatingFileHandler(tmp_path / "logs" / "ebpro.log")
+    assert not (tmp_path / "logs").exists()
+
+    handler.emit(_record())
+    handler.close()
+    assert (tmp_path / "logs" / "ebpro.log").read_text(encoding="utf-8")
+
+
+def test_json_lines_carry_request_context():
+    context = ContextFilter()
+    with request_scope("req-1"):
+        set_request_action("build_exob")
+        record = _record("Збірку виконано", duration_ms=12.5)
+        context.filter(record)
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["request_id"] == "req-1"
+    assert payload["action"] == "build_exob"
+    assert payload["duration_ms"] == 12.5
+    assert payload["message"] == "Збірку виконано"
+
+
+def test_job_worker_thread_inherits_request_id():
+    seen = []
+    context = ContextFilter()
+
+    def _runner(action, params):
+        record = _record()
+        context.filter(record)
+        seen.append(record.request_id)
+        return {}
+
+    queue = JobQueue(_runner)
+    try:
+        with request_scope("req-2"):
+            job = queue.submit("open_project", {})
+        job.future.result(timeout=5)
+    finally:
+        queue.stop(timeout=5)
+
+    assert seen == ["req-2"]
+
+
+def test_sampling_keeps_every_nth_verbose_record():
+    sampler = SamplingFilter(0.25)
+    verbose = [sampler.filter(_record(level=logging.INFO, **VERBOSE)) for _ in range(8)]
+    regular = [sampler.filter(_record(level=logging.INFO)) for _ in range(3)]
+    warnings = [sampler.filter(_record(level=logging.WARNING, **VERBOSE)) for _ in range(3)]
+
+    assert verbose.count(True) == 2
+    assert all(regular) and all(warnings)
@@ -0,0 +1,91 @@
+"""Тести запису та відтворення макросів дій на симульованому бекенді."""
+from __future__ import annotations
+
+import pytest
+
+from .. import ebpro_actions
+from ..ebpro_actions import FriendlyError, get_macro_store, macro_profile, open_project, pack_ecmp
+from ..macros import STEP_DIALOG, STEP_MENU, Macro, MacroStep, MacroStore
+
+
+@pytest.fixture
+def project(tmp_path):
+    path = tmp_path / "pump.emtp"
+    path.write_bytes(b"project")
+    return path
+
+
+def _lookups(backend, action):
+    before = backend.lookups
+    action()
+    return backend.lookups - before
+
+
+def test_second_run_replays_without_lookups_and_survives_restart(backend, project, monkeypatch):
+    assert _lookups(backend, lambda: open_project(str(project))) == 2
+    assert _lookups(backend, lambda: open_project(str(project))) == 0
+
+    store = get_macro_store()
+    macro = store.get(macro_profile(), "open_project")
+    assert [(step.kind, step.target) for step in macro.steps] == [(STEP_MENU, "File->Open..."), (STEP_DIALOG, "open")]
+    assert macro.steps[1].expect == "Open"
+    assert store.stats()["replays"] == 1
+
+    # Новий процес сервісу читає макроси з диска.
+    monkeypatch.setattr(ebpro_actions, "_MACRO_STORE", None)
+    assert get_macro_store() is not store
+    assert _lookups(backend, lambda: open_project(str(project))) == 0
+
+
+def test_changed_control_falls_back_and_rerecords(backend, project, tmp_path):
+    open_project(str(project))
+    backend.control_ids["Compress"] = "menuCompressV2"
+    pack_ecmp(str(tmp_path / "out.ecmp"))
+
+    backend.control_ids["Open..."] = "menuOpenV2"
+    assert _lookups(backend, lambda: open_project(str(project))) == 1
+    assert get_macro_store().stats()["fallbacks"] == 1
+    assert _lookups(backend, lambda: open_project(str(project))) == 0
+
+
+def test_macros_are_kept_per_version_and_locale(backend, project, monkeypatch):
+    open_project(str(project))
+    backend.locale = "uk_UA"
+    backend.dialog_titles["open"] = "Відкрити"
+    assert _lookups(backend, lambda: open_project(str(project))) == 2
+
+    snapshot = get_macro_store().snapshot()
+    assert set(snapshot) == {"simulated/en_US", "simulated/uk_UA"}
+    assert snapshot["simulated/uk_UA"]["open_project"]["steps"][1]["expect"] == "Відкрити"
+
+    monkeypatch.setenv("EBPRO_MCP_EBPRO_VERSION", "6.10")
+    monkeypatch.setattr(ebpro_actions, "_CONFIG_CACHE", None)
+    assert macro_profile() == "6.10/uk_UA"
+
+
+def test_failed_fallback_discards_stale_macro(backend, project):
+    open_project(str(project))
+    profile = macro_profile()
+    backend.control_ids["Open..."] = "menuOpenV2"
+    backend.fail_rate = 1.0
+
+    with pytest.raises(FriendlyError):
+        open_project(str(project))
+
+    assert get_macro_store().get(profile, "open_project") is None
+
+
+def test_store_forgets_by_profile_and_action(tmp_path):
+    store = MacroStore(tmp_path / "macros.json")
+    for profile in ("6.09/en_US", "6.09/uk_UA"):
+        for action in ("open_project", "pack_ecmp"):
+            store.put(profile, Macro(action=action, steps=[MacroStep(STEP_MENU, "File->Open...")]))
+
+    assert store.forget(action="pack_ecmp") == 2
+    assert store.forget("6.09/uk_UA") == 1
+    reopened = MacroStore(tmp_path / "macros.json")
+    assert list(reopened.snapshot()) == ["6.09/en_US"]
+    assert reopened.get("6.09/en_US", "open_project").steps[0].target == "File->Open..."
+
+    (tmp_path / "macros.json").write_text("{broken", encoding="utf-8")
+    assert MacroStore(tmp_path / "macros.json").stats()["macros"] == 0
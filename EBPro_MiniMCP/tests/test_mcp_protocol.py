@@ -0,0 +1,134 @@
+"""Тести MCP JSON-RPC: протокол, stdio з конвеєрними запитами та /mcp."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import io
+import json
+
+import pytest
+
+from ..ebpro_actions import FriendlyError
+from ..mcp_protocol import INVALID_PARAMS, METHOD_NOT_FOUND, MCPServer, ToolOutput, build_tools, serve_stdio
+
+ACTIONS = ["open_project", "build_exob", "run_offline_sim", "take_screenshot", "pack_ecmp"]
+
+
+def _request(message_id, method, **params):
+    return {"jsonrpc": "2.0", "id": message_id, "method": method, "params": params}
+
+
+def _server(calls):
+    async def execute(action, arguments, progress):
+        calls.append(action)
+        if action == "build_exob":
+            if progress is not None:
+                progress({"event": "step", "elapsed_ms": 1.0, "step": "menu"})
+            await asyncio.sleep(0.2)
+            return ToolOutput({"file": "D:/HMI/pump.exob", "notes": "Зібрано."})
+        if action == "pack_ecmp":
+            raise FriendlyError("Вікно Compress не з'явилось.", "Перевірте меню.")
+        return ToolOutput({"file": None, "notes": "Знімок."}, b"\x89PNG", "image/png")
+
+    def describe(exc):
+        return {"code": "action_failed", "message": str(exc), "hint": exc.hint}
+
+    return MCPServer(execute, describe, build_tools(ACTIONS))
+
+
+def _run(server, payload):
+    return asyncio.run(server.handle_payload(json.dumps(payload), lambda message: None))
+
+
+def test_initialize_and_typed_tool_list():
+    server = _server([])
+    init = _run(server, _request(1, "initialize", protocolVersion="2025-03-26", capabilities={}))
+    assert init["result"]["protocolVersion"] == "2025-03-26"
+    assert init["result"]["capabilities"]["tools"] == {"listChanged": False}
+
+    tools = {tool["name"]: tool for tool in _run(server, _request(2, "tools/list"))["result"]["tools"]}
+    assert list(tools) == ACTIONS
+    assert tools["pack_ecmp"]["inputSchema"]["required"] == ["out"]
+    assert tools["take_screenshot"]["inputSchema"]["properties"]["region"]["type"] == "array"
+    assert "priority" in tools["build_exob"]["inputSchema"]["properties"]
+
+
+def test_arguments_are_validated_and_errors_reported():
+    server = _server([])
+    missing = _run(server, _request(1, "tools/call", name="pack_ecmp", arguments={}))
+    wrong = _run(server, _request(2, "tools/call", name="take_screenshot", arguments={"region": [1, 2]}))
+    unknown = _run(server, _request(3, "resources/list"))
+    failed = _run(server, _request(4, "tools/call", name="pack_ecmp", arguments={"out": "D:/p.ecmp"}))
+
+    assert missing["error"]["code"] == INVALID_PARAMS and "out" in missing["error"]["message"]
+    assert wrong["error"]["code"] == INVALID_PARAMS
+    assert unknown["error"]["code"] == METHOD_NOT_FOUND
+    assert failed["result"]["isError"] and failed["result"]["structuredContent"]["hint"] == "Перевірте меню."
+    assert _run(server, [])["error"]["code"] == -32600
+    assert asyncio.run(server.handle_payload(b"{", lambda message: None))["error"]["code"] == -32700
+
+
+def test_stdio_answers_pipelined_requests_out_of_order_and_honours_cancel():
+    calls = []
+    lines = [
+        _request(1, "tools/call", name="build_exob", arguments={}, _meta={"progressToken": "b1"}),
+        _request(2, "tools/call", name="build_exob", arguments={}),
+        {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 2}},
+        _request(3, "ping"),
+        _request(4, "tools/call", name="take_screenshot", arguments={}),
+    ]
+    reader = io.BytesIO(b"".join(json.dumps(line).encode("utf-8") + b"\n" for line in lines))
+    writer = io.BytesIO()
+
+    asyncio.run(serve_stdio(_server(calls), reader, writer))
+
+    messages = [json.loads(line) for line in writer.getvalue().splitlines()]
+    order = [message.get("id", message.get("method")) for message in messages]
+    assert order.index(3) < order.index(1) and order.index(4) < order.index(1)
+    assert 2 not in order
+    assert "notifications/progress" in order
+    shot = next(message for message in messages if message.get("id") == 4)["result"]
+    assert shot["content"][0] == {"type": "image", "data": base64.b64encode(b"\x89PNG").decode(), "mimeType": "image/png"}
+
+
+def test_cancel_reaches_only_the_owning_session():
+    server = _server([])
+    build = json.dumps(_request(1, "tools/call", name="build_exob", arguments={}))
+    cancel = json.dumps({"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 1}})
+
+    async def scenario():
+        first = asyncio.ensure_future(server.handle_payload(build, lambda message: None, "a"))
+        second = asyncio.ensure_future(server.handle_payload(build, lambda message: None, "b"))
+        await asyncio.sleep(0.05)
+        await server.handle_payload(cancel, lambda message: None, "a")
+        return await first, await second
+
+    first, second = asyncio.run(scenario())
+
+    assert first is None
+    assert second["result"]["structuredContent"]["file"] == "D:/HMI/pump.exob"
+    assert not server._inflight
+
+
+def test_http_endpoint_returns_inline_screenshot(backend):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    pytest.importorskip("PIL")
+    from .. import mcp_server
+
+    batch = [
+        _request(1, "initialize", protocolVersion="2025-06-18", capabilities={}),
+        _request(2, "tools/call", name="take_screenshot", arguments={"format": "png", "priority": "interactive"}),
+    ]
+    with fastapi_testclient.TestClient(mcp_server.app) as client:
+        started = client.post("/mcp", json=_request(0, "tools/call", name="run_offline_sim", arguments={}))
+        response = client.post("/mcp", json=batch)
+        notified = client.post("/mcp", json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    assert not started.json()["result"]["isError"]
+    assert response.status_code == 200 and response.headers["Mcp-Session-Id"]
+    results = {message["id"]: message["result"] for message in response.json()}
+    image = results[2]["content"][0]
+    assert image["type"] == "image" and image["mimeType"] == "image/png"
+    assert base64.b64decode(image["data"]).startswith(b"\x89PNG")
+    assert results[2]["structuredContent"]["width"] > 0
+    assert notified.status_code == 202
@@ -0,0 +1,103 @@
+"""Тести кешу локаторів меню на фейкових елементах UIA."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from ..ebpro_actions import EBProSession, PywinautoBackend
+from ..locators import SCOPE_WINDOW, MenuLocatorCache
+
+
+class FakeElement:
+    def __init__(self, name, control_type, auto_id="", expandable=False):
+        self.element_info = SimpleNamespace(name=name, control_type=control_type, automation_id=auto_id, handle=None)
+        self.expandable = expandable
+        self.visible = True
+        self.actions = []
+
+    def is_visible(self):
+        return self.visible
+
+    def expand(self):
+        if not self.expandable:
+            raise RuntimeError("no ExpandCollapse pattern")
+        self.actions.append("expand")
+
+    def invoke(self):
+        self.actions.append("invoke")
+
+
+class FakeWindow:
+    def __init__(self, elements):
+        self.elements = elements
+        self.element_info = SimpleNamespace(handle=1001)
+        self.size = (1280, 800)
+        self.walks = 0
+
+    def rectangle(self):
+        return SimpleNamespace(width=lambda: self.size[0], height=lambda: self.size[1])
+
+    def descendants(self, control_type=None):
+        self.walks += 1
+        return [item for item in self.elements if control_type in (None, item.element_info.control_type)]
+
+
+@pytest.fixture
+def ribbon(monkeypatch):
+    tab = FakeElement("Build", "TabItem", "tabBuild")
+    button = FakeElement("Build", "Button", "btnBuild")
+    window = FakeWindow([FakeElement("Home", "TabItem", "tabHome"), tab, button])
+    backend = PywinautoBackend(session=EBProSession())
+    monkeypatch.setattr(backend, "focus_window", lambda title: window)
+    monkeypatch.setattr(
+        backend, "_menu_containers", lambda win, scope: [win] if scope == SCOPE_WINDOW else []
+    )
+    return backend, window, tab, button
+
+
+def test_second_selection_skips_tree_walk(ribbon):
+    backend, window, tab, button = ribbon
+
+    backend.menu_select(["Build", "Build"])
+    walks = window.walks
+    backend.menu_select(["Build", "Build"])
+
+    assert tab.actions == ["invoke", "invoke"]
+    assert button.actions == ["invoke", "invoke"]
+    assert window.walks == walks
+    assert backend.menu_locators.stats()["hits"] == 1
+
+
+def test_layout_change_invalidates_route(ribbon):
+    backend, window, _, _ = ribbon
+    backend.menu_select(["Build", "Build"])
+    walks = window.walks
+
+    window.size = (1920, 1080)
+    backend.menu_select(["Build", "Build"])
+
+    assert window.walks > walks
+    assert backend.menu_locators.stats()["misses"] == 2
+
+
+def test_dead_element_is_relocated_by_automation_id(ribbon):
+    backend, window, _, button = ribbon
+    backend.menu_select(["Build", "Build"])
+
+    button.visible = False
+    fresh = FakeElement("Збірка", "Button", "btnBuild")
+    window.elements.append(fresh)
+    window.elements.remove(button)
+    backend.menu_select(["Build", "Build"])
+
+    assert fresh.actions == ["invoke"]
+
+
+def test_cache_rejects_other_window():
+    cache = MenuLocatorCache()
+    cache.put(1, ["File", "Open..."], (800, 600, 96), [])
+
+    assert cache.get(1, ["File", "Open..."], (800, 600, 96)) is not None
+    assert cache.get(2, ["File", "Open..."], (800, 600, 96)) is None
+    assert cache.get(1, ["File", "Open..."], (800, 600, 96)) is None
@@ -0,0 +1,94 @@
+"""Тести метрик Prometheus та інструментування етапів."""
+from __future__ import annotations
+
+import pytest
+
+from .. import metrics
+from ..ebpro_actions import FriendlyError, WaitTimeoutError, open_project, run_offline_sim
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Тест.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5.0, stage="a")
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="a"} 3' in lines
+    assert lines[1] == "# TYPE test_seconds histogram"
+
+
+def test_stage_labels_action_and_error_class():
+    def _count(**labels):
+        return metrics.STAGE_DURATION.count(stage="unit", action="pack_ecmp", **labels)
+
+    before_ok = _count(outcome="ok", error="")
+    before_error = _count(outcome="error", error="WaitTimeoutError")
+    with metrics.bind_action("pack_ecmp"):
+        with metrics.stage("unit"):
+            pass
+        with pytest.raises(WaitTimeoutError):
+            with metrics.stage("unit"):
+                raise WaitTimeoutError("таймаут")
+
+    assert _count(outcome="ok", error="") == before_ok + 1
+    assert _count(outcome="error", error="WaitTimeoutError") == before_error + 1
+    assert metrics.current_action() == ""
+
+
+def test_gui_steps_are_instrumented(backend, tmp_path):
+    project = tmp_path / "pump.emtp"
+    project.write_bytes(b"project")
+    before = metrics.STAGE_DURATION.count(stage="dialog", action="open_project", outcome="ok", error="")
+
+    with metrics.bind_action("open_project"):
+        open_project(str(project))
+    backend.fail_rate = 1.0
+    with metrics.bind_action("run_offline_sim"), pytest.raises(FriendlyError):
+        run_offline_sim()
+
+    assert metrics.STAGE_DURATION.count(stage="dialog", action="open_project", outcome="ok", error="") == before + 1
+    text = metrics.REGISTRY.render()
+    assert 'stage="click_menu",action="run_offline_sim",outcome="error",error="FriendlyError"' in text
+    assert 'stage="click_menu",action="open_project",outcome="ok"' in text
+
+
+def test_rejected_and_failed_requests_carry_fixed_reason(use_backend):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from .. import mcp_server
+
+    use_backend(API_TOKEN="secret")
+
+    def count(action, reason):
+        return metrics.REQUESTS_TOTAL.value(action=action, outcome="error", reason=reason)
+
+    before = {
+        "auth": count("", "auth"),
+        "parse": count("", "parse"),
+        "action": count("open_project", "action"),
+    }
+    with fastapi_testclient.TestClient(mcp_server.app) as client:
+        client.post("/run", json={"text": "Зроби скріншот", "token": "wrong"})
+        client.post("/run", json={"text": "Покажи мені статистику", "token": "secret"})
+        failed = client.post("/run", json={"action": "open_project", "args": {"path": "D:/none.emtp"}, "token": "secret"})
+
+    assert failed.status_code >= 400
+    assert count("", "auth") == before["auth"] + 1
+    assert count("", "parse") == before["parse"] + 1
+    assert count("open_project", "action") == before["action"] + 1
+    assert 'reason="FriendlyError"' not in "\n".join(metrics.REQUESTS_TOTAL.render())
+
+
+def test_timeouts_and_deadlines_share_timeout_reason():
+    pytest.importorskip("fastapi")
+    from ..cancellation import REASON_CANCELLED, REASON_DEADLINE, JobCancelled
+    from ..mcp_server import _failure_reason
+
+    assert _failure_reason(WaitTimeoutError("Вікно не з'явилось.")) == metrics.REASON_TIMEOUT
+    assert _failure_reason(JobCancelled(REASON_DEADLINE)) == metrics.REASON_TIMEOUT
+    assert _failure_reason(JobCancelled(REASON_CANCELLED)) == metrics.REASON_ACTION
+    assert _failure_reason(FriendlyError("Меню не знайдено.")) == metrics.REASON_ACTION
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import pytest
 
-from ..nlp import NLPError, parse_instruction
+from ..nlp import NLPError, cache_info, clear_cache, parse_instruction, parse_plan
 
 
 def test_open_project_parses_path():
@@ -47,3 +47,91 @@ def test_pack_ecmp():
 def test_unknown_command():
     with pytest.raises(NLPError):
         parse_instruction("Покажи мені статистику")
+
+
+def test_chained_instruction_becomes_ordered_plan():
+    plan = parse_plan('Відкрий проєкт "D:/HMI/build, v2/demo.emtp", збери і запусти офлайн симуляцію')
+
+    assert plan == [
+        ("open_project", {"path": "D:/HMI/build, v2/demo.emtp"}),
+        ("build_exob", {}),
+        ("run_offline_sim", {}),
+    ]
+    shots = parse_plan('Зроби скріншот "a.png", потім скріншот "b.png"')
+    assert [params["out"] for _, params in shots] == ["a.png", "b.png"]
+    with pytest.raises(NLPError, match="кілька дій"):
+        parse_instruction('Відкрий проєкт "D:/HMI/demo.emtp" і збери')
+
+
+def test_keywords_inside_paths_and_names_are_not_actions():
+    assert parse_plan('Відкрий проєкт "D:/build/ecmp_export.emtp"') == [
+        ("open_project", {"path": "D:/build/ecmp_export.emtp"})
+    ]
+    plan = parse_plan("відкрий проєкт pump.ecmp і збери", resolve_project=lambda name: f"D:/HMI/{name}")
+    assert plan == [("open_project", {"path": "pump.ecmp"}), ("build_exob", {})]
+    plan = parse_plan("відкрий проєкт pump і збери", resolve_project=lambda name: f"D:/HMI/{name}.emtp")
+    assert plan == [("open_project", {"path": "D:/HMI/pump.emtp"}), ("build_exob", {})]
+
+
+def test_keywords_inside_other_words_are_not_actions():
+    for text in ("Покажи compressed файли", "Покажи buildings", "Опиши offlines simulation", "Додай screenshots"):
+        with pytest.raises(NLPError):
+            parse_plan(text)
+    assert parse_plan("build і compress", args={"out": "D:/p.ecmp"})[1][0] == "pack_ecmp"
+
+
+def test_export_to_ecmp_stays_a_single_action():
+    assert parse_instruction("Експортуй проєкт у ecmp") == ("build_exob", {})
+    plan = parse_plan("збери, потім ecmp", args={"out": "D:/p.ecmp"})
+    assert [action for action, _ in plan] == ["build_exob", "pack_ecmp"]
+
+
+def test_relative_file_name_is_not_looked_up():
+    def missing(name):
+        raise LookupError(f"Проєкт '{name}' не знайдено.")
+
+    assert parse_plan('Відкрий проєкт "demo.emtp"', resolve_project=missing) == [
+        ("open_project", {"path": "demo.emtp"})
+    ]
+    with pytest.raises(NLPError, match="не знайдено"):
+        parse_plan('Відкрий проєкт "demo"', resolve_project=missing)
+
+
+def test_repeated_texts_hit_parse_cache():
+    clear_cache()
+    for _ in range(3):
+        plan = parse_plan("Зроби скріншот", args={"out": "D:/shots/a.png"})
+    plan[0][1]["out"] = "змінено"
+
+    info = cache_info()
+    assert (info["hits"], info["misses"]) == (2, 1)
+    assert parse_plan("Зроби скріншот", args={"out": "D:/shots/b.png"})[0][1]["out"] == "D:/shots/b.png"
+
+
+def test_run_keeps_literal_path_without_project_roots(use_backend):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from .. import mcp_server
+
+    use_backend(PROJECT_ROOTS=[])
+    with fastapi_testclient.TestClient(mcp_server.app) as client:
+        response = client.post("/run", json={"text": 'Відкрий проєкт "demo"'})
+
+    detail = response.json()["detail"]
+    assert detail["code"] != "invalid_instruction" and detail["message"] == "Файл demo не знайдено."
+
+
+def test_run_executes_chained_instruction_in_one_job(use_backend, tmp_path):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from .. import mcp_server
+
+    use_backend(BUILD_CACHE_ENABLED=0)
+    project = tmp_path / "pump.emtp"
+    project.write_bytes(b"project")
+    with fastapi_testclient.TestClient(mcp_server.app) as client:
+        response = client.post("/run", json={"text": f'Відкрий проєкт "{project}", збери і запусти офлайн симуляцію'})
+
+    body = response.json()
+    assert response.status_code == 200 and body["ok"] and body["action"] == "batch"
+    assert [step["action"] for step in body["steps"]] == ["open_project", "build_exob", "run_offline_sim"]
+    assert body["file"] == str(project.with_suffix(".exob"))
+    assert mcp_server.DISPATCHER.get(body["job_id"]).action == "batch"
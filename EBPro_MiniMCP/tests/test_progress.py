@@ -0,0 +1,97 @@
+"""Тести подій прогресу та потокового /run/stream (SSE)."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from ..ebpro_actions import pack_ecmp, wait_for_file
+from ..progress import ProgressChannel, bind_channel, report
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_channel_delivers_history_and_events_from_other_threads():
+    channel = ProgressChannel()
+    channel.emit("started", action="pack_ecmp")
+
+    async def _consume():
+        queue = channel.subscribe()
+        worker = threading.Thread(target=lambda: (channel.emit("step", step="menu"), channel.close()))
+        worker.start()
+        received = []
+        while (event := await asyncio.wait_for(queue.get(), 5)) is not None:
+            received.append(event["event"])
+        worker.join()
+        return received
+
+    assert asyncio.run(_consume()) == ["started", "step"]
+    channel.emit("late")
+    assert [event["event"] for event in channel.events] == ["started", "step"]
+
+
+def test_report_without_channel_is_noop():
+    report("step", step="menu")
+    with bind_channel(ProgressChannel()):
+        report("step", step="menu")
+
+
+def test_wait_for_file_reports_growth_until_stable(tmp_path):
+    target = tmp_path / "pump.ecmp"
+
+    def _write():
+        for _ in range(3):
+            with target.open("ab") as fp:
+                fp.write(b"x" * 100)
+            time.sleep(0.05)
+
+    channel = ProgressChannel()
+    writer = threading.Thread(target=_write)
+    writer.start()
+    with bind_channel(channel):
+        wait_for_file(target, timeout=5, stable_for=0.2)
+    writer.join()
+
+    states = [event["state"] for event in channel.events]
+    assert states[0] == "appeared" and states[-1] == "stable"
+    assert channel.events[-1]["size"] == 300
+
+
+def test_pack_with_wait_reports_menu_dialog_and_stable_file(backend, tmp_path):
+    channel = ProgressChannel()
+    with bind_channel(channel):
+        pack_ecmp(str(tmp_path / "out" / "pump.ecmp"), wait=True)
+
+    names = [(event["event"], event.get("step") or event.get("state")) for event in channel.events]
+    assert names[:3] == [("step", "menu"), ("step", "dialog"), ("dialog", None)]
+    assert names[-1] == ("file", "stable")
+    assert all(event["elapsed_ms"] >= 0 for event in channel.events)
+
+
+def test_run_stream_emits_progress_then_done(backend, tmp_path):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from .. import mcp_server
+
+    output = tmp_path / "pump.ecmp"
+    with fastapi_testclient.TestClient(mcp_server.app) as client:
+        response = client.post("/run/stream", json={"action": "pack_ecmp", "args": {"out": str(output)}})
+        failed = client.post("/run/stream", json={"action": "open_project", "args": {"path": str(tmp_path / "x.emtp")}})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names[:2] == ["queued", "started"]
+    assert "dialog" in names and ("file", "stable") in [(name, data.get("state")) for name, data in events]
+    assert events[-1][0] == "done" and events[-1][1]["file"] == str(output)
+
+    failure = _parse_sse(failed.text)[-1]
+    assert failure[0] == "error" and failure[1]["code"] == "action_failed"
@@ -0,0 +1,76 @@
+"""Тести індексу проєктів і пошуку проєкту за назвою."""
+from __future__ import annotations
+
+import pytest
+
+from ..nlp import NLPError, parse_instruction
+from ..project_index import ProjectIndex, ProjectLookupError
+
+
+@pytest.fixture
+def roots(tmp_path):
+    root = tmp_path / "projects"
+    for relative in ("plant_a/pump.emtp", "plant_a/pump_station.emtp", "plant_b/boiler.ecmp", "plant_b/old/mixer.emtp"):
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 10)
+    (root / "plant_b" / "notes.txt").write_text("не проєкт", encoding="utf-8")
+    return root
+
+
+def test_resolve_exact_prefix_and_fuzzy(roots, tmp_path):
+    index = ProjectIndex([roots], tmp_path / "index.json")
+
+    assert index.resolve("pump").path == str(roots / "plant_a" / "pump.emtp")
+    assert index.resolve("Boiler.ecmp").name == "boiler.ecmp"
+    assert index.resolve("mix").name == "mixer.emtp"
+    assert index.resolve("boilr").name == "boiler.ecmp"
+    assert [entry.name for entry in index.search("pu")] == ["pump.emtp", "pump_station.emtp"]
+
+    with pytest.raises(ProjectLookupError) as excinfo:
+        index.resolve("valve")
+    assert "не знайдено" in str(excinfo.value)
+
+
+def test_ambiguous_name_lists_candidates(roots, tmp_path):
+    duplicate = roots / "plant_b" / "pump.ecmp"
+    duplicate.write_bytes(b"y")
+    index = ProjectIndex([roots])
+
+    with pytest.raises(ProjectLookupError) as excinfo:
+        index.resolve("pump")
+    assert len(excinfo.value.candidates) == 2
+
+
+def test_rescan_reads_only_changed_directories(roots, tmp_path):
+    store = tmp_path / "index.json"
+    index = ProjectIndex([roots], store)
+    first = index.refresh()
+    assert first["dirs_listed"] == 4 and first["projects"] == 4
+
+    assert index.refresh()["dirs_listed"] == 0
+    (roots / "plant_b" / "old" / "valve.emtp").write_bytes(b"v")
+    assert index.resolve("valve").name == "valve.emtp"
+    assert index.last_scan["dirs_listed"] == 1
+
+    reopened = ProjectIndex([roots], store)
+    assert reopened.refresh()["dirs_reused"] == 4
+    assert reopened.resolve("valve").name == "valve.emtp"
+
+
+def test_parser_resolves_bare_project_names():
+    resolved = {"pump": "D:/HMI/plant_a/pump.emtp"}
+
+    def _resolve(name):
+        if name not in resolved:
+            raise ProjectLookupError(f"Проєкт '{name}' не знайдено у PROJECT_ROOTS.")
+        return resolved[name]
+
+    action, params = parse_instruction("відкрий проєкт pump", resolve_project=_resolve)
+    assert (action, params["path"]) == ("open_project", "D:/HMI/plant_a/pump.emtp")
+    _, params = parse_instruction('Відкрий проєкт "D:/HMI/demo.emtp"', resolve_project=_resolve)
+    assert params["path"] == "D:/HMI/demo.emtp"
+    with pytest.raises(NLPError, match="не знайдено"):
+        parse_instruction("відкрий проєкт valve", resolve_project=_resolve)
+    with pytest.raises(NLPError):
+        parse_instruction("відкрий проєкт pump")
@@ -0,0 +1,136 @@
+"""Тести пріоритетів, дедлайнів і кооперативного скасування завдань."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from .. import ebpro_actions
+from ..cancellation import REASON_DEADLINE, CancelToken, JobCancelled, bind_token, checkpoint
+from ..jobs import JOB_CANCELLED, JOB_DONE, PRIORITY_BATCH, PRIORITY_INTERACTIVE, JobQueue, parse_priority
+from ..workers import FakeWorkerBackend, Worker, WorkerPool
+
+
+def _blocking_queue(seen):
+    """Черга, перше завдання якої тримає робочий потік до ``release``."""
+
+    release = threading.Event()
+
+    def runner(action, params):
+        if action == "hold":
+            release.wait(5)
+        seen.append(action)
+        return {}
+
+    return JobQueue(runner), release
+
+
+def test_interactive_jobs_overtake_batch_and_deadlines_break_ties():
+    seen = []
+    jobs, release = _blocking_queue(seen)
+    hold = jobs.submit("hold", {})
+    later = time.time() + 60
+    submitted = [
+        jobs.submit("build_late", {}, priority=PRIORITY_BATCH, deadline=later + 30),
+        jobs.submit("build_soon", {}, priority=PRIORITY_BATCH, deadline=later),
+        jobs.submit("screenshot", {}, priority=PRIORITY_INTERACTIVE),
+        jobs.submit("open", {}),
+    ]
+    release.set()
+    for job in [hold, *submitted]:
+        job.future.result(timeout=5)
+
+    assert seen == ["hold", "screenshot", "open", "build_soon", "build_late"]
+    assert parse_priority("batch") == PRIORITY_BATCH
+    with pytest.raises(ValueError):
+        parse_priority("urgent")
+    jobs.stop(timeout=5)
+
+
+def test_cancel_queued_job_completes_it_immediately():
+    seen = []
+    jobs, release = _blocking_queue(seen)
+    hold = jobs.submit("hold", {})
+    queued = jobs.submit("build_exob", {})
+
+    assert jobs.cancel(queued.id) is queued
+    with pytest.raises(JobCancelled):
+        queued.future.result(timeout=1)
+    assert queued.status == JOB_CANCELLED and queued.error["code"]
+    assert queued.to_dict()["cancel_requested"]
+
+    release.set()
+    hold.future.result(timeout=5)
+    assert jobs.cancel(hold.id) is hold and hold.status == JOB_DONE
+    assert seen == ["hold"]
+    jobs.stop(timeout=5)
+
+
+def test_running_job_stops_at_checkpoint():
+    started = threading.Event()
+
+    def runner(action, params):
+        started.set()
+        ebpro_actions.wait_until(lambda: False, timeout=5, description="збірка", max_interval=0.02)
+
+    jobs = JobQueue(runner)
+    job = jobs.submit("build_exob", {})
+    assert started.wait(5)
+    jobs.cancel(job.id)
+
+    with pytest.raises(JobCancelled):
+        job.future.result(timeout=2)
+    assert job.status == JOB_CANCELLED
+    jobs.stop(timeout=5)
+
+
+def test_deadline_expires_queued_and_running_jobs():
+    seen = []
+    jobs, release = _blocking_queue(seen)
+    hold = jobs.submit("hold", {}, deadline=time.time() + 0.1)
+    queued = jobs.submit("pack_ecmp", {}, deadline=time.time() + 0.1)
+
+    with pytest.raises(JobCancelled) as excinfo:
+        queued.future.result(timeout=2)
+    assert excinfo.value.reason == REASON_DEADLINE
+    release.set()
+    hold.future.result(timeout=5)  # дія без безпечних точок доходить до кінця
+    assert seen == ["hold"]
+
+    child = CancelToken(parent=CancelToken(deadline=time.time() - 1))
+    with bind_token(child), pytest.raises(JobCancelled):
+        checkpoint()
+    jobs.stop(timeout=5)
+
+
+def test_pool_cancels_pending_job_and_orders_by_priority():
+    pool = WorkerPool([Worker("w0", FakeWorkerBackend(latency=0.1))])
+    busy = pool.submit("open_project", {"path": "a.emtp"})
+    batch = pool.submit("build_exob", {}, priority=PRIORITY_BATCH)
+    shot = pool.submit("take_screenshot", {"out": "s.png"}, priority=PRIORITY_INTERACTIVE)
+    cancelled = pool.submit("pack_ecmp", {"out": "p.ecmp"})
+
+    assert pool.cancel(cancelled.id) is cancelled
+    for job in (busy, batch, shot):
+        job.future.result(timeout=5)
+
+    assert cancelled.status == JOB_CANCELLED
+    assert shot.started_at <= batch.started_at
+    pool.stop(timeout=5)
+
+
+def test_cancel_endpoint_reports_unknown_and_finished_jobs():
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from .. import mcp_server
+
+    done = mcp_server.JOB_QUEUE.submit("noop", {}, runner=lambda action, params: {})
+    done.future.result(timeout=5)
+    with fastapi_testclient.TestClient(mcp_server.app) as client:
+        missing = client.post("/jobs/unknown/cancel")
+        finished = client.post(f"/jobs/{done.id}/cancel")
+        invalid = client.post("/run", json={"action": "take_screenshot", "args": {"out": "a.png"}, "priority": "urgent"})
+
+    assert missing.status_code == 404
+    assert finished.status_code == 409 and finished.json()["detail"]["code"] == "job_finished"
+    assert invalid.status_code == 400 and invalid.json()["detail"]["code"] == "invalid_priority"
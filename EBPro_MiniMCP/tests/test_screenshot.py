@@ -0,0 +1,26 @@
+"""Юніт-тести для кодування скріншотів."""
+from __future__ import annotations
+
+import pytest
+
+from ..ebpro_actions import FriendlyError, encode_image, _normalize_format
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def test_format_is_taken_from_parameter_or_extension():
+    assert _normalize_format(None, "D:/shots/sim.JPG") == "jpg"
+    assert _normalize_format("webp", "D:/shots/sim.png") == "webp"
+    assert _normalize_format(None) == "png"
+    with pytest.raises(FriendlyError):
+        _normalize_format("bmp")
+
+
+def test_encode_image_in_memory():
+    image = Image.new("RGBA", (64, 32), (200, 10, 10, 255))
+
+    png = encode_image(image, "png", compress_level=9)
+    jpeg = encode_image(image, "jpeg", quality=40)
+
+    assert png.startswith(b"\x89PNG")
+    assert jpeg.startswith(b"\xff\xd8")
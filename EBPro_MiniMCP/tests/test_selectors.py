@@ -0,0 +1,155 @@
+"""Тести реєстру вивчених селекторів файлових діалогів."""
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from .. import ebpro_actions
+from ..ebpro_actions import OPEN_DIALOG, PywinautoBackend
+from ..locators import SelectorRegistry
+
+
+class FakeControl:
+    def __init__(self, dialog, criteria):
+        self.dialog = dialog
+        self.criteria = criteria
+
+    def _match(self):
+        for control in self.dialog.controls:
+            if control["control_type"] != self.criteria["control_type"]:
+                continue
+            if "auto_id" in self.criteria and control["auto_id"] != self.criteria["auto_id"]:
+                continue
+            if "title" in self.criteria and control["title"] != self.criteria["title"]:
+                continue
+            if "title_re" in self.criteria and not re.fullmatch(self.criteria["title_re"], control["title"]):
+                continue
+            return control
+        return None
+
+    def exists(self, timeout=None):
+        return self._match() is not None
+
+    def wrapper_object(self):
+        control = self._match()
+        return SimpleNamespace(
+            element_info=SimpleNamespace(automation_id=control["auto_id"]),
+            window_text=lambda: control["title"],
+        )
+
+    def set_edit_text(self, text):
+        self.dialog.typed = text
+
+    def click(self):
+        self.dialog.is_open = False
+
+
+class FakeDialog:
+    def __init__(self, title):
+        self.title = title
+        self.is_open = True
+        self.typed = None
+        self.keys = None
+        self.controls = [
+            {"control_type": "Edit", "auto_id": "search", "title": ""},
+            {"control_type": "Edit", "auto_id": "1148", "title": ""},
+            {"control_type": "Button", "auto_id": "1", "title": "Відкрити"},
+        ]
+
+
+class FakeSpec:
+    def __init__(self, app, criteria):
+        self.app = app
+        self.criteria = criteria
+
+    def _dialog(self):
+        dialog = self.app.dialog
+        if not dialog.is_open:
+            return None
+        if "title" in self.criteria and dialog.title != self.criteria["title"]:
+            return None
+        if "title_re" in self.criteria and not re.fullmatch(self.criteria["title_re"], dialog.title):
+            return None
+        return dialog
+
+    def exists(self, timeout=None):
+        self.app.lookups.append(self.criteria)
+        return self._dialog() is not None
+
+    def wrapper_object(self):
+        dialog = self._dialog()
+
+        def _type_keys(keys, with_spaces=False):
+            dialog.keys = keys
+            dialog.is_open = False
+
+        return SimpleNamespace(
+            is_visible=lambda: True,
+            is_enabled=lambda: True,
+            window_text=lambda: dialog.title,
+            type_keys=_type_keys,
+        )
+
+    def child_window(self, found_index=None, **criteria):
+        return FakeControl(self.app.dialog, criteria)
+
+
+class FakeApp:
+    def __init__(self):
+        self.dialog = FakeDialog("Відкрити")
+        self.lookups = []
+
+    def window(self, **criteria):
+        return FakeSpec(self, criteria)
+
+
+@pytest.fixture
+def dialog_backend(monkeypatch, tmp_path):
+    app = FakeApp()
+    registry = SelectorRegistry(tmp_path / "selectors.json")
+    monkeypatch.setattr(ebpro_actions, "_SELECTOR_REGISTRY", registry)
+    monkeypatch.setattr(ebpro_actions, "_CONFIG_CACHE", None)
+    backend = PywinautoBackend(session=SimpleNamespace(application=lambda: app))
+    yield backend, app, registry
+    ebpro_actions._CONFIG_CACHE = None
+
+
+def test_dialog_variant_is_learned_and_tried_first(dialog_backend, tmp_path):
+    backend, app, registry = dialog_backend
+
+    backend.fill_file_dialog(OPEN_DIALOG, Path("D:/HMI/pump.emtp"))
+    assert registry.variants("open") == [{"title": "Відкрити", "button": "Відкрити", "edit_auto_id": "1148"}]
+
+    app.dialog = FakeDialog("Відкрити")
+    app.dialog.controls.reverse()
+    app.lookups.clear()
+    backend.fill_file_dialog(OPEN_DIALOG, Path("D:/HMI/pump.emtp"))
+
+    assert app.lookups[0] == {"title": "Відкрити"}
+    assert app.dialog.typed == str(Path("D:/HMI/pump.emtp"))
+    assert SelectorRegistry(tmp_path / "selectors.json").variants("open")[0]["edit_auto_id"] == "1148"
+
+
+def test_keyboard_fast_path_escapes_special_characters(dialog_backend, monkeypatch):
+    backend, app, _ = dialog_backend
+    monkeypatch.setenv("EBPRO_MCP_DIALOG_KEYBOARD_INPUT", "true")
+
+    backend.fill_file_dialog(OPEN_DIALOG, Path("D:/HMI/pump (v2)+.emtp"))
+
+    assert app.dialog.keys.endswith("pump {(}v2{)}{+}.emtp{ENTER}")
+    assert app.dialog.typed is None
+
+
+def test_registry_keeps_fallback_variants_in_mru_order(tmp_path):
+    registry = SelectorRegistry(tmp_path / "selectors.json", max_variants=2)
+    registry.learn("save", title="Save As", button="Save")
+    registry.learn("save", title="Зберегти як", button="Зберегти")
+    registry.learn("save", title="Save As")
+    registry.learn("save", title="Speichern unter", button="Speichern")
+
+    titles = [variant["title"] for variant in registry.variants("save")]
+    assert titles == ["Speichern unter", "Save As"]
+    assert registry.variants("save")[1]["button"] == "Save"
@@ -0,0 +1,34 @@
+"""Юніт-тести для кешу сесії EBPro."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from ..ebpro_actions import EBProSession
+
+
+class _FakeApp:
+    def __init__(self):
+        self.running = True
+
+    def is_process_running(self):
+        return self.running
+
+
+def test_cached_application_is_reused_while_process_alive():
+    session = EBProSession()
+    app = _FakeApp()
+    session.remember_application(app, Path("C:/EBPro/EBPro.exe"))
+
+    assert session.cached_application(Path("C:/EBPro/EBPro.exe")) is app
+    assert session.cached_application(Path("D:/Other/EBPro.exe")) is None
+
+
+def test_dead_process_invalidates_session():
+    session = EBProSession()
+    app = _FakeApp()
+    session.remember_application(app, Path("C:/EBPro/EBPro.exe"))
+
+    app.running = False
+    assert session.cached_application(Path("C:/EBPro/EBPro.exe")) is None
+    app.running = True
+    assert session.cached_application(Path("C:/EBPro/EBPro.exe")) is None
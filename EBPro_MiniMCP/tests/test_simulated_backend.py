@@ -0,0 +1,42 @@
+"""Тести дій ebpro_actions на симульованому бекенді."""
+from __future__ import annotations
+
+import pytest
+
+from .. import ebpro_actions
+from ..ebpro_actions import FriendlyError, build_exob, open_project, pack_ecmp, run_offline_sim
+
+
+def test_full_pipeline_runs_without_windows(backend, tmp_path):
+    project = tmp_path / "pump.emtp"
+    project.write_bytes(b"project")
+
+    open_project(str(project))
+    artifact = build_exob()
+    run_offline_sim()
+    packed = pack_ecmp(str(tmp_path / "out" / "pump.ecmp"))
+
+    assert backend.project == project
+    assert artifact == str(project.with_suffix(".exob"))
+    assert "menu:Tools->Offline Simulation" in backend.calls
+    assert (tmp_path / "out" / "pump.ecmp").read_bytes().startswith(b"ECMP")
+    assert packed.endswith("pump.ecmp")
+
+
+def test_second_build_of_unchanged_project_hits_cache(backend, tmp_path):
+    project = tmp_path / "pump.emtp"
+    project.write_bytes(b"project")
+    open_project(str(project))
+
+    build_exob()
+    builds = backend.calls.count("menu:Build->Build")
+    build_exob()
+
+    assert backend.calls.count("menu:Build->Build") == builds
+    assert ebpro_actions.get_build_cache().stats()["hits"] == 1
+
+
+def test_failure_injection(backend):
+    backend.fail_rate = 1.0
+    with pytest.raises(FriendlyError):
+        run_offline_sim()
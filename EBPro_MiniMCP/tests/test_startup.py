@@ -0,0 +1,47 @@
+"""Тести лінивих імпортів і прогріву сервісу (/ready)."""
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from .. import ebpro_actions
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_server_import_does_not_load_gui_dependencies():
+    code = (
+        "import sys, EBPro_MiniMCP.mcp_server; "
+        "print(','.join(name for name in ('PIL', 'pywinauto', 'comtypes') if name in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+    assert output == ""
+
+
+def test_ready_reports_warm_up_on_simulated_backend(use_backend):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from .. import mcp_server
+
+    use_backend(None, WARMUP_ON_START=1, AUTOMATION_BACKEND="simulated")
+    try:
+        with fastapi_testclient.TestClient(mcp_server.app) as client:
+            deadline = time.monotonic() + 5
+            response = client.get("/ready")
+            while response.status_code == 503 and time.monotonic() < deadline:
+                assert response.json()["detail"]["code"] == "warming_up"
+                time.sleep(0.01)
+                response = client.get("/ready")
+            assert client.get("/health").json() == {"status": "ok"}
+
+        assert response.status_code == 200
+        assert set(response.json()["warm_up_ms"]) == {"imports", "run_ebpro", "main_window"}
+        assert ebpro_actions.get_backend().running
+    finally:
+        mcp_server.READINESS.update(state="ready", timings=None, error=None)
@@ -0,0 +1,109 @@
+"""Тести порівняння знімків з еталонами (візуальна регресія)."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from ..visual_diff import (
+    PRECHECK_DIFFERENT,
+    PRECHECK_FULL,
+    PRECHECK_IDENTICAL,
+    PRECHECK_SIZE,
+    DiffOptions,
+    compare_directory,
+    compare_images,
+)
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+
+def _screen(clock: str = "12:30", alarm: bool = False):
+    image = Image.new("RGB", (320, 200), (0, 96, 160))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((20, 40, 140, 90), fill=(220, 220, 220))
+    draw.text((250, 8), clock, fill=(255, 255, 255))
+    if alarm:
+        draw.rectangle((200, 120, 229, 139), fill=(255, 0, 0))
+    return image
+
+
+def test_identical_changed_and_masked_regions():
+    baseline = _screen()
+
+    assert compare_images(_screen(), baseline).precheck == PRECHECK_IDENTICAL
+
+    result = compare_images(_screen(clock="12:31", alarm=True), baseline)
+    assert not result.passed and result.precheck == PRECHECK_FULL
+    assert [200, 120, 30, 20] in result.boxes
+    assert any(box[0] >= 250 and box[1] < 30 for box in result.boxes)
+    assert result.changed_pixels > 600
+
+    masked = compare_images(_screen(clock="12:31", alarm=True), baseline, DiffOptions(masks=[[240, 0, 80, 30]]))
+    assert masked.boxes == [[200, 120, 30, 20]]
+    assert compare_images(_screen(clock="12:31"), baseline, DiffOptions(masks=[[240, 0, 80, 30]])).passed
+
+
+def test_tolerance_ratio_and_quick_rejection():
+    baseline = np.full((200, 320, 3), 100, dtype=np.uint8)
+    noisy = baseline.copy()
+    noisy[::2, ::2] += 5
+
+    assert not compare_images(noisy, baseline, DiffOptions(tolerance=0)).passed
+    assert compare_images(noisy, baseline, DiffOptions(tolerance=8)).passed
+    assert compare_images(noisy, baseline, DiffOptions(tolerance=0, max_ratio=0.3)).passed
+
+    other = np.asarray(Image.new("RGB", (320, 200), (255, 255, 255)))
+    other = other.copy()
+    other[:, :160] = 0
+    rejected = compare_images(other, np.asarray(_screen()))
+    assert rejected.precheck == PRECHECK_DIFFERENT and rejected.changed_ratio > 0.5
+    assert rejected.boxes == [[0, 0, 320, 200]]
+
+    resized = compare_images(Image.new("RGB", (160, 100)), baseline)
+    assert resized.precheck == PRECHECK_SIZE and not resized.passed
+
+
+def test_directory_is_compared_in_worker_processes(tmp_path):
+    captures, baselines = tmp_path / "captures", tmp_path / "baselines"
+    (captures / "main").mkdir(parents=True)
+    (baselines / "main").mkdir(parents=True)
+    for name in ("home", "alarm", "trend"):
+        _screen().save(baselines / "main" / f"{name}.png")
+    _screen().save(captures / "main" / "home.png")
+    _screen(alarm=True).save(captures / "main" / "alarm.png")
+    _screen(clock="23:59").save(captures / "main" / "trend.png")
+    _screen().save(captures / "main" / "new.png")
+    # Маска поруч з еталоном: годинник на екрані трендів не порівнюється.
+    (baselines / "main" / "trend.png.mask.json").write_text(json.dumps([[240, 0, 80, 30]]), encoding="utf-8")
+
+    report = compare_directory(captures, baselines, DiffOptions(), workers=2)
+
+    assert (report["total"], report["passed"], report["failed"]) == (3, 2, 1)
+    assert report["missing"] == [str(captures / "main" / "new.png")]
+    failed = [result for result in report["results"] if not result["passed"]]
+    assert failed[0]["capture"].endswith("alarm.png") and failed[0]["boxes"] == [[200, 120, 30, 20]]
+
+
+def test_run_compares_capture_with_baseline_in_memory(use_backend, tmp_path):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from .. import mcp_server
+
+    use_backend(BASELINE_DIR=tmp_path)
+    with fastapi_testclient.TestClient(mcp_server.app) as client:
+        client.post("/run", json={"action": "run_offline_sim"})
+        client.post("/run", json={"action": "take_screenshot", "args": {"out": str(tmp_path / "golden.png")}})
+        # Кожен кадр симулятора світліший за попередній на 16 у червоному каналі.
+        close = client.post(
+            "/run", json={"action": "take_screenshot", "args": {"baseline": "golden.png", "tolerance": 16}}
+        )
+        strict = client.post("/screenshot", json={"baseline": "golden.png", "tolerance": 0})
+        batch = client.post("/screenshot/compare", json={"captures": str(tmp_path / "none")})
+
+    assert close.status_code == 200, close.text
+    assert close.json()["diff"]["passed"] and close.json()["notes"] == "Знімок збігається з еталоном."
+    assert strict.status_code == 200
+    assert strict.headers["X-Diff-Passed"] == "false" and float(strict.headers["X-Diff-Ratio"]) == 1.0
+    assert batch.status_code >= 400 and "не знайдено" in batch.json()["detail"]["message"]
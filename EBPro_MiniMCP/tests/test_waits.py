@@ -0,0 +1,59 @@
+"""Юніт-тести для шару очікувань ebpro_actions."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from ..ebpro_actions import (
+    EBProConfig,
+    WaitTimeoutError,
+    _coerce_config_values,
+    wait_for_file,
+    wait_until,
+)
+
+
+def test_wait_until_returns_as_soon_as_condition_holds():
+    calls = {"count": 0}
+
+    def condition():
+        calls["count"] += 1
+        return "ready" if calls["count"] >= 3 else None
+
+    result = wait_until(condition, timeout=5, description="тест", max_interval=0.01)
+    assert result.value == "ready"
+    assert result.attempts == 3
+    assert result.elapsed < 1
+
+
+def test_wait_until_raises_after_upper_bound():
+    started = time.monotonic()
+    with pytest.raises(WaitTimeoutError):
+        wait_until(lambda: False, timeout=0.2, description="ніколи", max_interval=0.05)
+    assert time.monotonic() - started < 1
+
+
+def test_wait_for_file_requires_stable_size(tmp_path):
+    target = tmp_path / "project.ecmp"
+    target.write_bytes(b"data")
+
+    result = wait_for_file(target, timeout=5, stable_for=0.1)
+    assert result.value == target
+    assert result.attempts > 1
+
+
+def test_config_values_from_environment_are_coerced():
+    data = {
+        "EBPRO_DIR": "C:/EBPro",
+        "EBPRO_EXE": "EBPro.exe",
+        "UTILITY_MANAGER_EXE": "UtilityManager.exe",
+        "SIMULATOR_WINDOW_TITLE": "EasySimulator",
+        "EBPRO_WINDOW_TITLE": "EasyBuilder Pro",
+        "API_TOKEN": "",
+        "AUTOHOTKEY_EXE": "AutoHotkey.exe",
+        "DIALOG_TIMEOUT": "2.5",
+    }
+    config = EBProConfig(**_coerce_config_values(data))
+    assert config.DIALOG_TIMEOUT == 2.5
+    assert config.SIMULATOR_TIMEOUT == 30.0
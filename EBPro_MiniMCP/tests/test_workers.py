@@ -0,0 +1,167 @@
+"""Юніт-тести для пулу воркерів на фейкових бекендах."""
+from __future__ import annotations
+
+import pytest
+
+from ..ebpro_actions import FriendlyError
+from ..jobs import JOB_FAILED, JobQueue
+from ..workers import (
+    AgentWorkerBackend,
+    FakeWorkerBackend,
+    LocalWorkerBackend,
+    Worker,
+    WorkerBackend,
+    WorkerPool,
+    create_pool,
+)
+
+
+def _pool(*backends, **kwargs):
+    workers = [Worker(f"w{index}", backend) for index, backend in enumerate(backends)]
+    return WorkerPool(workers, **kwargs)
+
+
+def test_jobs_are_spread_across_idle_workers():
+    first, second = FakeWorkerBackend(latency=0.05), FakeWorkerBackend(latency=0.05)
+    pool = _pool(first, second)
+
+    jobs = [pool.submit("take_screenshot", {"out": f"{index}.png"}) for index in range(4)]
+    for job in jobs:
+        job.future.result(timeout=5)
+
+    assert first.calls and second.calls
+    assert {job.worker for job in jobs} == {"w0", "w1"}
+    pool.stop(timeout=5)
+
+
+def test_project_stays_on_worker_that_opened_it():
+    pool = _pool(FakeWorkerBackend(), FakeWorkerBackend())
+    opened = pool.submit("open_project", {"path": "D:/HMI/pump.emtp"})
+    opened.future.result(timeout=5)
+
+    again = [pool.submit("open_project", {"path": "D:/HMI/pump.emtp"}) for _ in range(3)]
+    for job in again:
+        job.future.result(timeout=5)
+
+    assert {job.worker for job in again} == {opened.worker}
+    pool.stop(timeout=5)
+
+
+def test_follow_up_actions_run_where_project_was_opened():
+    pool = _pool(FakeWorkerBackend(), FakeWorkerBackend())
+    opened = pool.submit("open_project", {"path": "D:/HMI/pump.emtp"})
+    opened.future.result(timeout=5)
+
+    follow_up = [pool.submit("build_exob", {}), pool.submit("pack_ecmp", {"out": "D:/export/pump.ecmp"})]
+    for job in follow_up:
+        job.future.result(timeout=5)
+
+    assert [job.worker for job in follow_up] == [opened.worker] * 2
+    pool.stop(timeout=5)
+
+
+def test_sessions_keep_their_own_workers():
+    pool = _pool(FakeWorkerBackend(), FakeWorkerBackend())
+    pump = pool.submit("open_project", {"path": "D:/HMI/pump.emtp"}, session="a")
+    pump.future.result(timeout=5)
+    tank = pool.submit("open_project", {"path": "D:/HMI/tank.emtp"}, session="b")
+    tank.future.result(timeout=5)
+    assert pump.worker != tank.worker
+
+    builds = {session: pool.submit("build_exob", {}, session=session) for session in ("a", "b")}
+    for job in builds.values():
+        job.future.result(timeout=5)
+
+    assert (builds["a"].worker, builds["b"].worker) == (pump.worker, tank.worker)
+    pool.stop(timeout=5)
+
+
+def test_crashed_worker_is_restarted_and_job_retried_elsewhere():
+    flaky, healthy = FakeWorkerBackend(crash_after=0), FakeWorkerBackend(latency=0.05)
+    pool = _pool(flaky, healthy)
+
+    job = pool.submit("build_exob", {})
+    assert job.future.result(timeout=5)["notes"]
+    assert job.worker == "w1"
+    assert job.attempts == 2
+    assert flaky.restarts >= 1
+    pool.stop(timeout=5)
+
+
+def test_action_error_fails_job_but_keeps_worker():
+    backend = FakeWorkerBackend(fail_rate=1.0)
+    pool = _pool(backend)
+
+    job = pool.submit("build_exob", {})
+    with pytest.raises(FriendlyError):
+        job.future.result(timeout=5)
+    assert job.status == JOB_FAILED
+    assert pool.workers()[0]["state"] == "idle"
+    assert backend.restarts == 0
+    pool.stop(timeout=5)
+
+
+def test_in_memory_screenshot_is_dispatched_through_pool(backend, monkeypatch):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    pytest.importorskip("PIL")
+    from .. import mcp_server
+
+    pool = _pool(LocalWorkerBackend(mcp_server.JOB_QUEUE))
+    monkeypatch.setattr(mcp_server, "DISPATCHER", pool)
+    with fastapi_testclient.TestClient(mcp_server.app) as client:
+        client.post("/run", json={"action": "run_offline_sim"})
+        response = client.post("/screenshot", json={})
+
+    assert response.status_code == 200 and response.content.startswith(b"\x89PNG")
+    assert [job.worker for job in pool.list() if job.action == "take_screenshot"] == ["w0"]
+
+
+def test_in_memory_screenshot_through_fake_pool(monkeypatch):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from .. import mcp_server
+
+    monkeypatch.setattr(mcp_server, "DISPATCHER", _pool(FakeWorkerBackend()))
+    with fastapi_testclient.TestClient(mcp_server.app) as client:
+        response = client.post("/screenshot", json={})
+
+    assert response.status_code == 200, response.text
+    assert response.content.startswith(b"\x89PNG") and response.headers["X-Image-Width"] == "4"
+
+
+def test_backend_without_image_reports_friendly_error(monkeypatch):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from .. import mcp_server
+
+    class Blind(WorkerBackend):
+        def run(self, action, params, runner=None):
+            return {"file": None, "notes": ""}
+
+    monkeypatch.setattr(mcp_server, "DISPATCHER", _pool(Blind()))
+    with fastapi_testclient.TestClient(mcp_server.app) as client:
+        response = client.post("/screenshot", json={})
+
+    assert response.status_code >= 400 and "не повернув зображення" in response.json()["detail"]["message"]
+
+
+def test_agent_hands_remote_frame_to_runner(monkeypatch):
+    agent = AgentWorkerBackend("http://station:8000")
+    headers = {"Content-Type": "image/png", "X-Image-Width": "4", "X-Image-Height": "3"}
+    monkeypatch.setattr(agent, "_request", lambda path, payload: (b"\x89PNG", headers))
+
+    result = agent.run("take_screenshot", {"format": "png"}, runner=lambda _action, options: vars(options["image"]))
+
+    assert result == {"content": b"\x89PNG", "media_type": "image/png", "width": 4, "height": 3, "diff": None}
+
+
+def test_agent_result_keeps_build_summary(monkeypatch):
+    agent = AgentWorkerBackend("http://station:8000")
+    build = {"ok": True, "artifact": "D:/HMI/pump.exob", "errors": [], "warnings": ["Warning: unused tag"]}
+    response = {"ok": True, "action": "build_exob", "job_id": "j1", "file": build["artifact"], "notes": "", "build": build}
+    monkeypatch.setattr(agent, "_post", lambda path, payload: dict(response))
+
+    assert agent.run("build_exob", {}) == {"file": "D:/HMI/pump.exob", "notes": "", "build": build}
+
+
+def test_pool_rejects_more_than_one_local_worker():
+    with pytest.raises(FriendlyError, match="local"):
+        create_pool([{"kind": "local"}, {"id": "second", "kind": "local"}], JobQueue(lambda action, params: {}))
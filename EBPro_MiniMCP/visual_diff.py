@@ -0,0 +1,453 @@
+"""Візуальна регресія: порівняння знімків симулятора з еталонними зображеннями.
+
+Різниця рахується векторно (NumPy) над буфером знімка в пам'яті, без
+проміжного файлу. Перед повним порівнянням виконуються дешеві перевірки:
+побайтова рівність (більшість нічних порівнянь) і перцептивний хеш (pHash)
+зменшених копій — якщо кадри зовсім різні, повна різниця не рахується.
+Змінені пікселі групуються у прямокутники через сітку блоків, а каталог
+знімків порівнюється паралельно в кількох процесах.
+
+Запуск з кореня репозиторію::
+
+    python -m EBPro_MiniMCP.visual_diff captures/ baselines/ --mask 0,0,200,30 --report diff.json
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .ebpro_actions import FriendlyError, _optional_module
+
+LOGGER = logging.getLogger("ebpro.visual_diff")
+
+# Область [x, y, ширина, висота] у пікселях знімка.
+Region = List[int]
+
+PRECHECK_IDENTICAL = "identical"
+PRECHECK_DIFFERENT = "different"
+PRECHECK_SIZE = "size_mismatch"
+PRECHECK_FULL = "full"
+
+HASH_SIZE = 32
+# Крок проріджування для попередньої перевірки та частка змінених пікселів проріджених
+# копій, з якої кадри перевіряються на "зовсім інший екран".
+THUMB_STEP = 8
+DIFFERENT_SHARE = 0.5
+BASELINE_CACHE_SIZE = 32
+MASK_SUFFIX = ".mask.json"
+
+
+@dataclass
+class DiffOptions:
+    """Параметри порівняння.
+
+    ``tolerance`` — на скільки (0–255) може відрізнятися канал пікселя, щоб
+    піксель вважався незмінним; ``max_ratio`` — допустима частка змінених
+    пікселів; ``phash_distance`` — відстань Геммінга pHash (з 64 біт), від якої
+    кадри вважаються зовсім різними без повного порівняння (0 — вимкнено).
+    """
+
+    tolerance: int = 8
+    max_ratio: float = 0.0
+    masks: List[Region] = field(default_factory=list)
+    phash_distance: int = 20
+    block: int = 16
+    max_boxes: int = 32
+
+
+@dataclass
+class DiffResult:
+    """Підсумок порівняння знімка з еталоном."""
+
+    passed: bool
+    changed_ratio: float
+    changed_pixels: int
+    boxes: List[Region]
+    precheck: str
+    size: Tuple[int, int]
+    phash_distance: Optional[int] = None
+    baseline: Optional[str] = None
+    capture: Optional[str] = None
+    duration_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "passed": self.passed,
+            "changed_ratio": round(self.changed_ratio, 6),
+            "changed_pixels": self.changed_pixels,
+            "boxes": self.boxes,
+            "precheck": self.precheck,
+            "size": list(self.size),
+            "phash_distance": self.phash_distance,
+            "baseline": self.baseline,
+            "capture": self.capture,
+            "duration_ms": self.duration_ms,
+        }
+
+
+def _numpy() -> Any:
+    np = _optional_module("numpy")
+    if np is None:
+        raise FriendlyError(
+            "NumPy недоступна для порівняння знімків.",
+            "Встановіть numpy: pip install numpy.",
+        )
+    return np
+
+
+def _rgb(image: Any) -> Any:
+    """Масив HxWx3 uint8 з PIL-зображення (масив повертається як є)."""
+
+    np = _numpy()
+    if isinstance(image, np.ndarray):
+        return image
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return np.asarray(image)
+
+
+@functools.lru_cache(maxsize=4)
+def _dct_matrix(size: int) -> Any:
+    np = _numpy()
+    index = np.arange(size)
+    matrix = np.cos(np.pi * (2 * index[None, :] + 1) * index[:, None] / (2 * size))
+    matrix[0] /= np.sqrt(2)
+    return matrix * np.sqrt(2 / size)
+
+
+def perceptual_hash(pixels: Any, masks: Sequence[Region] = ()) -> int:
+    """64-бітний pHash: DCT зменшеної до 32x32 сірої копії, біти низьких частот.
+
+    Замасковані області зафарбовуються однаково для обох кадрів, тож не
+    впливають на відстань між хешами.
+    """
+
+    np = _numpy()
+    Image = _optional_module("PIL.Image")  # noqa: N806
+    height, width = pixels.shape[:2]
+    gray = np.asarray(
+        Image.fromarray(pixels).convert("L").resize((HASH_SIZE, HASH_SIZE), Image.BILINEAR), dtype=np.float64
+    )
+    for x, y, w, h in masks:
+        top, left = y * HASH_SIZE // height, x * HASH_SIZE // width
+        bottom, right = -(-(y + h) * HASH_SIZE // height), -(-(x + w) * HASH_SIZE // width)
+        gray[top:bottom, left:right] = 0.0
+    dct = _dct_matrix(HASH_SIZE)
+    low = (dct @ gray @ dct.T)[:8, :8].ravel()
+    bits = low > np.median(low[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def hash_distance(first: int, second: int) -> int:
+    return bin(first ^ second).count("1")
+
+
+def _valid_mask(shape: Tuple[int, int], masks: Sequence[Region]) -> Any:
+    """Булева маска пікселів, що порівнюються (None — без масок)."""
+
+    if not masks:
+        return None
+    np = _numpy()
+    valid = np.ones(shape, dtype=bool)
+    for x, y, w, h in masks:
+        valid[max(y, 0) : max(y + h, 0), max(x, 0) : max(x + w, 0)] = False
+    return valid
+
+
+def changed_boxes(changed: Any, block: int = 16, max_boxes: int = 32) -> List[Region]:
+    """Прямокутники змінених областей: зв'язні блоки сітки з точними межами пікселів.
+
+    Маска зменшується до сітки ``block``x``block`` одним векторним проходом,
+    тож зв'язні компоненти шукаються серед тисяч клітинок, а не мільйонів пікселів.
+    """
+
+    np = _numpy()
+    height, width = changed.shape
+    rows, cols = -(-height // block), -(-width // block)
+    padded = changed
+    if (rows * block, cols * block) != (height, width):
+        padded = np.zeros((rows * block, cols * block), dtype=bool)
+        padded[:height, :width] = changed
+    grid = padded.reshape(rows, block, cols, block).any(axis=(1, 3))
+
+    pending = set(zip(*(axis.tolist() for axis in np.nonzero(grid))))
+    boxes: List[Tuple[int, Region]] = []
+    while pending:
+        stack = [pending.pop()]
+        top = bottom = stack[0][0]
+        left = right = stack[0][1]
+        while stack:
+            row, col = stack.pop()
+            top, bottom = min(top, row), max(bottom, row)
+            left, right = min(left, col), max(right, col)
+            for d_row in (-1, 0, 1):
+                for d_col in (-1, 0, 1):
+                    neighbour = (row + d_row, col + d_col)
+                    if neighbour in pending:
+                        pending.remove(neighbour)
+                        stack.append(neighbour)
+        y0, x0 = top * block, left * block
+        area = changed[y0 : (bottom + 1) * block, x0 : (right + 1) * block]
+        ys = np.flatnonzero(area.any(axis=1))
+        xs = np.flatnonzero(area.any(axis=0))
+        box = [int(x0 + xs[0]), int(y0 + ys[0]), int(xs[-1] - xs[0] + 1), int(ys[-1] - ys[0] + 1)]
+        boxes.append((box[2] * box[3], box))
+    boxes.sort(key=lambda item: (-item[0], item[1][1], item[1][0]))
+    return [box for _, box in boxes[:max_boxes]]
+
+
+def _channel_delta(np: Any, first: Any, second: Any) -> Any:
+    """Найбільша за каналами різниця |a - b| (HxW, uint8).
+
+    Рахується у uint8 без переходу до ширшого типу; канали зводяться попарним
+    ``maximum`` — це в рази швидше за ``max(axis=2)`` по осі довжиною 3.
+    """
+
+    delta = np.maximum(first, second)
+    delta -= np.minimum(first, second)
+    return np.maximum(np.maximum(delta[..., 0], delta[..., 1]), delta[..., 2])
+
+
+def compare_images(actual: Any, baseline: Any, options: Optional[DiffOptions] = None) -> DiffResult:
+    """Порівнює знімок з еталоном (PIL-зображення або масиви HxWx3)."""
+
+    np = _numpy()
+    options = options or DiffOptions()
+    started = time.perf_counter()
+    first, second = _rgb(actual), _rgb(baseline)
+    height, width = first.shape[:2]
+
+    def _result(
+        passed: bool, ratio: float, pixels: int, boxes: List[Region], precheck: str, distance: Optional[int] = None
+    ) -> DiffResult:
+        return DiffResult(
+            passed=passed,
+            changed_ratio=ratio,
+            changed_pixels=pixels,
+            boxes=boxes,
+            precheck=precheck,
+            size=(width, height),
+            phash_distance=distance,
+            duration_ms=round((time.perf_counter() - started) * 1000.0, 3),
+        )
+
+    if first.shape != second.shape:
+        return _result(False, 1.0, width * height, [[0, 0, width, height]], PRECHECK_SIZE)
+    if np.array_equal(first, second):
+        return _result(True, 0.0, 0, [], PRECHECK_IDENTICAL, 0)
+
+    valid = _valid_mask((height, width), options.masks)
+    total = int(valid.sum()) if valid is not None else width * height
+    distance: Optional[int] = None
+    if options.phash_distance > 0:
+        # Попередня перевірка на кожному 8-му пікселі: якщо змінилась більша частина
+        # кадру і pHash підтверджує іншу картинку, повна різниця нічого не додасть.
+        thumbs = first[::THUMB_STEP, ::THUMB_STEP], second[::THUMB_STEP, ::THUMB_STEP]
+        sample = _channel_delta(np, *thumbs) > options.tolerance
+        sampled = sample.size
+        if valid is not None:
+            sample &= valid[::THUMB_STEP, ::THUMB_STEP]
+            sampled = int(valid[::THUMB_STEP, ::THUMB_STEP].sum())
+        estimate = float(np.count_nonzero(sample)) / sampled if sampled else 0.0
+        if estimate >= DIFFERENT_SHARE:
+            masks = [
+                [x // THUMB_STEP, y // THUMB_STEP, -(-w // THUMB_STEP), -(-h // THUMB_STEP)]
+                for x, y, w, h in options.masks
+            ]
+            distance = hash_distance(perceptual_hash(thumbs[0], masks), perceptual_hash(thumbs[1], masks))
+            if distance >= options.phash_distance:
+                return _result(False, estimate, int(estimate * total), [[0, 0, width, height]], PRECHECK_DIFFERENT, distance)
+
+    changed = _channel_delta(np, first, second) > options.tolerance
+    if valid is not None:
+        changed &= valid
+    pixels = int(np.count_nonzero(changed))
+    ratio = pixels / total if total else 0.0
+    boxes = changed_boxes(changed, options.block, options.max_boxes) if pixels else []
+    return _result(ratio <= options.max_ratio, ratio, pixels, boxes, PRECHECK_FULL, distance)
+
+
+def _read_masks(path: Path) -> List[Region]:
+    try:
+        with path.open("r", encoding="utf-8") as fp:
+            return [list(map(int, region)) for region in json.load(fp)]
+    except FileNotFoundError:
+        return []
+    except Exception:
+        LOGGER.warning("Маски %s пошкоджено, порівнюємо без них.", path)
+        return []
+
+
+@functools.lru_cache(maxsize=BASELINE_CACHE_SIZE)
+def _decoded_baseline(path: str, mtime_ns: int, size: int) -> Tuple[Any, List[Region]]:
+    """Декодований еталон і маски з ``<еталон>.mask.json``; ключ кешу включає mtime."""
+
+    Image = _optional_module("PIL.Image")  # noqa: N806
+    with Image.open(path) as image:
+        pixels = _rgb(image.convert("RGB"))
+    pixels.setflags(write=False)
+    return pixels, _read_masks(Path(path + MASK_SUFFIX))
+
+
+def load_baseline(path: Path) -> Tuple[Any, List[Region]]:
+    """Еталон як масив і його власні маски; повторні читання беруться з кешу."""
+
+    try:
+        stat = Path(path).stat()
+    except OSError as exc:
+        raise FriendlyError(
+            f"Еталон {path} не знайдено.",
+            "Перевірте шлях baseline або BASELINE_DIR у config.json.",
+        ) from exc
+    return _decoded_baseline(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def compare_to_baseline(actual: Any, baseline_path: Path, options: Optional[DiffOptions] = None) -> DiffResult:
+    """Порівнює знімок у пам'яті з еталоном з диска (з урахуванням його масок)."""
+
+    options = options or DiffOptions()
+    pixels, own_masks = load_baseline(baseline_path)
+    if own_masks:
+        options = replace(options, masks=list(options.masks) + own_masks)
+    result = compare_images(actual, pixels, options)
+    result.baseline = str(baseline_path)
+    return result
+
+
+def _compare_files(capture: str, baseline: str, options: DiffOptions) -> DiffResult:
+    """Одна пара файлів (виконується у процесі пулу)."""
+
+    Image = _optional_module("PIL.Image")  # noqa: N806
+    with Image.open(capture) as image:
+        result = compare_to_baseline(image.convert("RGB"), Path(baseline), options)
+    result.capture = capture
+    return result
+
+
+def compare_directory(
+    captures: Path,
+    baselines: Path,
+    options: Optional[DiffOptions] = None,
+    pattern: str = "*.png",
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Порівнює кожен знімок каталогу ``captures`` з однойменним еталоном у ``baselines``.
+
+    Пари розподіляються між ``workers`` процесами (типово — за кількістю ядер).
+    """
+
+    captures, baselines = Path(captures), Path(baselines)
+    for directory in (captures, baselines):
+        if not directory.is_dir():
+            raise FriendlyError(f"Каталог {directory} не знайдено.", "Вкажіть існуючі каталоги знімків та еталонів.")
+    options = options or DiffOptions()
+    started = time.perf_counter()
+    pairs: List[Tuple[str, str]] = []
+    missing: List[str] = []
+    for capture in sorted(captures.rglob(pattern)):
+        baseline = baselines / capture.relative_to(captures)
+        if baseline.is_file():
+            pairs.append((str(capture), str(baseline)))
+        else:
+            missing.append(str(capture))
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(pairs) < 2:
+        results = [_compare_files(capture, baseline, options) for capture, baseline in pairs]
+    else:
+        workers = min(workers, len(pairs))
+        chunksize = max(1, len(pairs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_compare_files, *zip(*pairs), repeat(options), chunksize=chunksize))
+
+    failed = [result for result in results if not result.passed]
+    summary = {
+        "total": len(pairs),
+        "passed": len(results) - len(failed),
+        "failed": len(failed),
+        "missing": missing,
+        "workers": workers,
+        "duration_ms": round((time.perf_counter() - started) * 1000.0, 1),
+        "results": [result.to_dict() for result in results],
+    }
+    LOGGER.info(
+        "Порівняно %s знімків за %.1f мс: не пройшли %s, без еталона %s.",
+        summary["total"],
+        summary["duration_ms"],
+        summary["failed"],
+        len(missing),
+    )
+    return summary
+
+
+def _region(text: str) -> Region:
+    values = [int(value) for value in text.split(",")]
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("маска має вигляд x,y,ширина,висота")
+    return values
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Порівняння каталогу знімків з еталонами")
+    parser.add_argument("captures", type=Path)
+    parser.add_argument("baselines", type=Path)
+    parser.add_argument("--pattern", default="*.png")
+    parser.add_argument("--tolerance", type=int, default=DiffOptions.tolerance)
+    parser.add_argument("--max-ratio", type=float, default=DiffOptions.max_ratio)
+    parser.add_argument("--phash-distance", type=int, default=DiffOptions.phash_distance)
+    parser.add_argument("--mask", type=_region, action="append", default=[], help="x,y,ширина,висота")
+    parser.add_argument("--workers", type=int, default=0, help="процеси (0 — за кількістю ядер)")
+    parser.add_argument("--report", type=Path, help="зберегти повний звіт у JSON")
+    args = parser.parse_args(argv)
+
+    options = DiffOptions(
+        tolerance=args.tolerance, max_ratio=args.max_ratio, masks=args.mask, phash_distance=args.phash_distance
+    )
+    try:
+        summary = compare_directory(args.captures, args.baselines, options, args.pattern, args.workers or None)
+    except FriendlyError as exc:
+        print(f"{exc} {exc.hint}", file=sys.stderr)
+        return 2
+    for result in summary["results"]:
+        if not result["passed"]:
+            print(f"FAIL {result['capture']}: {result['changed_ratio']:.4%} ({result['precheck']}) {result['boxes'][:3]}")
+    for capture in summary["missing"]:
+        print(f"MISSING {capture}: еталон відсутній")
+    print(
+        f"Всього {summary['total']}, пройшли {summary['passed']}, не пройшли {summary['failed']}, "
+        f"без еталона {len(summary['missing'])}, {summary['duration_ms']} мс ({summary['workers']} процесів)"
+    )
+    if args.report:
+        args.report.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 1 if summary["failed"] or summary["missing"] else 0
+
+
+__all__ = [
+    "DiffOptions",
+    "DiffResult",
+    "PRECHECK_DIFFERENT",
+    "PRECHECK_FULL",
+    "PRECHECK_IDENTICAL",
+    "PRECHECK_SIZE",
+    "changed_boxes",
+    "compare_directory",
+    "compare_images",
+    "compare_to_baseline",
+    "hash_distance",
+    "load_baseline",
+    "perceptual_hash",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
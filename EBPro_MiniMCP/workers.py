@@ -0,0 +1,599 @@
+"""Пул незалежних сесій автоматизації EBPro з диспетчером завдань."""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import struct
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cancellation import REASON_CANCELLED, REASON_DEADLINE, JobCancelled, bind_token, current_token
+from .ebpro_actions import FriendlyError, ScreenshotData, get_backend
+from .jobs import (
+    JOB_CANCELLED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    ErrorFormatter,
+    Job,
+    JobHistory,
+    JobQueue,
+    Runner,
+    arm_deadline,
+    finish_job,
+    new_job,
+)
+from .visual_diff import DiffResult
+
+LOGGER = logging.getLogger("ebpro.workers")
+
+WORKER_IDLE = "idle"
+WORKER_BUSY = "busy"
+WORKER_RESTARTING = "restarting"
+WORKER_FAILED = "failed"
+
+_RESTART = object()
+_STOP = object()
+
+
+class WorkerUnavailable(FriendlyError):
+    """Інфраструктурна помилка воркера (процес, сесія або агент недоступні).
+
+    На відміну від звичайної ``FriendlyError`` (помилка дії), після неї воркер
+    перезапускається, а завдання передається іншому воркеру.
+    """
+
+
+class WorkerBackend:
+    """Базовий інтерфейс сесії автоматизації, якою керує один воркер."""
+
+    def run(self, action: str, params: Dict[str, Any], runner: Optional[Runner] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def restart(self) -> None:
+        """Відновлює сесію після збою. За замовчуванням нічого не робить."""
+
+    def describe(self) -> Dict[str, Any]:
+        return {"kind": type(self).__name__}
+
+
+def _invalidate_session(_action: str, _params: Dict[str, Any]) -> Dict[str, Any]:
+    get_backend().invalidate()
+    return {}
+
+
+class LocalWorkerBackend(WorkerBackend):
+    """Поточний процес: дії виконуються у GUI-потоці локальної черги."""
+
+    def __init__(self, job_queue: JobQueue):
+        self._queue = job_queue
+
+    def run(self, action: str, params: Dict[str, Any], runner: Optional[Runner] = None) -> Dict[str, Any]:
+        # Токен завдання пулу стає батьківським для завдання локальної черги.
+        return self._queue.submit(action, params, runner=runner).future.result()
+
+    def restart(self) -> None:
+        # Сесію скидаємо в GUI-потоці: наступна дія знову підключиться до EBPro з нуля.
+        self._queue.submit("restart_session", {}, runner=_invalidate_session, internal=True).future.result()
+
+    def describe(self) -> Dict[str, Any]:
+        return {"kind": "local"}
+
+
+class AgentWorkerBackend(WorkerBackend):
+    """Інший екземпляр Mini-MCP (окрема інсталяція, сесія Windows або VM).
+
+    Дії передаються вже розібраними (поле ``action``), тож NLP на агенті не виконується.
+    """
+
+    def __init__(self, url: str, token: str = "", timeout: float = 600.0):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _request(self, path: str, payload: Dict[str, Any]) -> Tuple[bytes, Any]:
+        payload = {**payload, "token": self.token or None}
+        request = urllib.request.Request(
+            self.url + path,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read(), response.headers
+        except urllib.error.HTTPError as exc:
+            try:
+                detail = json.loads(exc.read().decode("utf-8")).get("detail", {})
+            except Exception:
+                detail = {}
+            if exc.code >= 500 and detail.get("code") != "action_failed":
+                raise WorkerUnavailable(f"Агент {self.url} повернув {exc.code}.") from exc
+            raise FriendlyError(
+                detail.get("message", f"Агент {self.url} повернув {exc.code}."),
+                detail.get("hint"),
+            ) from exc
+        except (urllib.error.URLError, OSError) as exc:
+            raise WorkerUnavailable(
+                f"Агент {self.url} недоступний.",
+                "Перевірте, що Mini-MCP запущено на станції та WORKERS у config.json.",
+            ) from exc
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        content, _headers = self._request(path, payload)
+        return json.loads(content.decode("utf-8"))
+
+    def _screenshot(self, params: Dict[str, Any]) -> ScreenshotData:
+        content, headers = self._request("/screenshot", params)
+        diff = json.loads(headers["X-Diff"]) if headers.get("X-Diff") else None
+        return ScreenshotData(
+            content=content,
+            media_type=headers.get("Content-Type", "image/png"),
+            width=int(headers.get("X-Image-Width", 0)),
+            height=int(headers.get("X-Image-Height", 0)),
+            diff=DiffResult(**{**diff, "size": tuple(diff["size"])}) if diff else None,
+        )
+
+    def run(self, action: str, params: Dict[str, Any], runner: Optional[Runner] = None) -> Dict[str, Any]:
+        # Залишок дедлайну передається агенту, щоб він теж зупинив дію вчасно.
+        token = current_token()
+        limits = {"timeout": token.remaining()} if token is not None and token.deadline is not None else {}
+        if action == "batch":
+            steps = [{"action": name, "args": step} for name, step in params["plan"]]
+            result = self._post("/run/batch", {"steps": steps, "stop_on_error": params["stop_on_error"], **limits})
+            result.pop("job_id", None)
+            return result
+        if action == "take_screenshot" and runner is not None and not params.get("out"):
+            # Знімок у пам'ять: кадр з /screenshot агента віддається runner'у замість локального захоплення.
+            return runner(action, {**params, "image": self._screenshot(params)})
+        # Результат агента передається повністю (build, diff), крім полів самої відповіді /run.
+        response = self._post("/run", {"action": action, "args": params, **limits})
+        for key in ("ok", "action", "job_id"):
+            response.pop(key, None)
+        return response
+
+    def restart(self) -> None:
+        try:
+            with urllib.request.urlopen(self.url + "/health", timeout=10) as response:
+                response.read()
+        except (urllib.error.URLError, OSError) as exc:
+            raise WorkerUnavailable(f"Агент {self.url} не відповідає на /health.") from exc
+
+    def describe(self) -> Dict[str, Any]:
+        return {"kind": "agent", "url": self.url}
+
+
+def _blank_png(width: int, height: int) -> bytes:
+    """Чорне RGB-зображення PNG без залежності від Pillow (для FakeWorkerBackend)."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + b"\x00" * 3 * width for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+class FakeWorkerBackend(WorkerBackend):
+    """Сесія в пам'яті для тестів і навантажувальних прогонів без EBPro.
+
+    ``latency`` — тривалість кожної дії, ``fail_rate`` — частка помилок дії,
+    ``crash_after`` — після скількох дій сесія "падає" до перезапуску.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+        crash_after: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.crash_after = crash_after
+        self.calls: List[str] = []
+        self.restarts = 0
+        self._since_restart = 0
+        self._random = random.Random(seed)
+
+    def run(self, action: str, params: Dict[str, Any], runner: Optional[Runner] = None) -> Dict[str, Any]:
+        if self.crash_after is not None and self._since_restart >= self.crash_after:
+            raise WorkerUnavailable("Імітована втрата сесії EBPro.")
+        self._since_restart += 1
+        self.calls.append(action)
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_rate and self._random.random() < self.fail_rate:
+            raise FriendlyError(f"Імітована помилка дії {action}.")
+        if action == "take_screenshot" and runner is not None and not params.get("out"):
+            # Знімок у пам'ять: runner отримує синтетичний кадр замість вікна симулятора.
+            image = ScreenshotData(content=_blank_png(4, 3), media_type="image/png", width=4, height=3)
+            return runner(action, {**params, "image": image})
+        if action == "batch":
+            steps = [
+                {"index": index, "action": name, "ok": True, "file": step.get("out")}
+                for index, (name, step) in enumerate(params["plan"])
+            ]
+            return {"ok": True, "steps": steps, "duration_ms": 0.0}
+        return {"file": params.get("out"), "notes": "Дію виконано успішно."}
+
+    def restart(self) -> None:
+        self.restarts += 1
+        self._since_restart = 0
+
+    def describe(self) -> Dict[str, Any]:
+        return {"kind": "fake", "latency": self.latency, "fail_rate": self.fail_rate}
+
+
+def _project_of(action: str, params: Dict[str, Any]) -> Optional[str]:
+    """Проєкт, з яким працює завдання (для прив'язки до воркера)."""
+
+    if action == "open_project":
+        return params.get("path")
+    if action == "batch":
+        paths = [step.get("path") for name, step in params.get("plan", []) if name == "open_project"]
+        return paths[-1] if paths else None
+    return params.get("project")
+
+
+class Worker:
+    """Один воркер пулу: власний потік, бекенд і стан."""
+
+    def __init__(self, worker_id: str, backend: WorkerBackend):
+        self.id = worker_id
+        self.backend = backend
+        self.state = WORKER_IDLE
+        self.project: Optional[str] = None
+        self.draining = False
+        self.completed = 0
+        self.failures = 0
+        self.restarts = 0
+        self.restart_failures = 0
+        self.inbox: "queue.Queue[Any]" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "state": self.state,
+            "project": self.project,
+            "draining": self.draining,
+            "completed": self.completed,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "backend": self.backend.describe(),
+        }
+
+
+class WorkerPool:
+    """Диспетчер, що розподіляє завдання між незалежними воркерами.
+
+    Завдання отримує вільний воркер; якщо проєкт завдання вже відкритий на
+    якомусь воркері, завдання чекає саме на нього. Наступні дії без проєкту
+    (збірка, пакування, симуляція, знімок) ідуть на воркер, де сесія клієнта
+    (``Job.session``) виконувала попередні дії, а без сесії — туди, де
+    проєкт відкрили останнім. Після ``WorkerUnavailable``
+    воркер перезапускається, а завдання один раз повторюється на іншому.
+    Інтерфейс сумісний з ``JobQueue`` (submit/get/list/pending/stop).
+    """
+
+    def __init__(
+        self,
+        workers: List[Worker],
+        error_formatter: Optional[ErrorFormatter] = None,
+        max_history: int = 200,
+        max_restarts: int = 3,
+        max_attempts: int = 2,
+        max_sessions: int = 1024,
+    ):
+        if not workers:
+            raise FriendlyError("Пул воркерів порожній.", "Додайте хоча б один запис у WORKERS у config.json.")
+        self._workers = {worker.id: worker for worker in workers}
+        self._error_formatter = error_formatter
+        self._history = JobHistory(max_history)
+        self._pending: List[Job] = []
+        self._lock = threading.Lock()
+        # Сесія клієнта -> воркер, що виконував її дії; воркер останнього open_project.
+        self._sessions: "OrderedDict[str, str]" = OrderedDict()
+        self._last_opened: Optional[str] = None
+        self.max_restarts = max_restarts
+        self.max_attempts = max_attempts
+        self.max_sessions = max_sessions
+        for worker in workers:
+            worker.thread = threading.Thread(
+                target=self._worker_loop, args=(worker,), name=f"ebpro-worker-{worker.id}", daemon=True
+            )
+            worker.thread.start()
+
+    # --- API, сумісний з JobQueue -----------------------------------------
+
+    def submit(
+        self,
+        action: str,
+        params: Dict[str, Any],
+        runner: Optional[Runner] = None,
+        priority: Optional[int] = None,
+        deadline: Optional[float] = None,
+        session: Optional[str] = None,
+    ) -> Job:
+        job = new_job(action, params, runner, priority=priority, deadline=deadline, session=session)
+        self._history.add(job)
+        with self._lock:
+            self._pending.append(job)
+            self._schedule()
+        arm_deadline(job, lambda expired: self._cancel(expired, REASON_DEADLINE))
+        LOGGER.info("Завдання %s (%s) поставлено в чергу пулу.", job.id, action)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._history.get(job_id)
+        if job is not None:
+            self._cancel(job, REASON_CANCELLED)
+        return job
+
+    def _cancel(self, job: Job, reason: str) -> None:
+        with self._lock:
+            if job.future.done() or not job.token.cancel(reason):
+                return
+            if job not in self._pending:
+                LOGGER.info("Завдання %s буде зупинено у найближчій безпечній точці.", job.id)
+                return
+            self._pending.remove(job)
+            job.status = JOB_CANCELLED
+        finish_job(job, exc=JobCancelled(reason), error_formatter=self._error_formatter)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._history.get(job_id)
+
+    def list(self, status: Optional[str] = None) -> List[Job]:
+        return self._history.list(status)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        for worker in self._workers.values():
+            worker.inbox.put(_STOP)
+        for worker in self._workers.values():
+            if worker.thread is not None:
+                worker.thread.join(timeout)
+
+    # --- керування воркерами --------------------------------------------
+
+    def workers(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [worker.to_dict() for worker in self._workers.values()]
+
+    def drain(self, worker_id: str) -> None:
+        """Припиняє видачу завдань воркеру та перезапускає його після поточного."""
+
+        with self._lock:
+            worker = self._workers[worker_id]
+            worker.draining = True
+            if worker.state == WORKER_IDLE:
+                worker.state = WORKER_RESTARTING
+                worker.inbox.put(_RESTART)
+
+    # --- планування -------------------------------------------------------
+
+    def _available(self, worker_id: Optional[str]) -> Optional[Worker]:
+        worker = self._workers.get(worker_id) if worker_id is not None else None
+        if worker is None or worker.state == WORKER_FAILED or worker.draining:
+            return None
+        return worker
+
+    def _owner(self, job: Job) -> Optional[Worker]:
+        """Воркер, до якого прив'язане завдання, або None. Викликається під self._lock."""
+
+        project = _project_of(job.action, job.params)
+        if project is not None:
+            for worker in self._workers.values():
+                if worker.project == project and self._available(worker.id) is not None:
+                    return worker
+        if job.session is not None:
+            worker = self._available(self._sessions.get(job.session))
+            if worker is not None:
+                return worker
+        if project is None:
+            # Дія без проєкту працює з тим, що відкрили останнім.
+            worker = self._available(self._last_opened)
+            if worker is not None and worker.project is not None:
+                return worker
+        return None
+
+    def _pick_worker(self, job: Job, idle: List[Worker]) -> Optional[Worker]:
+        owner = self._owner(job)
+        if owner is not None:
+            # Проєкт чи сесія вже на цьому воркері: чекаємо саме на нього.
+            return owner if owner in idle else None
+        # Новий проєкт відкриваємо на вільному воркері без відкритого проєкту, якщо такий є.
+        idle.sort(key=lambda item: item.project is not None)
+        return idle[0] if idle else None
+
+    def _forget(self, worker: Worker) -> None:
+        """Знімає прив'язки сесій і проєкту до воркера, що втратив стан. Під self._lock."""
+
+        worker.project = None
+        for session in [session for session, owner in self._sessions.items() if owner == worker.id]:
+            del self._sessions[session]
+        if self._last_opened == worker.id:
+            self._last_opened = None
+
+    def _bind(self, worker: Worker, job: Job) -> None:
+        """Запам'ятовує, де виконано завдання, для наступних дій. Під self._lock."""
+
+        project = _project_of(job.action, job.params)
+        if project is not None:
+            worker.project = project
+            self._last_opened = worker.id
+        if job.session is not None:
+            self._sessions[job.session] = worker.id
+            self._sessions.move_to_end(job.session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def _schedule(self) -> None:
+        """Роздає очікуючі завдання вільним воркерам. Викликається під self._lock."""
+
+        for job in sorted(self._pending, key=Job.order):
+            idle = [
+                worker
+                for worker in self._workers.values()
+                if worker.state == WORKER_IDLE and not worker.draining
+            ]
+            if not idle:
+                return
+            worker = self._pick_worker(job, idle)
+            if worker is None:
+                continue
+            self._pending.remove(job)
+            worker.state = WORKER_BUSY
+            job.worker = worker.id
+            worker.inbox.put(job)
+
+    def _worker_loop(self, worker: Worker) -> None:
+        while True:
+            item = worker.inbox.get()
+            if item is _STOP:
+                return
+            if item is _RESTART:
+                self._restart(worker)
+                continue
+            item.context.run(self._execute, worker, item)
+
+    def _execute(self, worker: Worker, job: Job) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = job.started_at or time.time()
+        job.attempts += 1
+        try:
+            with bind_token(job.token):
+                job.token.check()
+                result = worker.backend.run(job.action, job.params, job.runner)
+        except JobCancelled as exc:
+            with self._lock:
+                self._release(worker)
+            finish_job(job, exc=exc, error_formatter=self._error_formatter)
+            return
+        except WorkerUnavailable as exc:
+            LOGGER.warning("Воркер %s недоступний: %s", worker.id, exc)
+            with self._lock:
+                worker.failures += 1
+                self._forget(worker)
+                worker.state = WORKER_RESTARTING
+                worker.inbox.put(_RESTART)
+                if job.attempts < self.max_attempts:
+                    job.status = JOB_QUEUED
+                    job.worker = None
+                    self._pending.insert(0, job)
+                    self._schedule()
+                    return
+            finish_job(job, exc=exc, error_formatter=self._error_formatter)
+            return
+        except Exception as exc:  # noqa: BLE001 - помилка дії, воркер справний
+            with self._lock:
+                worker.failures += 1
+                self._release(worker)
+            finish_job(job, exc=exc, error_formatter=self._error_formatter)
+            return
+
+        with self._lock:
+            worker.completed += 1
+            self._bind(worker, job)
+            self._release(worker)
+        finish_job(job, result)
+
+    def _release(self, worker: Worker) -> None:
+        """Повертає воркер у пул (або на перезапуск, якщо він дренується). Під self._lock."""
+
+        if worker.draining:
+            worker.state = WORKER_RESTARTING
+            worker.inbox.put(_RESTART)
+            return
+        worker.state = WORKER_IDLE
+        self._schedule()
+
+    def _restart(self, worker: Worker) -> None:
+        try:
+            worker.backend.restart()
+        except Exception as exc:  # noqa: BLE001 - фіксуємо і пробуємо пізніше
+            LOGGER.error("Не вдалося перезапустити воркер %s: %s", worker.id, exc)
+            with self._lock:
+                worker.restart_failures += 1
+                if worker.restart_failures >= self.max_restarts:
+                    worker.state = WORKER_FAILED
+                    LOGGER.error("Воркер %s виведено з пулу після %s спроб.", worker.id, worker.restart_failures)
+                    self._schedule()
+                    return
+            time.sleep(min(2.0 ** worker.restart_failures, 30.0))
+            worker.inbox.put(_RESTART)
+            return
+        with self._lock:
+            worker.restarts += 1
+            worker.restart_failures = 0
+            self._forget(worker)
+            worker.draining = False
+            worker.state = WORKER_IDLE
+            LOGGER.info("Воркер %s перезапущено.", worker.id)
+            self._schedule()
+
+
+def create_pool(
+    specs: List[Dict[str, Any]],
+    local_queue: JobQueue,
+    error_formatter: Optional[ErrorFormatter] = None,
+) -> WorkerPool:
+    """Створює пул з опису WORKERS у config.json.
+
+    Підтримувані ``kind``: ``local`` (цей процес, не більше одного), ``agent``
+    (інший Mini-MCP за ``url``/``token``) та ``fake`` (``latency``,
+    ``fail_rate``, ``crash_after``).
+    """
+
+    local = [spec for spec in specs if spec.get("kind", "local") == "local"]
+    if len(local) > 1:
+        # Усі local-воркери ділили б одну GUI-чергу й один робочий стіл.
+        raise FriendlyError(
+            f"У WORKERS {len(local)} воркери kind: local, а на машині лише одна сесія EBPro.",
+            "Залиште один local-воркер; інші станції додавайте як kind: agent з власним Mini-MCP.",
+        )
+    workers: List[Worker] = []
+    for index, spec in enumerate(specs):
+        kind = spec.get("kind", "local")
+        worker_id = str(spec.get("id") or f"{kind}-{index}")
+        backend: WorkerBackend
+        if kind == "local":
+            backend = LocalWorkerBackend(local_queue)
+        elif kind == "agent":
+            backend = AgentWorkerBackend(spec["url"], spec.get("token", ""), float(spec.get("timeout", 600.0)))
+        elif kind == "fake":
+            backend = FakeWorkerBackend(
+                latency=float(spec.get("latency", 0.0)),
+                fail_rate=float(spec.get("fail_rate", 0.0)),
+                crash_after=spec.get("crash_after"),
+            )
+        else:
+            raise FriendlyError(
+                f"Невідомий тип воркера '{kind}'.",
+                "Використайте kind: local, agent або fake у WORKERS.",
+            )
+        workers.append(Worker(worker_id, backend))
+    return WorkerPool(workers, error_formatter=error_formatter)
+
+
+__all__ = [
+    "WorkerBackend",
+    "LocalWorkerBackend",
+    "AgentWorkerBackend",
+    "FakeWorkerBackend",
+    "WorkerUnavailable",
+    "Worker",
+    "WorkerPool",
+    "create_pool",
+]